@@ -69,6 +69,11 @@ class ArchiBuilder(SoSDisciplineBuilder):
         ),
     }
     ACTIVATION_DF = 'activation_df'
+    # keys of compiled architecture dataframes
+    ACTION_BY_CURRENT = 'action_by_current'
+    ACTION_BY_PARENT_CURRENT = 'action_by_parent_current'
+    PARENTS_BY_CURRENT = 'parents_by_current'
+    CHILDREN_BY_PARENT = 'children_by_parent'
 
     DEFAULT_VB_FOLDER_LIST = ['sos_trades_core.sos_wrapping']
 
@@ -79,6 +84,16 @@ class ArchiBuilder(SoSDisciplineBuilder):
 
         SoSDisciplineBuilder.__init__(self, sos_name, ee)
 
+        # architecture dataframes compiled into dicts {id(archi_df): (archi_df, archi_df_index)}
+        self.__archi_df_indexes = {}
+        # sub architectures builders {(id(subarchi_df), parent_namespace): (subarchi_df, builder_dict, activation_dict)}
+        self.__subarchi_builders = {}
+        # activation_df rows filtered by parents activation, reset when
+        # activation_df changes
+        self.__activation_df_key = None
+        self.__activation_df_shape = None
+        self.__filtered_activation_dfs = {}
+
         self.children_dict = {}
         self.archi_disciplines = {}
         self.activated_builders = {}
@@ -274,10 +289,10 @@ class ArchiBuilder(SoSDisciplineBuilder):
         """
         Recursive method to get children names for parent name by reading architecture_df
         """
-        if parent_name in architecture[self.PARENT].values.tolist():
-            return architecture.loc[
-                architecture[self.PARENT] == parent_name, self.CURRENT
-            ].values.tolist()
+        children_by_parent = self.get_archi_df_index(architecture)[
+            self.CHILDREN_BY_PARENT]
+        if parent_name in children_by_parent:
+            return list(children_by_parent[parent_name])
         else:
             for sub_architecture in [
                 action[3]
@@ -361,18 +376,17 @@ class ArchiBuilder(SoSDisciplineBuilder):
                 new_namespace_list.append(full_namespace)
             else:
                 # get parents of namespace
-                vb_father = archi_df.loc[
-                    (archi_df[self.CURRENT] == namespace.split('.')[0])
-                    & (~archi_df[self.PARENT].isna())
-                ]
+                vb_current = namespace.split('.')[0]
+                vb_father_list = self.get_archi_df_index(archi_df)[
+                    self.PARENTS_BY_CURRENT].get(vb_current, [])
                 # if no parents and architecture name not in architecture_df,
                 # namespace builder will be built below architecture
-                if len(vb_father) == 0:
+                if len(vb_father_list) == 0:
                     new_namespace_list.append(namespace)
 
                 # get list of namespaces created with list of parents
-                for i, vb in vb_father.iterrows():
-                    namespace_with_father = f'{vb[self.PARENT]}.{namespace}'
+                for vb_father in vb_father_list:
+                    namespace_with_father = f'{vb_father}.{namespace}'
 
                     (
                         ns_list_father,
@@ -381,32 +395,117 @@ class ArchiBuilder(SoSDisciplineBuilder):
                         namespace_with_father, activation_dict, archi_df, archi_parent
                     )
 
-                    if vb[self.PARENT] in activation_dict.keys():
-                        activation_dict[vb[self.PARENT]].update(
-                            {namespace_with_father: vb[self.CURRENT]}
+                    if vb_father in activation_dict.keys():
+                        activation_dict[vb_father].update(
+                            {namespace_with_father: vb_current}
                         )
 
                     new_namespace_list.extend(ns_list_father)
 
         return new_namespace_list, activation_dict
 
+    def get_archi_df_index(self, archi_df):
+        """
+        Return the lookup dicts of archi_df, compiled once per architecture dataframe
+        """
+        archi_df_index = self.__archi_df_indexes.get(id(archi_df))
+        if archi_df_index is None or archi_df_index[0] is not archi_df:
+            archi_df_index = (archi_df, self.compile_archi_df(archi_df))
+            self.__archi_df_indexes[id(archi_df)] = archi_df_index
+        return archi_df_index[1]
+
+    def compile_archi_df(self, archi_df):
+        """
+        Compile architecture dataframe rows into dicts:
+        first action by current name and by (parent, current), parents by current name and children by parent
+        """
+        archi_df_index = {
+            self.ACTION_BY_CURRENT: {},
+            self.ACTION_BY_PARENT_CURRENT: {},
+            self.PARENTS_BY_CURRENT: {},
+            self.CHILDREN_BY_PARENT: {},
+        }
+        for parent, current, action in zip(
+            archi_df[self.PARENT].values.tolist(),
+            archi_df[self.CURRENT].values.tolist(),
+            archi_df[self.ACTION].values.tolist(),
+        ):
+            archi_df_index[self.ACTION_BY_CURRENT].setdefault(current, action)
+            archi_df_index[self.ACTION_BY_PARENT_CURRENT].setdefault(
+                (parent, current), action
+            )
+            archi_df_index[self.CHILDREN_BY_PARENT].setdefault(parent, []).append(
+                current
+            )
+            if not pd.isna(parent):
+                archi_df_index[self.PARENTS_BY_CURRENT].setdefault(
+                    current, []
+                ).append(parent)
+
+        return archi_df_index
+
+    def check_activation_df_changes(self):
+        """
+        Reset filtered activation dataframes if activation_df content has changed
+        """
+        activation_df_key = None
+        if self.ACTIVATION_DF in self._data_in:
+            activation_df = self.get_sosdisc_inputs(self.ACTIVATION_DF)
+            if activation_df is not None:
+                try:
+                    activation_df_key = (
+                        tuple(activation_df.columns),
+                        pd.util.hash_pandas_object(activation_df).values.tobytes(),
+                    )
+                except (TypeError, ValueError):
+                    # unhashable values, no cache
+                    activation_df_key = None
+
+        if activation_df_key is None or activation_df_key != self.__activation_df_key:
+            self.__filtered_activation_dfs = {}
+        self.__activation_df_key = activation_df_key
+
+    def get_filtered_activation_df(self, namespace):
+        """
+        Return activation_df rows matching the activation of the parents of namespace,
+        memoized by parents activation until activation_df changes
+        """
+        activation_df = self.get_sosdisc_inputs(self.ACTIVATION_DF)
+        # activation_df may be replaced or completed during build
+        activation_df_shape = (id(activation_df), activation_df.shape)
+        if activation_df_shape != self.__activation_df_shape:
+            self.__filtered_activation_dfs = {}
+            self.__activation_df_shape = activation_df_shape
+
+        parents_activation = tuple(
+            (var, activ_dict[namespace])
+            for var, activ_dict in self.activation_dict.items()
+            if namespace in activ_dict
+        )
+        if parents_activation not in self.__filtered_activation_dfs:
+            filtered_activation_df = activation_df
+            for var, activation in parents_activation:
+                filtered_activation_df = filtered_activation_df.loc[
+                    filtered_activation_df[var] == activation
+                ]
+            self.__filtered_activation_dfs[parents_activation] = filtered_activation_df
+
+        return self.__filtered_activation_dfs[parents_activation]
+
     def get_action_builder(self, namespace, archi_df):
         """
         Get action and args of builder_name from architecture_df
         """
+        archi_df_index = self.get_archi_df_index(archi_df)
         if '.' not in namespace:
             # get action of namespace without parent
-            action = archi_df[archi_df[self.CURRENT] == namespace][self.ACTION].values[
-                0
-            ]
+            action = archi_df_index[self.ACTION_BY_CURRENT][namespace]
         else:
             # get action of namespace splitted into current/parent
             parent_name, current_name = namespace.split('.')[-2:]
-            action = archi_df.loc[
-                (archi_df[self.CURRENT] == current_name)
-                & (archi_df[self.PARENT] == parent_name),
-                self.ACTION,
-            ].values[0]
+            action = archi_df_index[self.ACTION_BY_PARENT_CURRENT][
+                (parent_name, current_name)
+            ]
         if isinstance(action, (str)):
             return action, ()
         elif isinstance(action, (tuple)):
@@ -422,6 +521,7 @@ class ArchiBuilder(SoSDisciplineBuilder):
         """
 
         self.check_activation_df()
+        self.check_activation_df_changes()
 
         activ_builder_dict, self.builder_dict = self.build_action_from_builder_dict(
             self.builder_dict, self.architecture_df
@@ -729,10 +829,7 @@ class ArchiBuilder(SoSDisciplineBuilder):
                 builder_name in activation_df.columns
                 and builder_name not in self.activation_dict.keys()
             ):
-                df = deepcopy(activation_df)
-                for builder, activ_dict in self.activation_dict.items():
-                    if namespace in activ_dict:
-                        df = df.loc[df[builder] == activ_dict[namespace]]
+                df = self.get_filtered_activation_df(namespace)
                 return True in df[builder_name].values
             else:
                 return True
@@ -1022,11 +1119,21 @@ class ArchiBuilder(SoSDisciplineBuilder):
         """
         Build initial builder_dict and activation_dict by reading subarchi_df
         """
-        sub_builder_dict, sub_activation_dict = self.builder_dict_from_architecture(
-            subarchi_df, parent_namespace
-        )
-
-        return sub_builder_dict, sub_activation_dict
+        subarchi_key = (id(subarchi_df), parent_namespace)
+        subarchi_builders = self.__subarchi_builders.get(subarchi_key)
+        if subarchi_builders is None or subarchi_builders[0] is not subarchi_df:
+            sub_builder_dict, sub_activation_dict = self.builder_dict_from_architecture(
+                subarchi_df, parent_namespace
+            )
+            subarchi_builders = (subarchi_df, sub_builder_dict, sub_activation_dict)
+            self.__subarchi_builders[subarchi_key] = subarchi_builders
+
+        # return copies since builder_dict and activation_dict are completed
+        # by the caller
+        _, sub_builder_dict, sub_activation_dict = subarchi_builders
+        return dict(sub_builder_dict), {
+            parent: dict(activ_dict) for parent, activ_dict in sub_activation_dict.items()
+        }
 
     def delete_father_without_children(self, activate_dict):
         """
@@ -1186,12 +1293,7 @@ class ArchiBuilder(SoSDisciplineBuilder):
         Get product list of actor_name for builder_name
         """
         if self.ACTIVATION_DF in self._data_in:
-            activation_df = deepcopy(self.get_sosdisc_inputs(self.ACTIVATION_DF))
-            for var, activ_dict in self.activation_dict.items():
-                if namespace in activ_dict:
-                    activation_df = activation_df.loc[
-                        activation_df[var] == activ_dict[namespace]
-                    ]
+            activation_df = self.get_filtered_activation_df(namespace)
 
             subactivation_df = activation_df.loc[activation_df[builder_name]]
             # To deal with scatter of scatter
@@ -67,6 +67,26 @@ class AbstractDataConnector(abc.ABC):
         Abstract method to overload in order set request into the connector data structure
         """
 
+    def get_batch_key(self, connector_info):
+        """
+        Key of the read requests that can be combined into a single request by load_data_batch
+        when they share the same connection info (for instance the requested table).
+        None means that the request cannot be combined, overload to enable batched requests
+        """
+        return None
+
+    def load_data_batch(self, connector_info_list):
+        """
+        Load the data of several read requests sharing the same connection info and batch key.
+        Overload in order to send a single combined request to the specific API
+
+        :param connector_info_list: information with for connection and request of each data
+        :type connector_info_list: list of dict
+
+        :return: list of data in the order of connector_info_list
+        """
+        return [self.load_data(connector_info) for connector_info in connector_info_list]
+
     def get_connector_mode(self, connector_info):
         """
         Get the read write connection mode from connector info
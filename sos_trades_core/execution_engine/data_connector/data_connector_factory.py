@@ -14,17 +14,12 @@ See the License for the specific language governing permissions and
 limitations under the License.
 '''
 
-from sos_trades_core.execution_engine.data_connector.dremio_data_connector import (
-    DremioDataConnector,
-)
-from sos_trades_core.execution_engine.data_connector.trino_data_connector import (
-    TrinoDataConnector,
-)
-from sos_trades_core.execution_engine.data_connector.mock_connector import MockConnector
-from sos_trades_core.execution_engine.data_connector.ontology_data_connector import (
-    OntologyDataConnector,
-)
 from sos_trades_core.api import get_sos_logger
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import time
+from copy import deepcopy
+from importlib import import_module
 
 
 class ConnectorFactory:
@@ -34,20 +29,44 @@ class ConnectorFactory:
 
     CONNECTOR_TYPE = 'connector_type'
 
+    # connector NAME: class path, connector modules (and their client libraries)
+    # are imported at first use
     _CONNECTORS = {
-        DremioDataConnector.NAME: DremioDataConnector,
-        MockConnector.NAME: MockConnector,
-        TrinoDataConnector.NAME: TrinoDataConnector,
-        OntologyDataConnector.NAME: OntologyDataConnector,
+        'DREMIO': 'sos_trades_core.execution_engine.data_connector.dremio_data_connector.DremioDataConnector',
+        'Mock': 'sos_trades_core.execution_engine.data_connector.mock_connector.MockConnector',
+        'TRINO': 'sos_trades_core.execution_engine.data_connector.trino_data_connector.TrinoDataConnector',
+        'ONTOLOGY': 'sos_trades_core.execution_engine.data_connector.ontology_data_connector.OntologyDataConnector',
     }
+    _CONNECTOR_CLASSES = {}
+
+    @staticmethod
+    def get_connector_class_from_type(connector_type):
+        """
+        Return the connector class registered with connector_type, the connector module
+        is imported at first call
+
+        :params: connector_type, NAME of the connector
+        :type: str
+        """
+        connector_class = ConnectorFactory._CONNECTOR_CLASSES.get(
+            connector_type)
+        if connector_class is None:
+            if connector_type not in ConnectorFactory._CONNECTORS:
+                raise TypeError(
+                    f'Connector type {connector_type} does not exist.')
+            module_path, class_name = ConnectorFactory._CONNECTORS[connector_type].rsplit(
+                '.', 1)
+            connector_class = getattr(import_module(module_path), class_name)
+            ConnectorFactory._CONNECTOR_CLASSES[connector_type] = connector_class
+        return connector_class
 
     @staticmethod
     def set_connector_request(connector_info, request):
 
         if ConnectorFactory.CONNECTOR_TYPE in connector_info:
-            connector_instance = ConnectorFactory._CONNECTORS[
+            connector_instance = ConnectorFactory.get_connector_class_from_type(
                 connector_info[ConnectorFactory.CONNECTOR_TYPE]
-            ]()
+            )()
             connector_instance.set_connector_request(connector_info, request)
 
         else:
@@ -56,20 +75,34 @@ class ConnectorFactory:
         return connector_info
 
     @staticmethod
-    def use_data_connector(connector_info, logger=None):
+    def get_connector_class(connector_info):
         """
-        create and instance of the required data connector
+        Return the connector class required by connector info
 
         :params: connector_info, information with for connection and request
         :type: dict
         """
-        new_connector = None
         if ConnectorFactory.CONNECTOR_TYPE in connector_info:
-            new_connector = ConnectorFactory._CONNECTORS[
+            return ConnectorFactory.get_connector_class_from_type(
                 connector_info[ConnectorFactory.CONNECTOR_TYPE]
-            ]()
+            )
         else:
             raise TypeError(f'Connector type not found in {connector_info}')
+
+    @staticmethod
+    def use_data_connector(connector_info, logger=None, connector=None):
+        """
+        create and instance of the required data connector
+
+        :params: connector_info, information with for connection and request
+        :type: dict
+
+        :params: connector, connector instance to use instead of a new one
+        :type: AbstractDataConnector inherited instance
+        """
+        new_connector = connector
+        if new_connector is None:
+            new_connector = ConnectorFactory.get_connector_class(connector_info)()
         try:
             if (
                 new_connector.get_connector_mode(connector_info)
@@ -85,6 +118,32 @@ class ConnectorFactory:
             raise Exception(str_error)
         return data
 
+    @staticmethod
+    def use_data_connector_batch(connector_info_list, logger=None, connector=None):
+        """
+        read with a single request of the required data connector the data of several
+        connector info sharing the same connection info and batch key
+
+        :params: connector_info_list, information with for connection and request of each data
+        :type: list of dict
+
+        :params: connector, connector instance to use instead of a new one
+        :type: AbstractDataConnector inherited instance
+
+        :return: list of data in the order of connector_info_list
+        """
+        new_connector = connector
+        if new_connector is None:
+            new_connector = ConnectorFactory.get_connector_class(connector_info_list[0])()
+        try:
+            data_list = new_connector.load_data_batch(connector_info_list)
+        except Exception as exp:
+            str_error = f'Error while using data connector {connector_info_list[0][ConnectorFactory.CONNECTOR_TYPE]}: {str(exp)}'
+            if logger is not None:
+                logger.error(str_error)
+            raise Exception(str_error)
+        return data_list
+
     @staticmethod
     def get_connector(connector_type, connector_connexion_info):
         """
@@ -95,9 +154,8 @@ class ConnectorFactory:
         :type connector_connexion_info: dict
         """
 
-        connector = ConnectorFactory._CONNECTORS.get(connector_type)
-        if not connector:
-            raise TypeError(f'Connector type {connector_type} does not exist.')
+        connector = ConnectorFactory.get_connector_class_from_type(
+            connector_type)
         return connector(data_connection_info=connector_connexion_info)
 
     @staticmethod
@@ -108,18 +166,35 @@ class ConnectorFactory:
         :type connector_type: str
         """
 
-        connector = ConnectorFactory._CONNECTORS.get(format)
-        if not connector:
-            raise TypeError(f'Connector type {connector_type} does not exist.')
+        connector = ConnectorFactory.get_connector_class_from_type(
+            connector_type)
         return connector.data_connection_list.copy()
 
 
 class PersistentConnectorContainer:
-    def __init__(self):
+    """
+    Container of the connectors used by an execution engine:
+        - connectors registered with an identifier
+        - pool of connectors shared by all the requests with the same
+          connection info, so that connections and table schemas are reused
+        - cache of the data read for a request, valid during result_ttl seconds
+    """
+
+    def __init__(self, result_ttl=0.0, n_threads=None):
         """
         Class constructor
+
+        :param result_ttl: duration in seconds while a read request result is reused, no cache if 0
+        :type result_ttl: float
+        :param n_threads: maximum number of requests sent concurrently (default of ThreadPoolExecutor if None)
+        :type n_threads: int
         """
         self.__registered_connectors = {}
+        self.__pooled_connectors = {}
+        self.__results_cache = {}
+        self.__lock = Lock()
+        self.result_ttl = result_ttl
+        self.n_threads = n_threads
         self.__logger = get_sos_logger(f'SoS.{self.__class__.__name__}')
 
     def register_persistent_connector(
@@ -155,3 +230,145 @@ class PersistentConnectorContainer:
             self.__logger.info(f'Request a non registered connector "{connector_identifier}"')
         return self.__registered_connectors.get(connector_identifier, None)
 
+
+    @staticmethod
+    def get_connection_key(connector_info):
+        """
+        Key of the connector pool, built from connector type and connection info
+        :param connector_info: information for connection and request
+        :type connector_info: dict
+        """
+        connector_class = ConnectorFactory.get_connector_class(connector_info)
+        return (connector_info[ConnectorFactory.CONNECTOR_TYPE],) + tuple(
+            repr(connector_info.get(key)) for key in connector_class.data_connection_list)
+
+    @staticmethod
+    def get_request_key(connector_info):
+        """
+        Key of the results cache, built from the whole connector info
+        :param connector_info: information for connection and request
+        :type connector_info: dict
+        """
+        return tuple(sorted((key, repr(value))
+                            for key, value in connector_info.items()))
+
+    def get_pooled_connector(self, connector_info):
+        """
+        Retrieve the connector of the pool matching connection info, created at first request
+        :param connector_info: information for connection and request
+        :type connector_info: dict
+
+        :return: sos_trades_core.execution_engine.data_connector.abstract_data_connector.AbstractDataConnector inherited instance
+        """
+        connection_key = self.get_connection_key(connector_info)
+        with self.__lock:
+            if connection_key not in self.__pooled_connectors:
+                self.__pooled_connectors[connection_key] = ConnectorFactory.get_connector_class(
+                    connector_info)()
+            return self.__pooled_connectors[connection_key]
+
+    def use_data_connector(self, connector_info, logger=None):
+        """
+        Read or write data with the pooled connector matching connector info,
+        read results being cached during result_ttl seconds
+        :param connector_info: information for connection and request
+        :type connector_info: dict
+        """
+        connector = self.get_pooled_connector(connector_info)
+        use_cache = self.__use_results_cache(connector, connector_info)
+
+        if use_cache:
+            is_cached, data = self.__get_cached_result(connector_info)
+            if is_cached:
+                return data
+
+        data = ConnectorFactory.use_data_connector(
+            connector_info, logger, connector=connector)
+
+        if use_cache:
+            self.__cache_result(connector_info, data)
+        return data
+
+    def use_data_connectors(self, connector_info_list, logger=None):
+        """
+        Send concurrently the requests of several connector info, the read requests
+        of a same connector that can be combined (sharing connection info and batch key)
+        being sent as a single batched request
+        :param connector_info_list: list of information for connection and request
+        :type connector_info_list: list of dict
+
+        :return: list of data in the order of connector_info_list
+        """
+        data_list = [None] * len(connector_info_list)
+
+        # group the requests that can be combined, the others being sent alone
+        single_requests = []
+        batched_requests = {}
+        for index, connector_info in enumerate(connector_info_list):
+            connector = self.get_pooled_connector(connector_info)
+            batch_key = None
+            if connector.get_connector_mode(connector_info) == connector.CONNECTOR_MODE_READ:
+                if self.__use_results_cache(connector, connector_info):
+                    is_cached, data = self.__get_cached_result(connector_info)
+                    if is_cached:
+                        data_list[index] = data
+                        continue
+                batch_key = connector.get_batch_key(connector_info)
+            if batch_key is None:
+                single_requests.append([index])
+            else:
+                batched_requests.setdefault(
+                    (self.get_connection_key(connector_info), batch_key), []).append(index)
+        requests = single_requests + list(batched_requests.values())
+
+        def send_request(indexes):
+            if len(indexes) == 1:
+                return [self.use_data_connector(connector_info_list[indexes[0]], logger)]
+            batch_info_list = [connector_info_list[index] for index in indexes]
+            connector = self.get_pooled_connector(batch_info_list[0])
+            batch_data_list = ConnectorFactory.use_data_connector_batch(
+                batch_info_list, logger, connector=connector)
+            if self.__use_results_cache(connector, batch_info_list[0]):
+                for connector_info, data in zip(batch_info_list, batch_data_list):
+                    self.__cache_result(connector_info, data)
+            return batch_data_list
+
+        if len(requests) <= 1 or self.n_threads == 1:
+            results = [send_request(indexes) for indexes in requests]
+        else:
+            with ThreadPoolExecutor(max_workers=self.n_threads) as executor:
+                results = list(executor.map(send_request, requests))
+
+        for indexes, request_data_list in zip(requests, results):
+            for index, data in zip(indexes, request_data_list):
+                data_list[index] = data
+        return data_list
+
+    def __use_results_cache(self, connector, connector_info):
+        return self.result_ttl > 0 and connector.get_connector_mode(
+            connector_info) == connector.CONNECTOR_MODE_READ
+
+    def __get_cached_result(self, connector_info):
+        """
+        Return if a valid result is cached for connector info, and a copy of this result
+        so that the cached data cannot be modified by the models
+        """
+        with self.__lock:
+            cached_result = self.__results_cache.get(
+                self.get_request_key(connector_info))
+        if cached_result is not None and time() - cached_result[0] < self.result_ttl:
+            return True, deepcopy(cached_result[1])
+        return False, None
+
+    def __cache_result(self, connector_info, data):
+        request_key = self.get_request_key(connector_info)
+        data = deepcopy(data)
+        with self.__lock:
+            self.__results_cache[request_key] = (time(), data)
+
+    def clear_results_cache(self):
+        """
+        Forget all the cached request results
+        """
+        with self.__lock:
+            self.__results_cache = {}
@@ -15,6 +15,7 @@ limitations under the License.
 '''
 
 from sos_trades_core.execution_engine.data_connector.abstract_data_connector import AbstractDataConnector
+from time import sleep
 
 
 class MockConnector(AbstractDataConnector):
@@ -29,6 +30,8 @@ class MockConnector(AbstractDataConnector):
     CONNECTOR_TYPE = 'connector_type'
     CONNECTOR_DATA = 'connector_data'
     CONNECTOR_REQUEST = 'connector_request'
+    # optional duration in seconds of a request, to simulate a remote server
+    CONNECTOR_DELAY = 'connector_delay'
 
     def __init__(self, data_connection_info=None):
         """
@@ -69,11 +72,37 @@ class MockConnector(AbstractDataConnector):
         self._extract_connection_info(connection_data)
         test_data = None
 
+        sleep(connection_data.get(self.CONNECTOR_DELAY, 0.0))
+
         if self.hostname is not None:
             test_data = 42.0
 
         return test_data
 
+    def get_batch_key(self, connector_info):
+        """
+        Every mock request of a same host can be combined
+        """
+        return MockConnector.NAME
+
+    def load_data_batch(self, connector_info_list):
+        """
+        Method to load several data with a single mock request
+
+        :param connector_info_list: information with for connection and request of each data
+        :type connector_info_list: list of dict
+        """
+        self._extract_connection_info(connector_info_list[0])
+
+        sleep(max(connection_data.get(self.CONNECTOR_DELAY, 0.0)
+                  for connection_data in connector_info_list))
+
+        test_data = None
+        if self.hostname is not None:
+            test_data = 42.0
+
+        return [test_data] * len(connector_info_list)
+
     def write_data(self, connection_data):
         """
         Method to load a data from Dremio
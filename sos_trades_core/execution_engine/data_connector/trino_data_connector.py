@@ -18,7 +18,34 @@ limitations under the License.
 from sos_trades_core.execution_engine.data_connector.abstract_data_connector import AbstractDataConnector
 import trino
 import re
-import copy
+from functools import lru_cache
+from threading import Lock, local
+import numpy as np
+import pandas as pd
+
+
+@lru_cache(maxsize=None)
+def parse_column_type(column_type):
+    """
+    Parse a Trino column type, row types being translated into a dictionary structure
+    with sub columns as key. Parsed types are cached, returned dictionaries must not be modified
+
+    :param column_type: Trino column type, for instance 'row(name1 type_name1, name2 type_name2)'
+    :return: column type, or organized dictionary with row type structure
+    """
+    sub_object = re.findall(TrinoDataConnector.COLUMN_REGEXP, column_type)
+
+    if len(sub_object) > 0:
+        # Split sub string which in the form
+        # 'name1 type_name1, name2 type_name2, ....
+        columns_definition = {}
+        for sub_column in sub_object[0].split(','):
+            sub_column = sub_column.strip().split(' ')
+            columns_definition[sub_column[TrinoDataConnector.COLUMN_NAME]] = parse_column_type(
+                sub_column[TrinoDataConnector.COLUMN_TYPE])
+        return columns_definition
+
+    return column_type
 
 
 class TrinoDataConnector(AbstractDataConnector):
@@ -41,8 +68,28 @@ class TrinoDataConnector(AbstractDataConnector):
     COLUMN_UNKNOWN_1 = 2
     COLUMN_UNKNOWN_2 = 3
     COLUMN_REGEXP = "^row\\((.*)\\)$"
+    # prefix of the columns flagging the rows of each request of a batch
+    REQUEST_FLAG_PREFIX = 'sos_request_'
+
+    # optional output format of the loaded data
+    CONNECTOR_OUTPUT = 'connector_output'
+    # list of dictionaries mapping table columns with their values (default)
+    OUTPUT_RECORDS = 'records'
+    # dataframe with one column per leaf column of the table, named as column.sub_column
+    OUTPUT_DATAFRAME = 'dataframe'
+
+    FLOAT_TYPES = ('double', 'real')
+    INTEGER_TYPES = ('bigint', 'integer', 'smallint', 'tinyint')
+    BOOLEAN_TYPE = 'boolean'
 
+    # number of rows fetched at once
+    fetch_size = 10000
+
+    # columns definition of the tables, by connection info and table name
     table_columns_definition = {}
+    # leaf columns (name, path into a row, type) of the tables, by connection info and table name
+    table_leaf_columns = {}
+    __table_columns_lock = Lock()
 
     def __init__(self, data_connection_info=None):
         """
@@ -57,6 +104,8 @@ class TrinoDataConnector(AbstractDataConnector):
         self.username = None
         self.catalog = None
         self.schema = None
+        # Trino connections are reused by the requests of each thread
+        self.__connections = local()
 
         super().__init__(data_connection_info=data_connection_info)
 
@@ -85,14 +134,7 @@ class TrinoDataConnector(AbstractDataConnector):
 
         self._extract_connection_info(connection_data)
 
-        # Connect to Trino api
-        trino_connection = trino.dbapi.connect(
-            host=self.hostname,
-            port=self.port,
-            user=self.username,
-            catalog=self.catalog,
-            schema=self.schema,
-            http_scheme='http')
+        trino_connection = self.__get_connection()
 
         # Get the data from dremio
         table = connection_data[self.CONNECTOR_TABLE]
@@ -103,30 +145,128 @@ class TrinoDataConnector(AbstractDataConnector):
             sql = f'{sql} WHERE {condition}'
 
         connection_cursor = trino_connection.cursor()
+        table_key = self.__update_table_column(connection_cursor, table)
+
         connection_cursor.execute(sql)
-        rows = connection_cursor.fetchall()
 
-        self.__update_table_column(connection_cursor, table)
+        if self.__get_output_format(connection_data) == self.OUTPUT_DATAFRAME:
+            return self.__build_dataframe(connection_cursor, table_key)
+
+        results = []
+        for rows in self.__fetch_batches(connection_cursor):
+            results.extend(self.__map_data_with_table_column(rows, table_key))
+        return results
+
+    def get_batch_key(self, connector_info):
+        """
+        Requests on the same table with the same output format are combined into a single request
+        """
+        return connector_info[self.CONNECTOR_TABLE], self.__get_output_format(connector_info)
+
+    def load_data_batch(self, connector_info_list):
+        """
+        Method to load with a single request to Trino the data of several requests on the same table.
+        The combined request selects the rows matching any condition, and flags for each row
+        the conditions it matches, so that rows are dispatched back to each request
 
-        return self.__map_data_with_table_column(rows, table)
+        :param connector_info_list: contains the necessary information to connect to Trino API with request
+        :type connector_info_list: list of dict
+
+        :return: list of data in the order of connector_info_list
+        """
+
+        self._extract_connection_info(connector_info_list[0])
+
+        trino_connection = self.__get_connection()
+
+        table = connector_info_list[0][self.CONNECTOR_TABLE]
+        conditions = [connection_data[self.CONNECTOR_CONDITION]
+                      for connection_data in connector_info_list]
+        n_requests = len(conditions)
+        request_flags = ', '.join(
+            f'(({condition}) IS TRUE) AS {self.REQUEST_FLAG_PREFIX}{index}' if condition
+            else f'TRUE AS {self.REQUEST_FLAG_PREFIX}{index}'
+            for index, condition in enumerate(conditions))
+        sql = f'SELECT *, {request_flags} FROM {table}'
+
+        if all(conditions):
+            sql = f'{sql} WHERE ' + ' OR '.join(f'({condition})' for condition in conditions)
+
+        connection_cursor = trino_connection.cursor()
+        table_key = self.__update_table_column(connection_cursor, table)
+
+        connection_cursor.execute(sql)
+
+        flag_columns = [f'{self.REQUEST_FLAG_PREFIX}{index}' for index in range(n_requests)]
+        if self.__get_output_format(connector_info_list[0]) == self.OUTPUT_DATAFRAME:
+            data_df = self.__build_dataframe(connection_cursor, table_key, flag_columns)
+            flags_df = data_df[flag_columns].fillna(False).astype(bool)
+            data_df = data_df.drop(columns=flag_columns)
+            return [data_df[flags_df[flag_column].values].reset_index(drop=True)
+                    for flag_column in flag_columns]
+
+        table_definition = TrinoDataConnector.table_columns_definition[table_key]
+        results = [[] for _ in range(n_requests)]
+        for rows in self.__fetch_batches(connection_cursor):
+            for one_result in rows:
+                values = one_result[:-n_requests]
+                for index, request_flag in enumerate(one_result[-n_requests:]):
+                    if request_flag:
+                        results[index].append(
+                            self.__build_value_dict(table_definition, values))
+        return results
 
     def write_data(self, connection_data):
 
         raise Exception("method not implemented")
 
-    def set_connector_request(self, connector_info, table, condition):
+    def set_connector_request(self, connector_info, table, condition, output_format=None):
         """
         Update connector dictionary with request information
         :param connector_info: dictionary regarding connection information, must map TrinoDataConnector.data_connection_list
         :param table: target table name for the request
         :param condition: condition to implement in SQL format
+        :param output_format: OUTPUT_RECORDS (default) or OUTPUT_DATAFRAME
         :return:
         """
 
         connector_info[TrinoDataConnector.CONNECTOR_TABLE] = table
         connector_info[TrinoDataConnector.CONNECTOR_CONDITION] = condition
+        if output_format is not None:
+            connector_info[TrinoDataConnector.CONNECTOR_OUTPUT] = output_format
         return connector_info
 
+    def __get_output_format(self, connector_info):
+        return connector_info.get(self.CONNECTOR_OUTPUT, self.OUTPUT_RECORDS)
+
+    def __fetch_batches(self, connection_cursor):
+        """
+        Fetch the request result by batches of fetch_size rows
+        """
+        while True:
+            rows = connection_cursor.fetchmany(self.fetch_size)
+            if not rows:
+                break
+            yield rows
+
+    def __get_connection(self):
+        """
+        Return the Trino connection of the current thread, opened at first request
+        or when connection info changed
+        """
+        connection_key = (self.hostname, self.port, self.username, self.catalog, self.schema)
+        if getattr(self.__connections, 'key', None) != connection_key:
+            # Connect to Trino api
+            self.__connections.connection = trino.dbapi.connect(
+                host=self.hostname,
+                port=self.port,
+                user=self.username,
+                catalog=self.catalog,
+                schema=self.schema,
+                http_scheme='http')
+            self.__connections.key = connection_key
+        return self.__connections.connection
+
     def __update_table_column(self, connection_cursor, table):
         """
         Send a request to Trino in order to get the column name of the table use for the request.
@@ -138,13 +278,19 @@ class TrinoDataConnector(AbstractDataConnector):
         :param table: table to get the definition
         :type table: str
 
-        :return: column list
+        :return: key of the table into the columns definition dictionary
         """
 
-        if table not in TrinoDataConnector.table_columns_definition:
+        table_key = (self.hostname, self.port, self.catalog, self.schema, table)
+        with TrinoDataConnector.__table_columns_lock:
+            is_known_table = table_key in TrinoDataConnector.table_columns_definition
+        if not is_known_table:
             connection_cursor.execute(f'SHOW COLUMNS FROM {table}')
             rows = connection_cursor.fetchall()
-            TrinoDataConnector.table_columns_definition[table] = self.__get_column_from_rows(rows)
+            columns_definition = self.__get_column_from_rows(rows)
+            with TrinoDataConnector.__table_columns_lock:
+                TrinoDataConnector.table_columns_definition[table_key] = columns_definition
+        return table_key
 
     def __get_column_from_rows(self, request_rows):
         """
@@ -154,62 +300,119 @@ class TrinoDataConnector(AbstractDataConnector):
         :return: organize dictionary with column structure
         """
 
-        columns_definition = {}
-        for row in request_rows:
-            column_name = row[TrinoDataConnector.COLUMN_NAME]
-            column_type = row[TrinoDataConnector.COLUMN_TYPE]
+        return {row[TrinoDataConnector.COLUMN_NAME]: parse_column_type(row[TrinoDataConnector.COLUMN_TYPE])
+                for row in request_rows}
 
-            sub_object = re.findall(TrinoDataConnector.COLUMN_REGEXP, column_type)
+    def __get_leaf_columns(self, table_key):
+        """
+        Flatten the columns definition of a table into its leaf columns, cached by table
 
-            if len(sub_object) > 0:
-                # Split sub string which in the form
-                # 'name1 type_name1, name2 type_name2, ....
-                split_by_comma = sub_object[0].split(',')
+        :param table_key: key of the table into the columns definition dictionary
+        :return: list of (column name, path of indexes into a row, column type)
+        """
 
-                for index in range(len(split_by_comma)):
-                    split_by_comma[index] = split_by_comma[index].strip().split(' ')
+        leaf_columns = TrinoDataConnector.table_leaf_columns.get(table_key)
+        if leaf_columns is None:
+            leaf_columns = []
 
-                sub_definition = self.__get_column_from_rows(split_by_comma)
-                columns_definition[column_name] = sub_definition
-            else:
-                columns_definition[column_name] = column_type
+            def flatten(definition, name_prefix, path_prefix):
+                for index, (key, sub_definition) in enumerate(definition.items()):
+                    name = f'{name_prefix}.{key}' if name_prefix else key
+                    if isinstance(sub_definition, dict):
+                        flatten(sub_definition, name, path_prefix + (index,))
+                    else:
+                        leaf_columns.append((name, path_prefix + (index,), sub_definition))
 
-        return columns_definition
+            flatten(TrinoDataConnector.table_columns_definition[table_key], '', ())
+            with TrinoDataConnector.__table_columns_lock:
+                TrinoDataConnector.table_leaf_columns[table_key] = leaf_columns
+        return leaf_columns
+
+    def __build_dataframe(self, connection_cursor, table_key, extra_columns=()):
+        """
+        Decode the request result column by column into a dataframe, fetching rows by batches
+
+        :param connection_cursor: cursor of the executed request
+        :param table_key: key of the table into the columns definition dictionary
+        :param extra_columns: names of the boolean columns selected after the table columns
+        :return: dataframe with one column per leaf column of the table and per extra column
+        """
 
-    def __map_data_with_table_column(self, request_rows, table_name):
+        leaf_columns = self.__get_leaf_columns(table_key)
+        n_table_columns = len(TrinoDataConnector.table_columns_definition[table_key])
+        extra_leaf_columns = [(name, (n_table_columns + index,), self.BOOLEAN_TYPE)
+                              for index, name in enumerate(extra_columns)]
+        all_leaf_columns = leaf_columns + extra_leaf_columns
+
+        column_chunks = {name: [] for name, _, _ in all_leaf_columns}
+        for rows in self.__fetch_batches(connection_cursor):
+            # transpose the batch of rows into columns
+            top_columns = list(zip(*rows))
+            for name, path, column_type in all_leaf_columns:
+                values = top_columns[path[0]]
+                for index in path[1:]:
+                    values = [None if value is None else value[index] for value in values]
+                column_chunks[name].append(self.__to_numpy_column(values, column_type))
+
+        return pd.DataFrame({name: self.__concatenate_chunks(chunks)
+                             for name, chunks in column_chunks.items()},
+                            columns=[name for name, _, _ in all_leaf_columns])
+
+    def __to_numpy_column(self, values, column_type):
+        """
+        Convert the values of a column into a numpy array regarding its Trino type,
+        values are kept as a list for types without numpy equivalent
+        """
+        if column_type in self.FLOAT_TYPES:
+            # None values are converted into nan
+            return np.array(values, dtype=np.float64)
+        elif column_type in self.INTEGER_TYPES:
+            if None in values:
+                return np.array(values, dtype=np.float64)
+            return np.array(values, dtype=np.int64)
+        elif column_type == self.BOOLEAN_TYPE and None not in values:
+            return np.array(values, dtype=bool)
+        return list(values)
+
+    def __concatenate_chunks(self, chunks):
+        if len(chunks) == 0:
+            return []
+        if all(isinstance(chunk, np.ndarray) for chunk in chunks):
+            return np.concatenate(chunks)
+        values = []
+        for chunk in chunks:
+            values.extend(chunk.tolist() if isinstance(chunk, np.ndarray) else chunk)
+        return values
+
+    def __map_data_with_table_column(self, request_rows, table_key):
         """
         Using column definition build dictionary  that map attribute name with their values
         :param request_rows: Trino request result
-        :param table_name: corresponding table
+        :param table_key: key of the corresponding table into the columns definition dictionary
         :return: dictionary list that map attribute with their value
         """
 
-        results = []
-
-        for one_result in request_rows:
-            # Get table definition
-            table_definition = copy.deepcopy(TrinoDataConnector.table_columns_definition[table_name])
-            self.__insert_list_value(table_definition, one_result)
-            results.append(table_definition)
+        # Get table definition
+        table_definition = TrinoDataConnector.table_columns_definition[table_key]
 
-        return results
+        return [self.__build_value_dict(table_definition, one_result)
+                for one_result in request_rows]
 
-    def __insert_list_value(self, dictionary_to_update, list_to_insert):
+    def __build_value_dict(self, definition, list_to_insert):
         """
         Manage mapping for a value list regarding dictionary key
-        :param dictionary_to_update: Current dictionary to update
+        :param definition: columns definition of the values
         :param list_to_insert: Datalist to insert
+        :return: new dictionary that map the definition keys with the values
         """
 
-        values_index = 0
-
-        for key in dictionary_to_update.keys():
-            value = list_to_insert[values_index]
-            values_index += 1
-            if isinstance(value, list):
-                self.__insert_list_value(dictionary_to_update[key], value)
+        value_dict = {}
+        for (key, sub_definition), value in zip(definition.items(), list_to_insert):
+            if isinstance(value, list) and isinstance(sub_definition, dict):
+                value_dict[key] = self.__build_value_dict(sub_definition, value)
             else:
-                dictionary_to_update[key] = value
+                value_dict[key] = value
+        return value_dict
 
 
 if __name__ == '__main__':
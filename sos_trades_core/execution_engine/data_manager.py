@@ -17,11 +17,12 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 '''
 import logging
-from copy import copy
+from itertools import count
 from uuid import uuid4
 from hashlib import sha256
 
 from numpy import can_cast
+from gemseo.utils.compare_data_manager_tooling import dict_are_equal
 
 from sos_trades_core.api import get_sos_logger
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
@@ -59,6 +60,15 @@ class DataManager:
     DISC_REF = 'reference'
     STATUS = 'status'
 
+    # change events sent to the treeview and to change listeners
+    VARIABLE_ADDED = 'variable_added'
+    VARIABLE_REMOVED = 'variable_removed'
+    VARIABLE_CHANGED = 'variable_changed'
+    STATUS_CHANGED = 'status_changed'
+
+    # data versions are unique among all data managers
+    __data_versions_counter = count()
+
     def __init__(self, name,
                  root_dir=None,
                  rw_object=None,
@@ -81,6 +91,10 @@ class DataManager:
         self.gemseo_disciplines_id_map = None
         self.cache_map = None
         self.treeview = None
+        # callables called with (event, key, changes) on each DM change
+        self.change_listeners = []
+        # {var_id: version} renewed on each change of the variable
+        self.data_versions = None
         self.reset()
 
         if logger is None:
@@ -118,6 +132,66 @@ class DataManager:
         self.disciplines_dict = {}
         self.disciplines_id_map = {}
         self.no_check_default_variables = []
+        self.data_versions = {}
+
+    def add_change_listener(self, listener):
+        ''' Register a callable called with (event, key, changes) on each DM change
+        key is the variable full name for variable events and the discipline id for status events
+        '''
+        if listener not in self.change_listeners:
+            self.change_listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        ''' Unregister a change listener
+        '''
+        if listener in self.change_listeners:
+            self.change_listeners.remove(listener)
+
+    def update_data_version(self, var_id):
+        ''' Give a new version to the variable var_id, it is renewed each time the variable changes
+        '''
+        self.data_versions[var_id] = next(DataManager.__data_versions_counter)
+
+    def update_data_versions(self, var_f_names):
+        ''' Give a new version to the variables var_f_names that are in the DM
+        '''
+        for var_f_name in var_f_names:
+            if var_f_name in self.data_id_map:
+                self.update_data_version(self.data_id_map[var_f_name])
+
+    def get_data_version(self, var_f_name):
+        ''' Return the version of var_f_name, None if it is not in the DM
+        '''
+        return self.data_versions.get(self.data_id_map.get(var_f_name))
+
+    def notify_change(self, event, key, changes=None):
+        ''' Send a change event to the treeview and to the registered listeners
+
+        :params: event, one of VARIABLE_ADDED, VARIABLE_REMOVED, VARIABLE_CHANGED, STATUS_CHANGED
+        :type: string
+
+        :params: key, variable full name or discipline id (STATUS_CHANGED)
+        :type: string
+
+        :params: changes, changed attributes {attr: value}
+        :type: dict
+        '''
+        if changes is None:
+            changes = {}
+        if event != self.STATUS_CHANGED and key in self.data_id_map:
+            self.update_data_version(self.data_id_map[key])
+        if self.treeview is not None:
+            self.treeview.update_from_data_manager(self, event, key, changes)
+        for listener in self.change_listeners:
+            listener(event, key, changes)
+
+    def update_discipline_status(self, disc_id, status):
+        ''' Set discipline status in disciplines_dict and notify the change
+        '''
+        if self.disciplines_dict[disc_id].get(self.STATUS) != status:
+            self.disciplines_dict[disc_id][self.STATUS] = status
+            self.notify_change(self.STATUS_CHANGED, disc_id, {
+                               self.STATUS: status})
 
     def get_data(self, var_f_name, attr=None):
         ''' Get attr value of var_f_name or all data_dict value of var_f_name (if attr=None)
@@ -164,8 +238,12 @@ class DataManager:
                 if self.data_dict[self.get_data_id(var_f_name)][attr] != val:
                     self.data_dict[self.get_data_id(var_f_name)][attr] = val
                     self.no_change = False
+                    self.notify_change(
+                        self.VARIABLE_CHANGED, var_f_name, {attr: val})
             else:
                 self.data_dict[self.get_data_id(var_f_name)][attr] = val
+                self.notify_change(
+                    self.VARIABLE_CHANGED, var_f_name, {attr: val})
         else:
             msg = f"Try to update metadata of variable {var_f_name} that does"
             msg += f" not exists as I/O of any discipline"
@@ -268,11 +346,36 @@ class DataManager:
     def generate_data_id_map(self):
         ''' Generate data_id_map with data_dict
         '''
-        self.data_id_map = {}
-        data_dict = copy(self.data_dict)
-        for var_id in data_dict.keys():
-            var_f_name = self.get_var_full_name(var_id)
-            self.data_id_map[var_f_name] = var_id
+        self.data_id_map = {var_data[NS_REFERENCE].get_var_full_name(var_data[VAR_NAME]): var_id
+                            for var_id, var_data in self.data_dict.items()}
+
+    def update_data_id_map(self, updated_namespaces):
+        ''' Update data_id_map keys of variables referencing updated namespaces only
+
+        :params: updated_namespaces, list of (namespace, value before update)
+        :type: list of tuple
+        '''
+        old_ns_values = {id(namespace): old_value for namespace,
+                         old_value in updated_namespaces}
+
+        old_full_names = []
+        new_full_names = []
+        for var_id, var_data in self.data_dict.items():
+            ns_reference = var_data[NS_REFERENCE]
+            if id(ns_reference) in old_ns_values:
+                var_name = var_data[VAR_NAME]
+                old_full_names.append((self.ns_manager.compose_ns(
+                    [old_ns_values[id(ns_reference)], var_name]), var_id))
+                new_full_names.append(
+                    (ns_reference.get_var_full_name(var_name), var_id))
+
+        # remove all old keys before adding the new ones, a new full name
+        # can be the old full name of another variable
+        for old_full_name, var_id in old_full_names:
+            if self.data_id_map.get(old_full_name) == var_id:
+                del self.data_id_map[old_full_name]
+        for new_full_name, var_id in new_full_names:
+            self.data_id_map[new_full_name] = var_id
 
     def generate_disciplines_id_map(self):
         ''' Generate disciplines_id_map with disciplines_dict
@@ -282,18 +385,61 @@ class DataManager:
             disc_f_name = self.get_disc_full_name(disc_id)
             self.add_disc_id_to_disc_id_map(disc_f_name, disc_id)
 
-    def set_values_from_dict(self, values_dict, full_ns_keys=True):
+    def set_values_from_dict(self, values_dict, full_ns_keys=True, check_keys=True, return_changed_keys=False):
         ''' Set values in data_dict from dict with namespaced keys 
             if full_ns_keys (not uuid), try to get its uuid correspondency through get_data_id function
-        '''
-        keys_to_map = self.data_id_map.keys() if full_ns_keys else self.data_id_map.values()
+            if not check_keys, keys are not validated (for trusted internal callers),
+            an unknown key raises a KeyError
+            if return_changed_keys, values are compared to the previous ones
+            and the set of keys of values_dict whose value has changed is returned
+        '''
+        # data_id_map is keyed by full names and data_dict by uuids
+        keys_to_map = self.data_id_map if full_ns_keys else self.data_dict
+        if check_keys:
+            unknown_keys = [key for key in values_dict if key not in keys_to_map]
+            if len(unknown_keys) > 0:
+                raise ValueError(
+                    f'{unknown_keys[0]} does not exist in data manager')
+
+        notify = self.treeview is not None or len(self.change_listeners) > 0
+        changed_keys = set()
         for key, value in values_dict.items():
-            if not key in keys_to_map:
-                raise ValueError(f'{key} does not exist in data manager')
-            k = self.get_data_id(key) if full_ns_keys else key
+            k = self.data_id_map[key] if full_ns_keys else key
             # if self.data_dict[k][SoSDiscipline.VISIBILITY] == INTERNAL_VISIBILITY:
             #     raise Exception(f'It is not possible to update the variable {k} which has a visibility Internal')
-            self.data_dict[k][VALUE] = value
+            var_data = self.data_dict[k]
+            if return_changed_keys:
+                if not self.is_value_changed(var_data[VALUE], value):
+                    # keep the given object referenced as before
+                    var_data[VALUE] = value
+                    continue
+                changed_keys.add(key)
+            var_data[VALUE] = value
+            if notify:
+                self.notify_change(self.VARIABLE_CHANGED,
+                                   key if full_ns_keys else self.get_var_full_name(k), {VALUE: value})
+            else:
+                self.update_data_version(k)
+
+        if return_changed_keys:
+            return changed_keys
+
+    @staticmethod
+    def is_value_changed(old_value, new_value):
+        ''' Return True if new_value is different from old_value
+        '''
+        if old_value is new_value:
+            # a mutable value (array, dataframe, dict...) may have been
+            # modified in place
+            return not isinstance(old_value, (int, float, complex, str, bool, type(None)))
+        try:
+            return bool(old_value != new_value)
+        except (ValueError, TypeError):
+            # arrays, dataframes or containers of them
+            try:
+                return not dict_are_equal({VALUE: old_value}, {VALUE: new_value})
+            except (ValueError, TypeError, AttributeError, KeyError):
+                return True
 
     def convert_data_dict_with_full_name(self):
         ''' Return data_dict with namespaced keys
@@ -453,6 +599,7 @@ class DataManager:
                         if self.data_dict[var_id][VALUE] is not None:
                             disc_dict[var_name][VALUE] = self.data_dict[var_id][VALUE]
                         self.data_dict[var_id] = disc_dict[var_name]
+                        self.update_data_version(var_id)
                 if not disc_id in self.data_dict[var_id][DISCIPLINES_DEPENDENCIES]:
                     self.data_dict[var_id][DISCIPLINES_DEPENDENCIES].append(
                         disc_id)
@@ -465,14 +612,14 @@ class DataManager:
                 self.no_change = False
                 self.data_dict[var_id] = disc_dict[var_name]
                 self.data_id_map[var_f_name] = var_id
+                self.notify_change(self.VARIABLE_ADDED, var_f_name)
             # END update method
 
         for var_name in disc_dict.keys():
             io_type = disc_dict[var_name][IO_TYPE]
             ns_reference = disc_dict[var_name][NS_REFERENCE]
             complete_var_name = disc_dict[var_name][VAR_NAME]
-            var_f_name = self.ns_manager.compose_ns([ns_reference.value,
-                                                     complete_var_name])
+            var_f_name = ns_reference.get_var_full_name(complete_var_name)
             _dm_update(var_name, io_type, var_f_name)
 
     def update_disciplines_dict(self, disc_id, reference, disc_f_name):
@@ -520,6 +667,8 @@ class DataManager:
         '''
         self.treeview = TreeView(
             name=self.name, no_data=no_data, read_only=read_only)
+        # the treeview is then patched by update_from_data_manager on DM
+        # changes
         self.treeview.create_tree_node(data_manager=self,
                                        root_process=root_process,
                                        process_module=process_module,
@@ -571,6 +720,9 @@ class DataManager:
                         # discipline dependency
                         del self.data_dict[var_id]
                         del self.data_id_map[var_f_name]
+                        self.data_versions.pop(var_id, None)
+                        self.notify_change(
+                            self.VARIABLE_REMOVED, var_f_name)
                 else:
                     pass
 
@@ -683,7 +835,7 @@ class DataManager:
         '''
         var_name = self.get_var_name_from_uid(var_id)
         ns_reference = self.data_dict[var_id][SoSDiscipline.NS_REFERENCE]
-        var_f_name = self.ns_manager.compose_ns([ns_reference.value, var_name])
+        var_f_name = ns_reference.get_var_full_name(var_name)
         return var_f_name
 
     def get_disc_full_name(self, disc_id):
@@ -17,17 +17,11 @@ from sos_trades_core.execution_engine.design_var.design_var import DesignVar
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
 import numpy as np
 import pandas as pd
-from plotly import graph_objects as go
-import plotly.colors as plt_color
 
 from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import InstantiatedPlotlyNativeChart
 from sos_trades_core.tools.post_processing.charts.chart_filter import ChartFilter
 
 
-color_list = plt_color.qualitative.Plotly
-color_list.extend(plt_color.qualitative.Alphabet)
-
-
 class DesignVarDiscipline(SoSDiscipline):
 
     # ontology information
@@ -262,7 +256,10 @@ class DesignVarDiscipline(SoSDiscipline):
         Input: parameter (name), parameter values, design_space
         Output: InstantiatedPlotlyNativeChart
         """
+        from plotly import graph_objects as go
+        import plotly.colors as plt_color
 
+        color_list = plt_color.qualitative.Plotly
         design_space = self.get_sosdisc_inputs('design_space')
         pts = self.get_sosdisc_inputs(parameter)
         ctrl_pts = list(pts)
@@ -27,7 +27,7 @@ from sos_trades_core.execution_engine.scattermaps_manager import ScatterMapsMana
 from sos_trades_core.execution_engine.post_processing_manager import PostProcessingManager
 from sos_trades_core.execution_engine.sos_coupling import SoSCoupling
 from sos_trades_core.execution_engine.data_connector.data_connector_factory import (
-    PersistentConnectorContainer, ConnectorFactory)
+    PersistentConnectorContainer)
 
 
 DEFAULT_FACTORY_NAME = 'default_factory'
@@ -173,21 +173,27 @@ class ExecutionEngine:
         """
 
         dm_data_dict = self.dm.data_dict
+        variables_with_connector = []
         for variable_id in dm_data_dict:
-            data = None
             # if connector is needed
             if SoSDiscipline.CONNECTOR_DATA in dm_data_dict[variable_id]:
                 if dm_data_dict[variable_id][SoSDiscipline.CONNECTOR_DATA] is not None:
                     if dm_data_dict[variable_id][SoSDiscipline.IO_TYPE] == SoSDiscipline.IO_TYPE_IN:
                         # if variable io_type is in --> use data_connector
-                        data = ConnectorFactory.use_data_connector(
-                            dm_data_dict[variable_id][SoSDiscipline.CONNECTOR_DATA],
-                            self.logger)
+                        variables_with_connector.append(variable_id)
                     # else, variable is an output of a disc --> no use of data
                     # connector
 
+        # requests are sent concurrently through pooled connectors
+        data_list = self.__connector_container.use_data_connectors(
+            [dm_data_dict[variable_id][SoSDiscipline.CONNECTOR_DATA]
+             for variable_id in variables_with_connector],
+            self.logger)
+
+        for variable_id, data in zip(variables_with_connector, data_list):
             if data is not None:  # update variable value
                 dm_data_dict[variable_id][SoSDiscipline.VALUE] = data
+                self.dm.update_data_version(variable_id)
 
     def __configure_io(self):
         self.logger.info('configuring ...')
@@ -239,11 +245,19 @@ class ExecutionEngine:
 
     def get_treeview(self, no_data=False, read_only=False):
         ''' returns the treenode build based on datamanager '''
-        if self.dm.treeview is None:
+        if self.dm.treeview is None or self.dm.treeview.structure_changed:
             self.dm.create_treeview(
                 self.root_process, self.__factory.process_module, no_data, read_only)
         return self.dm.treeview
 
+    def get_treeview_changes(self):
+        ''' returns changes applied to the treeview since the last call
+        (status and variables attributes by treenode namespace),
+        None if the treeview has to be built and sent again '''
+        if self.dm.treeview is None or self.dm.treeview.structure_changed:
+            return None
+        return self.dm.treeview.get_changes()
+
     def display_treeview_nodes(self, display_variables=None):
         '''
         Display the treeview and create it if not 
@@ -331,10 +345,12 @@ class ExecutionEngine:
                 if isinstance(status_to_load, dict):
                     if self.dm.disciplines_dict[discipline_key]['classname'] in status_to_load:
                         status = status_to_load[self.dm.disciplines_dict[discipline_key]['classname']]
-                        self.dm.disciplines_dict[discipline_key]['status'] = status
+                        self.dm.update_discipline_status(
+                            discipline_key, status)
                         dm_discipline.status = status
                 else:
-                    self.dm.disciplines_dict[discipline_key]['status'] = status_to_load
+                    self.dm.update_discipline_status(
+                        discipline_key, status_to_load)
                     dm_discipline.status = status_to_load
 
     def get_anonimated_disciplines_status_dict(self):
@@ -376,6 +392,14 @@ class ExecutionEngine:
 
         return converted_dict
 
+    def get_anonimated_data_versions(self):
+        '''
+        return the data versions of the dm variables using anonimizing keys,
+        to find the variables changed since a previous serialisation
+        '''
+        return {self.__anonymize_key(var_f_name): self.dm.get_data_version(var_f_name)
+                for var_f_name in self.dm.data_id_map}
+
     def convert_input_dict_into_dict(self, input_dict):
 
         dm_dict = {key: {SoSDiscipline.VALUE: value}
@@ -431,6 +455,7 @@ class ExecutionEngine:
                     # Variables are only set once
                     if value[SoSDiscipline.IO_TYPE] == SoSDiscipline.IO_TYPE_IN and not key in checked_keys:
                         value['value'] = convert_data_cache[key]['value']
+                        self.dm.update_data_version(key)
                         checked_keys.append(key)
 
             self.__configure_io()
@@ -454,6 +479,7 @@ class ExecutionEngine:
             if key in convert_data_cache:
                 if value[SoSDiscipline.IO_TYPE] == SoSDiscipline.IO_TYPE_OUT:
                     value['value'] = convert_data_cache[key]['value']
+                    self.dm.update_data_version(key)
 
         if self.__yield_method is not None:
             self.__yield_method()
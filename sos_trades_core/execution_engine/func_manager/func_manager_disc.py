@@ -34,7 +34,6 @@ import pandas as pd
 import numpy as np
 from math import isnan
 import csv
-from plotly import graph_objects as go
 
 from sos_trades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
     InstantiatedPlotlyNativeChart
@@ -916,6 +915,7 @@ class FunctionManagerDisc(SoSDiscipline):
         equality constraints) names and name of the plot
         Ouput: instantiated plotly chart
         """
+        from plotly import graph_objects as go
         chart_name = f'{name} wrt iterations'
         fig = go.Figure()
         for parameter in main_parameters['variable']:
@@ -1007,6 +1007,7 @@ class FunctionManagerDisc(SoSDiscipline):
         and name of the plot
         Ouput: instantiated plotly chart
         """
+        from plotly import graph_objects as go
         chart_name = f'{name} wrt iterations'
         fig = go.Figure()
         for parameter in main_parameters['variable']:
@@ -1141,6 +1142,7 @@ class FunctionManagerDisc(SoSDiscipline):
         Inputs: parameters_dict[variable,parents,children,weights,aggr_type] and name of the plot
         Output: instantiated plotly chart
         """
+        from plotly import graph_objects as go
         chart_name = f'{name} wrt iterations'
         fig = go.Figure()
         # Remove entries with weight = 0.0
@@ -1310,6 +1312,7 @@ class FunctionManagerDisc(SoSDiscipline):
         Inputs: objective name, name of the plot and boolean for log scale
         Ouput: instantiated plotly chart
         """
+        from plotly import graph_objects as go
 
         chart_name = f'objective wrt iterations with constraints (colored)'
         fig = go.Figure()
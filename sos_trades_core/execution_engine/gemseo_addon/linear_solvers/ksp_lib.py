@@ -16,14 +16,14 @@ limitations under the License.
 """A PETSC KSP linear solvers library wrapper."""
 import logging
 import sys
+from functools import lru_cache
+from importlib.util import find_spec
 from typing import Any
 from typing import Dict
 from typing import Optional
 from typing import Union
 
-import petsc4py  # pylint: disable-msg=E0401
 from gemseo.algos.linear_solvers.linear_solver_lib import LinearSolverLib
-from gemseo.algos.linear_solvers.ksp_lib import _convert_ndarray_to_mat_or_vec  # pylint: disable-msg=E0401
 from numpy import arange
 from numpy import array
 from numpy import ndarray
@@ -32,10 +32,10 @@ from scipy.sparse import csr_matrix
 from scipy.sparse import find
 from scipy.sparse.base import issparse
 
-# Must be done before from petsc4py import PETSc, this loads the options from
-# command args in the options database.
-petsc4py.init(sys.argv)
-from petsc4py import PETSc  # pylint: disable-msg=E0401
+# The library is not available (and not registered by the gemseo factory)
+# without petsc4py, but petsc4py itself is only imported at first solve
+if find_spec('petsc4py') is None:
+    raise ImportError('petsc4py is required by PETSc KSP linear solvers')
 
 LOGGER = logging.getLogger(__name__)
 
@@ -60,6 +60,24 @@ KSP_CONVERGED_REASON = {1: 'KSP_CONVERGED_RTOL_NORMAL',
                         -11: 'KSP_DIVERGED_PC_FAILED',
                         0: 'KSP_CONVERGED_ITERATING'}
 
+
+@lru_cache(maxsize=None)
+def import_petsc():
+    """Import petsc4py, PETSc and the gemseo conversion function on first call.
+
+    Returns:
+        petsc4py module, PETSc module and _convert_ndarray_to_mat_or_vec function
+    """
+    import petsc4py  # pylint: disable-msg=E0401
+    # Must be done before from petsc4py import PETSc, this loads the options from
+    # command args in the options database.
+    petsc4py.init(sys.argv)
+    from petsc4py import PETSc  # pylint: disable-msg=E0401
+    from gemseo.algos.linear_solvers.ksp_lib import _convert_ndarray_to_mat_or_vec  # pylint: disable-msg=E0401
+
+    return petsc4py, PETSc, _convert_ndarray_to_mat_or_vec
+
+
 # TODO: inherit from PetscKSPAlgo of GEMSEO
 
 
@@ -250,6 +268,7 @@ class PetscKSPAlgos(LinearSolverLib):
         return self.problem.solution
 
     def _run_petsc_strategy(self, **options):
+        petsc4py, PETSc, _convert_ndarray_to_mat_or_vec = import_petsc()
         # Initialize the KSP solver.
         # Create the options database
         options_cmd = options.get("options_cmd")
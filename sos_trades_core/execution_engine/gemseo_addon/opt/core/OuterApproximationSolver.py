@@ -17,20 +17,19 @@ from gemseo.core.mdofunctions.mdo_function import MDOFunction
 from gemseo.algos.opt_problem import OptimizationProblem
 from gemseo.algos.design_space import DesignSpace
 from gemseo.algos.opt.opt_factory import OptimizersFactory
-from gemseo.utils.data_conversion import split_array_to_dict_of_arrays
 
 from gemseo.algos.driver_lib import DriverLib
 from gemseo.algos.opt.opt_lib import OptimizationLibrary
 
 import logging
-from numpy import array, append, int32, atleast_2d, concatenate
-from copy import deepcopy
+import time
+from numpy import array, append, int32, atleast_1d, atleast_2d, concatenate, hstack, ones, rint, zeros
+from scipy.sparse import csr_matrix, vstack
 import cvxpy as cp
 from pandas.core.frame import DataFrame
 import pandas as pd
 
 # TODO list : 
-# * avoid re-building the NLP
 # * look for a solution to get output dimensions for cases where len(outvars)>0
 # * exclude unfeasible integer solutions
 # * map the max iter termination criteria
@@ -51,6 +50,7 @@ class OuterApproximationSolver(object):
     ALGO_OPTIONS_MILP = "algo_options_MILP"
     ALGO_OPTIONS_NLP = "algo_options_NLP"
     ALGO_NLP = "algo_NLP"
+    USE_NLP_CACHE = "use_nlp_cache"
     NORMALIZE_DESIGN_SPACE_OPTION = DriverLib.NORMALIZE_DESIGN_SPACE_OPTION
     MAX_ITER = OptimizationLibrary.MAX_ITER
     F_TOL_ABS = OptimizationLibrary.F_TOL_ABS
@@ -81,6 +81,19 @@ class OuterApproximationSolver(object):
         self.ind_by_varname, self.size_by_varname = None, None
         self.opt_history = None
         self.iter_nb = None
+        # primal problem cvxpy variables and bounds, built once
+        self.primal_eta = None
+        self.primal_vars = None
+        self.primal_bounds_cst = None
+        # accumulated linearization cuts A.[x, eta] <= b stored as a sparse
+        # matrix
+        self.cuts_matrix = None
+        self.cuts_rhs = array([])
+        # NLP solutions by integer assignment already solved
+        self.use_nlp_cache = True
+        self.nlp_solutions_cache = {}
+        self.n_nlp_cache_hits = 0
+        self.iteration_timings = []
     
     def set_options(self, **options):
         
@@ -91,6 +104,7 @@ class OuterApproximationSolver(object):
         self.algo_options_MILP = options[self.ALGO_OPTIONS_MILP]
         self.algo_NLP = options[self.ALGO_NLP]
         self.algo_options_NLP = options[self.ALGO_OPTIONS_NLP]
+        self.use_nlp_cache = options.get(self.USE_NLP_CACHE, True)
 
     def init_solver(self):
         msg = "\n\n***\nOuterApproximation Initialization\n***"
@@ -193,117 +207,75 @@ class OuterApproximationSolver(object):
         ''' build primal problem without hyperplanes
         (will be updated at other iterations)
         '''
+        full_dspace = self.full_problem.design_space
         # design variables definition
         eta = cp.Variable(name=self.ETA)
+        self.primal_eta = eta
+
+        # x is created once with associated bounds constraints
+        self.primal_vars = {}
+        self.primal_bounds_cst = []
+        current_x_dict = full_dspace.get_current_x_dict()
+        for v in full_dspace.variables_names:
+            # create the design variable as cvxpy object
+            integer = v not in self.float_varnames
+            dv = cp.Variable(current_x_dict[v].shape, v, integer=integer)
+            self.primal_vars[v] = dv
+            # build the constraints on the lower and upper bounds
+            self.primal_bounds_cst.append(full_dspace.get_lower_bounds([v]) <= dv)
+            self.primal_bounds_cst.append(dv <= full_dspace.get_upper_bounds([v]))
+
+        self.cuts_matrix = None
+        self.cuts_rhs = array([])
 
         # objective definition
         obj = cp.Minimize(eta)
-        
-#         # constraints definition
-#         # (could be handled in termination criteria)
-#         ub = cp.Parameter(name=self.UPPER_BOUND)
-#         constraints = [eta <= ub - self.epsilon] # eta <= U^(k) - eps
-        
+
         # problem definition
-        prob = cp.Problem(obj) #, constraints
-        
+        prob = cp.Problem(obj)
+
         return prob
-    
+
+    def add_linearization_cuts(self, x0):
+        ''' add the supporting hyperplanes of the objective and constraints at x0
+        to the sparse cuts matrix, as rows of A.[x, eta] <= b
+        - objective : f(x0) + df/dx(x0) . (x - x0) <= eta
+        - constraints : c(x0) + dc/dx(x0) . (x - x0) <= 0
+        '''
+        objective = self.full_problem.objective
+        obj_jac = atleast_2d(objective.jac(x0))
+        obj_f = atleast_1d(objective.func(x0))
+        cuts_rows = [hstack([obj_jac, -ones((obj_jac.shape[0], 1))])]
+        cuts_rhs = [obj_jac @ x0 - obj_f]
+
+        for c in self.full_problem.constraints:
+            c_jac = atleast_2d(c.jac(x0))
+            cst_f = atleast_1d(c.func(x0))
+            cuts_rows.append(hstack([c_jac, zeros((c_jac.shape[0], 1))]))
+            cuts_rhs.append(c_jac @ x0 - cst_f)
+
+        new_cuts = csr_matrix(concatenate(cuts_rows))
+        if self.cuts_matrix is None:
+            self.cuts_matrix = new_cuts
+        else:
+            self.cuts_matrix = vstack([self.cuts_matrix, new_cuts], format='csr')
+        self.cuts_rhs = concatenate([self.cuts_rhs] + cuts_rhs)
+
     def update_primal_problem(self, old_primal_pb, dual_pb, upper_bnd, x0):
         ''' update primal problem with new upper bound value U^{(k)}
         and supporting hyperplanes (linearizations of objecgives and constraints
         of the NLP(x_int)^{(k)} )
         '''
-        full_dspace = self.full_problem.design_space
-        x0_dict = full_dspace.array_to_dict(x0)
-        #- gather eta design variable
-        eta = old_primal_pb.var_dict[self.ETA]
-        #- gather x design variable if exists (for iterations > 0)
-        bounds_cst = []
-        if len(old_primal_pb.var_dict) > 1:
-            # if there the other design variables than eta have already been created
-            # wee keep them and there is no need to re-build the bound constraints
-            all_vars = old_primal_pb.var_dict
-        else:
-            # if not, x is created with associated bounds constraints
-            # create float variables and associated bound constraints
-            all_vars = {}
-            for v in full_dspace.variables_names:
-                # get the dimensions of the variable
-                v_shape = full_dspace.get_current_x_dict()[v].shape
-                # create the design variable as cvxpy object
-                if v in self.float_varnames:
-                    integer=False
-                else:
-                    integer=True
-                dv = cp.Variable(v_shape, v, integer=integer)
-                all_vars[v] = dv
-                # build the constraint on the lower bounds
-                lb = full_dspace.get_lower_bounds([v])
-                bounds_cst.append(lb <= dv)
-                # build the constraint on the upper bound
-                ub = full_dspace.get_upper_bounds([v])
-                bounds_cst.append(dv <= ub)
-                
-        #- setup of primal problem constraints :
-        #- build dual pb objective linearization
-        obj_jac = atleast_2d(self.full_problem.objective.jac(x0))
-        data_size = deepcopy(self.size_by_varname)
-        data_size.update({self.full_problem.objective.outvars[0]: obj_jac.shape[0]})
-        obj_jac_dict = split_array_to_dict_of_arrays(obj_jac,
-                                         data_size,
-                                         self.full_problem.objective.outvars, 
-                                         self.full_problem.design_space.variables_names,
-                                         )
-        # get objective function from main optimization problem
-        obj_f = self.full_problem.objective.func(x0)
-        # builds linearization of the objective wrt all design variables
-        obj_lin = obj_f
-        for v in self.full_problem.design_space.variables_names:
-            x_v = all_vars[v]
-            x0_v = x0_dict[v]
-            dx = x_v - x0_v
-            obj_lin += obj_jac_dict[self.full_problem.objective.outvars[0]][v] @ dx
-        # set the objective hyperplane as constraint
-        obj_lin = obj_lin <= eta
-        
-        #- build dual pb constraints linearization : c(x0) + dc/dx(x0) . (x - x0) <= 0
-        cst_linearized = []
-        # for each constraint function from main optimization problem
-        # builds linearization of the constraint wrt all design variables
-        for c in self.full_problem.constraints:
-            # compute c(x0)
-            cst_f = c.func(x0)
-            # get dc/dx(x0)
-            c_jac = atleast_2d(c.jac(x0))
-            data_size = deepcopy(self.size_by_varname)
-            data_size.update({c.outvars[0]: c_jac.shape[0]})
-            c_jac_dict = split_array_to_dict_of_arrays(c_jac, 
-                                            data_size,
-                                             c.outvars, 
-                                             self.full_problem.design_space.variables_names,
-                                             )
-            # compute c(x0) + dc/dx(x0) . (x - x0)
-            cst_lin = cst_f
-            for v in self.full_problem.design_space.variables_names:
-                x_v = all_vars[v]
-                x0_v = x0_dict[v]
-                dx = x_v - x0_v
-                cst_lin += c_jac_dict[c.outvars[0]][v] @ dx
-                
-            cst_linearized.append(cst_lin <= 0)
-        
+        self.add_linearization_cuts(x0)
+
+        x_eta = cp.hstack([self.primal_vars[v] for v in self.full_problem.design_space.variables_names]
+                          + [cp.reshape(self.primal_eta, (1,))])
+
         # problem re-definition (cvxpy does not allow in-memory problem updates, excepted parameter values)
-        hyperplanes = [obj_lin] + cst_linearized
-        primal_pb = cp.Problem(old_primal_pb.objective, 
-                               old_primal_pb.constraints + hyperplanes + bounds_cst)
-        
-        print("\n\n")
-        print("HERE")
-        print("obj " + str(old_primal_pb.objective))
-        for c in old_primal_pb.constraints + hyperplanes + bounds_cst:
-            print("c " + str(c))
-        
+        # all the cuts are gathered in a single sparse matrix constraint
+        primal_pb = cp.Problem(old_primal_pb.objective,
+                               [self.cuts_matrix @ x_eta <= self.cuts_rhs] + self.primal_bounds_cst)
+
 ## handled in the termination criteria
 #         # update upper bound parameter value
 #         ub = primal_pb.param_dict[self.UPPER_BOUND]
@@ -416,8 +388,9 @@ class OuterApproximationSolver(object):
         return pb
     
      
-    def update_dual_problem(self, nlp, integer_values):
+    def update_dual_problem(self, nlp, integer_values, x0_cont=None):
         ''' Updates frozen values of NLP problem with those provided
+        and warm-starts it from the continuous values x0_cont if provided
         '''
         # reset the database values
         # This is mandatory to avoid wrong cache use through restricted functions
@@ -428,6 +401,9 @@ class OuterApproximationSolver(object):
         for f in nlp.nonproc_constraints:
             f.set_frozen_value(integer_values)
 
+        if x0_cont is not None:
+            nlp.design_space.set_current_x(x0_cont)
+
         return nlp
     
     def solve_dual_problem(self, nlp):
@@ -501,9 +477,13 @@ class OuterApproximationSolver(object):
         ''' Solve the optimization problem : iterative process
         '''
         self.iter_nb = 0
+        self.nlp_solutions_cache = {}
+        self.n_nlp_cache_hits = 0
+        self.iteration_timings = []
         
         # init integer solution
         xopt_int = self.x0_integer
+        xopt_cont = None
         
         # initialize NLP(x0_integer)
         nlp = self.build_dual_problem(xopt_int)
@@ -516,13 +496,39 @@ class OuterApproximationSolver(object):
             msg += "\nOuterApproximation Iteration %i\n"%self.iter_nb
             msg += "*"*20 + "\n\n"
             LOGGER.info(msg)
+            timings = {self.OA_ITER_NB: self.iter_nb}
+
+            int_key = tuple(rint(xopt_int))
+            if self.use_nlp_cache and int_key in self.nlp_solutions_cache:
+                # the NLP at this integer solution is served from the cache
+                nlp_sol = self.nlp_solutions_cache[int_key]
+                self.n_nlp_cache_hits += 1
+                LOGGER.info("NLP at integer solution %s served from the cache" % str(xopt_int))
+                xsol = self._build_full_vect(nlp_sol.x_opt, xopt_int)
+                self.x_solution_history.append(xsol)
+                self.update_upper_bounds_history(nlp_sol)
+                timings.update({'NLP': 0., 'cuts': 0., 'MILP': 0.})
+                self.iteration_timings.append(timings)
+                self.iter_nb += 1
+
+                # its linearizations are already in the primal problem, which
+                # is unchanged and would return the same integer solution
+                # again: stop whatever the termination criteria decides
+                if self._termination_criteria(self.iter_nb, mip):
+                    LOGGER.warning("Upper and lower bounds tolerance not reached but no new cut can be generated, "
+                                   "OuterApproximation stops at iteration %i" % self.iter_nb)
+                break
 
-            # update NLP(integer solution iteration k)
-            nlp = self.update_dual_problem(nlp, xopt_int)
+            # update NLP(integer solution iteration k), warm-started from the
+            # previous continuous solution
+            t_start = time.time()
+            nlp = self.update_dual_problem(nlp, xopt_int, xopt_cont)
 
             # compute argmin NLP(integer solution iteration k)
             nlp_sol = self.solve_dual_problem(nlp)
+            self.nlp_solutions_cache[int_key] = nlp_sol
             xopt_cont = nlp_sol.x_opt
+            timings['NLP'] = time.time() - t_start
             
             # update the full solution vector x
             xsol = self._build_full_vect(xopt_cont, xopt_int)
@@ -530,21 +536,34 @@ class OuterApproximationSolver(object):
             # update x history
             self.x_solution_history.append(xsol)
             self.update_upper_bounds_history(nlp_sol)
-            
+
             # update primal problem
+            t_start = time.time()
             uk = self.upper_bounds[self.iter_nb]
             mip = self.update_primal_problem(mip, nlp, uk, xsol)
+            timings['cuts'] = time.time() - t_start
             
             # solve primal problem
+            t_start = time.time()
             xopt_int = self.solve_primal_problem(mip)
+            timings['MILP'] = time.time() - t_start
+            self.iteration_timings.append(timings)
 
             LOGGER.info("UPPER BOUNDS")
             LOGGER.info(self.upper_bounds)
             LOGGER.info("LOWER BOUNDS")
             LOGGER.info(self.lower_bounds)
+            LOGGER.info("ITERATION TIMINGS (s)")
+            LOGGER.info(timings)
             
             self.iter_nb +=1
         
+    def get_iteration_timings(self):
+        ''' returns the dataframe of the time spent by iteration in NLP solve,
+        cuts generation and MILP solve
+        '''
+        return DataFrame(self.iteration_timings)
+
 #         nlp = self.build_dual_pb(xopt_int)
 #         nlp_sol = self.solve_dual(nlp)
 #         xopt_cont = nlp_sol.x_opt
@@ -26,8 +26,6 @@ from numpy import isfinite, real
 
 from gemseo.algos.opt.opt_lib import OptimizationLibrary
 
-import cma
-
 standard_library.install_aliases()
 
 
@@ -111,6 +109,7 @@ class CMAESOpt(OptimizationLibrary):
 
         :param options: the options dict for the algorithm
         """
+        import cma
         # remove normalization from options for algo
         normalize_ds = options.pop(self.NORMALIZE_DESIGN_SPACE_OPTION, True)
         # Get the normalized bounds:
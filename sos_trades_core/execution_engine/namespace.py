@@ -16,6 +16,8 @@ limitations under the License.
 '''
 mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 '''
+NS_SEP = '.'
+
 
 class Namespace:
     '''
@@ -29,16 +31,37 @@ class Namespace:
         self.name = name
         self.value = value
         self.dependency_disc_list = []  # list of dependency disciplines
+        # full names of variables composed with the namespace value
+        self.__var_full_names = {}
 
     def to_dict(self):
         ''' Method that serialize as dict a Namespace object '''
-        return self.__dict__
+        return {'name': self.name,
+                'value': self.value,
+                'dependency_disc_list': self.dependency_disc_list}
 
     def update_value(self, val):
         '''
         Mechanism to update value
         '''
         self.value = val
+        # full names composed with the previous value are outdated
+        self.__var_full_names = {}
+
+    def get_var_full_name(self, var_name):
+        '''
+        Get the full name of a variable in the namespace
+        Full names are composed once and kept until the namespace value is updated
+        '''
+        try:
+            return self.__var_full_names[var_name]
+        except KeyError:
+            if self.value is None:
+                var_f_name = var_name
+            else:
+                var_f_name = f'{self.value}{NS_SEP}{var_name}'
+            self.__var_full_names[var_name] = var_f_name
+            return var_f_name
 
     def get_value(self):
         '''
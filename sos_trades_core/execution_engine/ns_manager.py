@@ -17,9 +17,10 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 '''
 from copy import copy
+from contextlib import contextmanager
 
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
-from sos_trades_core.execution_engine.namespace import Namespace
+from sos_trades_core.execution_engine.namespace import Namespace, NS_SEP
 from sos_trades_core.api import get_sos_logger
 
 IO_TYPE_IN = SoSDiscipline.IO_TYPE_IN
@@ -27,7 +28,6 @@ IO_TYPE_OUT = SoSDiscipline.IO_TYPE_OUT
 SHARED_VISIBILITY = SoSDiscipline.SHARED_VISIBILITY
 LOCAL_VISIBILITY = SoSDiscipline.LOCAL_VISIBILITY
 INTERNAL_VISIBILITY = SoSDiscipline.INTERNAL_VISIBILITY
-NS_SEP = '.'
 
 
 class NamespaceManager:
@@ -66,6 +66,10 @@ class NamespaceManager:
         # update
         self.extra_ns_local = []
 
+        # Namespaces updated in the current namespace update transaction
+        # {id(namespace): (namespace, value before the transaction)}
+        self.__updated_namespaces = None
+
     @staticmethod
     def compose_ns(args):
         ''' concatenate list of string items as namespace-like '''
@@ -362,12 +366,43 @@ class NamespaceManager:
         '''
         data_io_var = disc.get_data_io_from_key(
             io_type, var_name)
-        complete_var_name = data_io_var[SoSDiscipline.VAR_NAME]
 
-        ns_value = data_io_var[SoSDiscipline.NS_REFERENCE].get_value()
-        result = self.compose_ns([ns_value, complete_var_name])
+        return data_io_var[SoSDiscipline.NS_REFERENCE].get_var_full_name(
+            data_io_var[SoSDiscipline.VAR_NAME])
+
+    @contextmanager
+    def namespace_update(self):
+        '''
+        Transaction to batch namespace value updates
+        The data manager data_id_map is updated once at the end of the transaction,
+        only for variables referencing an updated namespace
+
+        with ns_manager.namespace_update():
+            ns_manager.update_namespace_with_extra_ns(ns1, 'extra')
+            ns_manager.update_namespace_with_extra_ns(ns2, 'extra')
+        '''
+        if self.__updated_namespaces is not None:
+            # nested transaction, changes are applied by the outer one
+            yield
+            return
+
+        self.__updated_namespaces = {}
+        try:
+            yield
+        finally:
+            updated_namespaces, self.__updated_namespaces = self.__updated_namespaces, None
+            if len(updated_namespaces) > 0:
+                self.ee.dm.update_data_id_map(
+                    list(updated_namespaces.values()))
 
-        return result
+    def update_namespace_value(self, namespace, value):
+        '''
+        Update the value of a namespace and register it in the current namespace update transaction
+        '''
+        if self.__updated_namespaces is not None:
+            self.__updated_namespaces.setdefault(
+                id(namespace), (namespace, namespace.get_value()))
+        namespace.update_value(value)
 
     def update_namespace_with_extra_ns(self, old_ns_object, extra_ns, after_name=None):
         '''
@@ -380,7 +415,7 @@ class NamespaceManager:
         if after_name is None:
             new_ns_value = self.compose_ns([extra_ns,
                                             old_ns_value])
-            old_ns_object.update_value(new_ns_value)
+            self.update_namespace_value(old_ns_object, new_ns_value)
         else:
             if f'{after_name}' in old_ns_value:
                 old_ns_value_split = old_ns_value.split(self.NS_SEP)
@@ -391,7 +426,7 @@ class NamespaceManager:
                         new_ns_value_split.append(extra_ns)
                 new_ns_value = self.compose_ns(
                     new_ns_value_split)
-                old_ns_object.update_value(new_ns_value)
+                self.update_namespace_value(old_ns_object, new_ns_value)
 
         return old_ns_object
 
@@ -408,12 +443,11 @@ class NamespaceManager:
         '''
         Update all shared namespaces named shared_ns_name with extra_namespace
         '''
-        for namespace in self.ns_list:
-            if namespace.name == shared_ns_name:
-                self.update_namespace_with_extra_ns(
-                    namespace, extra_ns, after_name)
-
-                self.ee.dm.generate_data_id_map()
+        with self.namespace_update():
+            for namespace in self.ns_list:
+                if namespace.name == shared_ns_name:
+                    self.update_namespace_with_extra_ns(
+                        namespace, extra_ns, after_name)
 
     def update_ns_value_with_extra_ns(self, ns_value, extra_ns, after_name=None):
         '''
@@ -441,8 +475,8 @@ class NamespaceManager:
         for ns_dict in self.disc_ns_dict.values():
             old_local_ns_value = ns_dict['local_ns'].get_value()
 
-            ns_dict['local_ns'].update_value(
-                old_local_ns_value.replace(self.ee.study_name, study_name))
+            self.update_namespace_value(ns_dict['local_ns'],
+                                        old_local_ns_value.replace(self.ee.study_name, study_name))
 
 
 class NamespaceManagerException(Exception):
@@ -40,7 +40,6 @@ from gemseo.core.discipline import MDODiscipline
 from gemseo.utils.compare_data_manager_tooling import dict_are_equal
 from sos_trades_core.api import get_sos_logger
 from gemseo.core.chain import MDOChain
-from sos_trades_core.execution_engine.data_connector.data_connector_factory import ConnectorFactory
 
 from sos_trades_core.tools.conversion.conversion_sostrades_sosgemseo import convert_array_into_new_type, \
     convert_new_type_into_array
@@ -529,6 +528,11 @@ class SoSDiscipline(MDODiscipline):
 
         self.reload_io()
 
+        # setup_sos_disciplines may write input values straight into the DM
+        # data, renew their versions
+        self.dm.update_data_versions([self.get_var_full_name(var_name, self._data_in)
+                                      for var_name in self._data_in])
+
         # update discipline status to CONFIGURE
         self._update_status_dm(self.STATUS_CONFIGURE)
 
@@ -690,16 +694,18 @@ class SoSDiscipline(MDODiscipline):
                         to_update_local_data[self.get_var_full_name(
                             key, to_update)] = ns_update_with[key]
 
+        # keys are full names of to_update variables which are in the dm
         if update_dm:
             # update DM after run
-            self.dm.set_values_from_dict(to_update_local_data)
+            self.dm.set_values_from_dict(
+                to_update_local_data, check_keys=False)
         else:
             # update local_data after run
             self.local_data.update(to_update_local_data)
 
         # need to update outputs that will disappear after filtering the
         # local_data with supported types
-        self.dm.set_values_from_dict(to_update_dm)
+        self.dm.set_values_from_dict(to_update_dm, check_keys=False)
 
     def get_ns_reference(self, visibility, namespace=None):
         '''Get namespace reference by consulting the namespace_manager
@@ -1269,7 +1275,7 @@ class SoSDiscipline(MDODiscipline):
                 if self._data_out[key][self.CONNECTOR_DATA] is not None:
                     # desc out is used because user update desc out keys.
 
-                    updated_values[key] = ConnectorFactory.use_data_connector(
+                    updated_values[key] = self.ee.connector_container.use_data_connector(
                         self._data_out[key][self.CONNECTOR_DATA],
                         self.ee.logger)
 
@@ -1323,12 +1329,10 @@ class SoSDiscipline(MDODiscipline):
 
     def get_var_full_name(self, var_name, disc_dict):
         ''' Get namespaced variable from namespace and var_name in disc_dict
+        (full name is cached by the namespace until its value is updated)
         '''
-        ns_reference = disc_dict[var_name][self.NS_REFERENCE]
-        complete_var_name = disc_dict[var_name][self.VAR_NAME]
-        var_f_name = self.ee.ns_manager.compose_ns(
-            [ns_reference.value, complete_var_name])
-        return var_f_name
+        var_data = disc_dict[var_name]
+        return var_data[self.NS_REFERENCE].get_var_full_name(var_data[self.VAR_NAME])
 
     def update_from_dm(self):
         """
@@ -1427,7 +1431,7 @@ class SoSDiscipline(MDODiscipline):
         # Force update into discipline_dict (GEMS can change status but cannot update the
         # discipline_dict
 
-        self.dm.disciplines_dict[self.disc_id]['status'] = status
+        self.dm.update_discipline_status(self.disc_id, status)
 
     def update_status_pending(self):
         # keep reference branch status to 'REFERENCE'
@@ -137,7 +137,8 @@ class SoSDisciplineScatter(SoSDisciplineBuilder):
                 input_name)  # [ac1, ac2, ...]
             if sub_names is not None:
 
-                new_sub_names = self.clean_scattered_disciplines(sub_names)
+                new_sub_names = set(
+                    self.clean_scattered_disciplines(sub_names))
 
                 # build sub_process through the factory
                 for name in sub_names:
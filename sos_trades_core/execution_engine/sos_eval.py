@@ -13,6 +13,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
+import copy
 import platform
 import pandas as pd
 import re
@@ -377,16 +378,6 @@ class SoSEval(SoSDisciplineBuilder):
             self.logger.info(
                 "Running SOS EVAL in parallel on n_processes = %s", str(n_processes))
 
-            # Create the parallel execution object. The function we want to
-            # parallelize is the sample_evaluation
-            def sample_evaluator(sample_to_evaluate):
-                """Evaluate a sample
-                """
-                return self.evaluation(sample_to_evaluate, convert_to_array=False)
-
-            parallel = ParallelExecution(sample_evaluator, n_processes=n_processes,
-                                         wait_time_between_fork=wait_time_between_samples)
-
             # Define a callback function to store the samples on the fly
             # during the parallel execution
             def store_callback(
@@ -405,7 +396,10 @@ class SoSEval(SoSDisciplineBuilder):
                     f'{scenario_name} has been run. computation progress: {int(((len(evaluation_output)) / len(samples)) * 100)}% done.')
 
             try:
-                parallel.execute(samples, exec_callback=store_callback)
+                self.parallel_evaluation(samples, n_processes, wait_time_between_samples,
+                                         convert_to_array=False,
+                                         completed_eval_in_list=completed_eval_in_list,
+                                         exec_callback=store_callback)
                 self.sos_disciplines[0]._update_status_recursive(
                     self.STATUS_DONE)
                 dict_to_return = {}
@@ -419,6 +413,53 @@ class SoSEval(SoSDisciplineBuilder):
                 self.sos_disciplines[0]._update_status_recursive(
                     self.STATUS_FAILED)
 
+    def parallel_evaluation(self, samples, n_processes, wait_time_between_samples=0.0, convert_to_array=True,
+                            completed_eval_in_list=None, exec_callback=None):
+        '''
+        Evaluate a batch of samples on a pool of n_processes workers and return the outputs in the samples order
+        The workers are forked once for the whole batch and consume the samples from a shared queue,
+        this is the execution used by the DoE evaluations as well as by the finite differences gradients
+        '''
+        def sample_evaluator(sample_to_evaluate):
+            """Evaluate a sample
+            """
+            return self.evaluation(sample_to_evaluate, convert_to_array=convert_to_array,
+                                   completed_eval_in_list=completed_eval_in_list)
+
+        parallel = ParallelExecution(sample_evaluator, n_processes=n_processes,
+                                     wait_time_between_fork=wait_time_between_samples)
+
+        return parallel.execute(samples, exec_callback=exec_callback)
+
+    def samples_list_evaluation(self, samples, convert_to_array=True):
+        '''
+        Evaluate a list of samples and return the list of outputs in the samples order
+        Depending on the numerical parameter n_processes the samples are evaluated sequentially
+        or distributed on a pool of workers with parallel_evaluation
+        '''
+        n_processes = self.get_sosdisc_inputs('n_processes')
+        if platform.system() == 'Windows' and n_processes != 1:
+            self.logger.warning(
+                "multiprocessing is not possible on Windows")
+            n_processes = 1
+
+        # the first sample is always evaluated in the main process to store
+        # the type metadata and the local data of the outputs needed to
+        # reconstruct the results
+        outputs = [copy.deepcopy(self.evaluation(
+            samples[0], convert_to_array=convert_to_array))]
+        if n_processes == 1 or len(samples) == 1:
+            outputs.extend([copy.deepcopy(self.evaluation(x, convert_to_array=convert_to_array))
+                            for x in samples[1:]])
+        else:
+            self.logger.info(
+                "Running %s samples in parallel on n_processes = %s", str(len(samples) - 1), str(n_processes))
+            outputs.extend(self.parallel_evaluation(samples[1:], min(n_processes, len(samples) - 1),
+                                                    self.get_sosdisc_inputs(
+                                                        'wait_time_between_fork'),
+                                                    convert_to_array=convert_to_array))
+        return outputs
+
     def apply_muliplier(self, multiplier_name, multiplier_value, var_to_update):
         col_index = multiplier_name.split(self.MULTIPLIER_PARTICULE)[
             0].split('@')[1]
@@ -16,9 +16,12 @@ limitations under the License.
 '''
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 '''
-import inspect
+import ast
 import os
+import tokenize
+from functools import lru_cache
 from importlib import import_module
+from importlib.util import find_spec
 
 from pandas.core.common import flatten
 
@@ -33,6 +36,50 @@ class SosFactoryException(Exception):
     pass
 
 
+def get_module_class_names(file_path):
+    """
+    Return the names of the classes defined at the top level of a python file, parsed without importing it
+    """
+    with tokenize.open(file_path) as module_file:
+        module_tree = ast.parse(module_file.read(), filename=file_path)
+    return [node.name for node in module_tree.body if isinstance(node, ast.ClassDef)]
+
+
+@lru_cache(maxsize=None)
+def get_folder_class_index(folder):
+    """
+    Return the process-wide index {class name: module path} of the classes defined in the modules
+    and sub packages of a folder, built once per folder by parsing files instead of importing them
+    Call get_folder_class_index.cache_clear() to take new classes into account
+    """
+    # Get the module search path of the folder, only parent packages are
+    # imported
+    try:
+        spec = find_spec(folder)
+        folder_path_list = spec.submodule_search_locations
+    except Exception:
+        folder_path_list = None
+    if not folder_path_list:
+        raise Warning(f'The folder {folder} is not a module')
+
+    class_index = {}
+    for folder_path in folder_path_list:
+        for file in sorted(os.listdir(folder_path)):
+            file_path = os.path.join(folder_path, file)
+            if file.endswith('.py') and file != '__init__.py':
+                module_name = '.'.join([folder, file[:-len('.py')]])
+            elif os.path.isfile(os.path.join(file_path, '__init__.py')):
+                # classes defined in a sub package __init__
+                module_name = '.'.join([folder, file])
+                file_path = os.path.join(file_path, '__init__.py')
+            else:
+                continue
+            # the first module defining the class is kept
+            for class_name in get_module_class_names(file_path):
+                class_index.setdefault(class_name, module_name)
+    return class_index
+
+
 class SosFactory:
     """
     Specification: SosFactory allows to manage builders and disciplines to instantiate a process
@@ -620,41 +667,12 @@ class SosFactory:
         Return the first found for now .. TODO
         """
 
-        module_class_path = None
         for folder in folder_list:
-            # Get the module of the folder
-            try:
-                module = import_module(folder)
-                folder_path = os.path.dirname(module.__file__)
-            except:
-                raise Warning(f'The folder {folder} is not a module')
-
-            # Get all files in the folder_path
-            file_list = os.listdir(folder_path)
-            # Find all submodules in the path
-            sub_module_list = [
-                import_module('.'.join([folder, file.split('.')[0]]))
-                for file in file_list
-            ]
-
-            for sub_module in sub_module_list:
-                # Find all members of each submodule which are classes
-                # belonging to the sub_module
-                class_list = [
-                    value
-                    for value, cls in inspect.getmembers(sub_module)
-                    if inspect.isclass(getattr(sub_module, value))
-                    and cls.__module__ == sub_module.__name__
-                ]
-                # CHeck if the following class is in the list
-                if class_name in class_list:
-                    module_class_path = '.'.join([sub_module.__name__, class_name])
-                    break
-            else:
-                continue
-            break
+            module_name = get_folder_class_index(folder).get(class_name)
+            if module_name is not None:
+                return '.'.join([module_name, class_name])
 
-        return module_class_path
+        return None
 
     def get_builder_from_class_name(self, sos_name, mod_name, folder_list):
         """
@@ -72,9 +72,11 @@ class SoSGradients(SoSEval):
             raise Exception(
                 'Wrong gradient method, methods available are "Complex Step", "1st order FD" and "2nd order FD"')
 
+        # perturbed samples are evaluated in one batch, on the pool of
+        # n_processes workers used by the DoE evaluations if required
         grad_eval = FDGradient(
-            grad_method_number, self.evaluation, fd_step=eps)
-        grad_eval.set_multi_proc(False)
+            grad_method_number, self.evaluation, fd_step=eps,
+            samples_evaluator=self.samples_list_evaluation)
 
         x0 = self.get_x0()
 
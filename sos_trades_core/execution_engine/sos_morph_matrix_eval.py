@@ -322,19 +322,15 @@ class SoSMorphMatrixEval(SoSEval):
         '''
             Generate morphological matrix of input combination scenarios
         '''
-        morphological_matrix = self.scenario_generator.generate_scenarios(
+        morphological_matrix_df = self.scenario_generator.generate_scenarios_df(
             eval_input_dict)
 
         # set x0 to configure process to evaluate
-        if len(morphological_matrix) > 0:
-            self.set_initial_inputs(morphological_matrix)
+        # first scenario is generated lazily to keep python values types
+        if len(morphological_matrix_df) > 0:
+            self.set_initial_inputs(next(self.scenario_generator.generate_scenarios_by_chunk(
+                eval_input_dict, chunk_size=1)))
 
-        morphological_matrix_df = DataFrame.from_dict(
-            morphological_matrix, orient='index')
-        morphological_matrix_df.insert(
-            0, 'scenario_name', morphological_matrix_df.index.values)
-        morphological_matrix_df = morphological_matrix_df.reset_index(
-            drop=True)
         # all scenarios activated by default
         morphological_matrix_df.insert(
             0, 'selected_scenario', False)
@@ -16,6 +16,8 @@ limitations under the License.
 '''
 mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 '''
+from copy import deepcopy
+
 from sos_trades_core.tools.scenario.scenario_generator import ScenarioGenerator
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
 from sos_trades_core.execution_engine.sos_simple_multi_scenario import SoSSimpleMultiScenario
@@ -45,6 +47,9 @@ class SoSMultiScenario(SoSSimpleMultiScenario):
         'icon': 'fas fa-stream fa-fw',
         'version': '',
     }
+    # number of scenarios generated at once
+    SCENARIOS_CHUNK_SIZE = 10000
+
     def __init__(self, sos_name, ee, map_name, cls_builder, autogather, gather_node, business_post_proc):
         '''
         Constructor
@@ -85,5 +90,10 @@ class SoSMultiScenario(SoSSimpleMultiScenario):
                     dict_parameters[trade_var_map.get_output_name()[0]] = self.get_sosdisc_inputs(
                         f'{trade_var_name}_trade')
 
-            self.set_scenario_dict(scenario_generator.generate_scenarios(
-                dict_parameters))
+            # scenarios are generated and copied by chunks to avoid holding
+            # the generated scenarios and their deep copy at the same time
+            scenario_dict = {}
+            for scenarios_chunk in scenario_generator.generate_scenarios_by_chunk(
+                    dict_parameters, self.SCENARIOS_CHUNK_SIZE):
+                scenario_dict.update(deepcopy(scenarios_chunk))
+            self.set_scenario_dict(scenario_dict, copy_dict=False)
@@ -17,6 +17,7 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 '''
 import copy
+import numpy as np
 from pandas.core.frame import DataFrame
 
 from sos_trades_core.execution_engine.sos_eval import SoSEval
@@ -52,66 +53,83 @@ class SoSSensitivity(SoSEval):
     def generate_samples(self, variation_list):
         '''
         Generate the samples needed to compute the sensitivity 1 sample without variation and 2 samples by input values
+        Each sample is a list with one value per eval input, input values may be floats or arrays
         '''
+        x0 = [self.dm.get_value(input_in) for input_in in self.eval_in_list]
         x_samples = []
         input_in_samples = []
         variation_samples = []
-        self.n_samples = 0
 
         for variation in variation_list:
-            for input_in_sample in self.eval_in_list:
-                x_pos_sample = []
-                x_neg_sample = []
-# Create the sample with the  Dx variatiob
-                for input_in in self.eval_in_list:
-                    if input_in == input_in_sample:
-                        variation_input = self.dm.get_value(
-                            input_in) * (1.0 + variation / 100.0)
-                        x_pos_sample.append(variation_input)
-                    else:
-                        input_value = self.dm.get_value(
-                            input_in)
-                        x_pos_sample.append(input_value)
-                x_samples.append(x_pos_sample)
-                input_in_samples.append(input_in_sample)
-                variation_samples.append(variation)
-                self.n_samples += 1
-# Create the sample with the - Dx variation
-                for input_in in self.eval_in_list:
-                    if input_in == input_in_sample:
-                        variation_input = self.dm.get_value(
-                            input_in) * (1.0 - variation / 100.0)
-                        x_neg_sample.append(variation_input)
-                    else:
-                        input_value = self.dm.get_value(
-                            input_in)
-                        x_neg_sample.append(input_value)
-                self.n_samples += 1
-                x_samples.append(x_neg_sample)
-                input_in_samples.append(input_in_sample)
-                variation_samples.append(-variation)
-        x_sample_novar = [self.dm.get_value(
-            input_in) for input_in in self.eval_in_list]
-        x_samples.append(x_sample_novar)
-        self.n_samples += 1
+            for i, input_in_sample in enumerate(self.eval_in_list):
+                # sample with the + Dx variation then with the - Dx variation
+                # of input_in_sample, other inputs keep their value
+                for sample_variation in [variation, -variation]:
+                    x_sample = list(x0)
+                    x_sample[i] = x0[i] * (1.0 + sample_variation / 100.0)
+                    x_samples.append(x_sample)
+                    input_in_samples.append(input_in_sample)
+                    variation_samples.append(sample_variation)
+        x_samples.append(x0)
         input_in_samples.append('NOVAR')
         variation_samples.append(0.0)
+        self.n_samples = len(x_samples)
 
         return x_samples, input_in_samples, variation_samples
 
+    @staticmethod
+    def get_sample_key(x_sample):
+        '''
+        Return a hashable key of a sample, arrays are keyed by their dtype, shape and bytes
+        and other unhashable values by their identity
+        '''
+        sample_key = []
+        for value in x_sample:
+            if isinstance(value, np.ndarray):
+                sample_key.append((value.dtype.str, value.shape, value.tobytes()))
+            else:
+                try:
+                    hash(value)
+                    sample_key.append(value)
+                except TypeError:
+                    sample_key.append(('id', id(value)))
+        return tuple(sample_key)
+
     def launch_sensitivity_analysis(self, variation_list):
         '''
         Launch sensitivity analysis by computing the function to evaluate on each sample generated
+        Samples repeated across variations are evaluated only once
         '''
         self.variation_list = variation_list
         output_dict = {}
 
         x_samples, input_in_samples, variation_samples = self.generate_samples(
             variation_list)
-        for i, x_sample in enumerate(x_samples):
 
-            output_eval = copy.deepcopy(
-                self.evaluation(x_sample, convert_to_array=False))
+        # index of each sample in the list of unique samples to evaluate,
+        # the no variation point is put first to be evaluated in the main
+        # process
+        samples_keys = [self.get_sample_key(x_sample) for x_sample in x_samples]
+        unique_samples_index = {samples_keys[-1]: 0}
+        unique_samples = [x_samples[-1]]
+        for sample_key, x_sample in zip(samples_keys, x_samples):
+            if sample_key not in unique_samples_index:
+                unique_samples_index[sample_key] = len(unique_samples)
+                unique_samples.append(x_sample)
+
+        unique_outputs = self.samples_list_evaluation(
+            unique_samples, convert_to_array=False)
+
+        # the last evaluated sample may be a variation, restore the no
+        # variation point in the DM
+        values_dict = dict(zip(self.eval_in_list, x_samples[-1]))
+        values_dict.update(
+            dict(zip(self.eval_out_list, copy.deepcopy(unique_outputs[0]))))
+        self.dm.set_values_from_dict(values_dict)
+
+        for i, sample_key in enumerate(samples_keys):
+
+            output_eval = unique_outputs[unique_samples_index[sample_key]]
 
             for j, output_sens in enumerate(self.eval_out_list):
                 if variation_samples[i] == 0.0:
@@ -78,8 +78,11 @@ class SoSSimpleMultiScenario(SoSVerySimpleMultiScenario):
     def get_linked_scatter_data(self):
         return self.__linked_scatter_data
 
-    def set_scenario_dict(self, scenario_dict):
-        self.__scenario_dict = deepcopy(scenario_dict)
+    def set_scenario_dict(self, scenario_dict, copy_dict=True):
+        if copy_dict:
+            self.__scenario_dict = deepcopy(scenario_dict)
+        else:
+            self.__scenario_dict = scenario_dict
 
     def get_scenario_dict_for_parameter(self, parameter):
         '''
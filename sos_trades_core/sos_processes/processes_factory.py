@@ -18,7 +18,11 @@ limitations under the License.
 from importlib import import_module
 from pathlib import Path
 from os.path import dirname, relpath, join
-from os import environ, sep, pathsep
+from os import environ, sep, pathsep, stat, makedirs, replace, walk
+from tempfile import gettempdir
+from concurrent.futures import ThreadPoolExecutor
+import json
+import sys
 import yaml
 
 from sos_trades_core.api import get_sos_logger
@@ -29,11 +33,55 @@ DEFAULT_RIGHTS_FILE_NAME = 'default_process_rights.yaml'
 USER_MAIL = 'user-mail'
 GROUP_NAME = 'group-name'
 
+# persistent process registry cache
+PROCESSES_CACHE_FILE_ENV = 'SOS_TRADES_PROCESSES_CACHE_FILE'
+PROCESSES_CACHE_VERSION = 2
+PYTHON_PATH = 'python_path'
+LIBRARIES = 'libraries'
+REPOSITORIES = 'repositories'
+MTIMES = 'mtimes'
+PROCESSES_MODULES = 'processes_modules'
+PROCESSES = 'processes'
+
+
+def get_default_processes_cache_file():
+    '''
+    Return the process registry cache file path, SOS_TRADES_PROCESSES_CACHE_FILE
+    environment variable if defined else sos_trades_processes_cache.json in the temporary directory
+    '''
+    return environ.get(PROCESSES_CACHE_FILE_ENV, join(gettempdir(), 'sos_trades_processes_cache.json'))
+
+
+def get_directories_mtimes(root_path):
+    '''
+    Return modification times of root_path and of every directory walked below it, except __pycache__ ones.
+    A process added or removed anywhere below root_path changes one of these mtimes
+    '''
+    mtimes = {root_path: stat(root_path).st_mtime}
+    for directory, sub_directories, _ in walk(root_path):
+        sub_directories[:] = [
+            sub_directory for sub_directory in sub_directories if sub_directory != '__pycache__']
+        for sub_directory in sub_directories:
+            sub_directory_path = join(directory, sub_directory)
+            mtimes[sub_directory_path] = stat(sub_directory_path).st_mtime
+    return mtimes
+
+
+def are_mtimes_valid(mtimes):
+    '''
+    Check that every directory of a cache entry still exists with the same modification time
+    '''
+    try:
+        return all(stat(directory).st_mtime == mtime for directory, mtime in mtimes.items())
+    except OSError:
+        return False
+
 class SoSProcessFactory:
     '''Class to manager processes
     '''
 
-    def __init__(self, additional_repository_list=None, search_python_path=True, logger=None):
+    def __init__(self, additional_repository_list=None, search_python_path=True, logger=None,
+                 use_cache=False, cache_file_path=None, n_threads=None):
         """ SoSProcessFactory constructor
 
         :params: additional_repository_list, list with additonal repository to load
@@ -41,6 +89,15 @@ class SoSProcessFactory:
 
         :params: search_python_path, look for process into python path library or not
         :type: boolean, default True
+
+        :params: use_cache, read and write the persistent process registry cache
+        :type: boolean, default False
+
+        :params: cache_file_path, process registry cache file (default from get_default_processes_cache_file)
+        :type: string, default None
+
+        :params: n_threads, maximum number of threads used to discover processes when the cache is cold
+        :type: integer, default None (default of ThreadPoolExecutor)
         """
 
         self.__processes_dict = None
@@ -51,6 +108,18 @@ class SoSProcessFactory:
         else:
             self.logger = logger
 
+        self.__search_python_path = search_python_path
+        self.__use_cache = use_cache
+        self.__cache_file_path = cache_file_path if cache_file_path is not None else get_default_processes_cache_file()
+        self.__n_threads = n_threads
+        self.__cache = None
+        self.__cache_updated = False
+
+        # additional repositories given by the user
+        self.__additional_repository_list = []
+        if additional_repository_list is not None and isinstance(additional_repository_list, list):
+            self.__additional_repository_list.extend(additional_repository_list)
+
         # raw repository list is the one that contain module path to
         # 'PROCESSES_MODULE_NAME'
         self.__raw_repository_list = []
@@ -58,27 +127,25 @@ class SoSProcessFactory:
         # repository list is the one that contain module path that contain the
         # 'BUILDERS_MODULE_NAME'
         self.__repository_list = []
-        
+
+        # processes found in each raw repository
+        self.__processes_by_raw_repository = {}
+
         # repository file for default process rights location by repository
         self.__process_default_right_files = {}
         self.__user_default_rights_dict = {}
         self.__group_default_rights_dict = {}
 
-        if additional_repository_list is not None and isinstance(additional_repository_list, list):
-            self.__raw_repository_list.extend(additional_repository_list)
-
-        if search_python_path:
-            self.__add_python_path_processes()
-
-        self._set_processes_dict()
-        
-        # Set all the default rights in the dicts for each process
-        self._set_processes_rights_from_file_dict()
+        self.__discover_processes()
 
     @property
     def processes_dict(self):
         return self.__processes_dict
 
+    @property
+    def cache_file_path(self):
+        return self.__cache_file_path
+
     def get_repo_list(self):
         ''' return list of dict {repo name: repo path} '''
 
@@ -94,19 +161,26 @@ class SoSProcessFactory:
         """
 
         return self.__processes_dict
-    
+
     def get_user_default_rights_dict(self):
         """
         Return the buit dictionary processes user default rights base on repository list
         """
         return self.__user_default_rights_dict
-    
+
     def get_group_default_rights_dict(self):
         """
         Return the buit dictionary processes group default rights base on repository list
         """
         return self.__group_default_rights_dict
-    
+
+    def refresh(self):
+        """
+        Discover again all processes ignoring the cached registry then overwrite it
+        """
+        self.__cache = self.__get_empty_cache()
+        self.__discover_processes()
+
     #-- Protected methods
     def _set_processes_dict(self):
         ''' load processes list
@@ -114,37 +188,105 @@ class SoSProcessFactory:
         #-- re-initialize processes_list
         self.__processes_dict = {}
         self.__repository_list = []
+        self.__processes_by_raw_repository = {}
+
+        #-- Set one dict per repo, repositories missing from the cache are
+        #-- discovered in parallel
+        if self.__raw_repository_list:
+            with ThreadPoolExecutor(max_workers=self.__n_threads) as executor:
+                repositories_processes = list(executor.map(
+                    self.__get_repositories_by_process, self.__raw_repository_list))
+        else:
+            repositories_processes = []
 
-        #-- Set one dict per repo
-        for repo_path in self.__raw_repository_list:
-
-            resolve_raw_repository_processes = self.__get_repositories_by_process(
-                repo_path)
+        for repo_path, resolve_raw_repository_processes in zip(self.__raw_repository_list, repositories_processes):
 
+            self.__processes_by_raw_repository[repo_path] = resolve_raw_repository_processes
             self.__repository_list.extend(
                 resolve_raw_repository_processes.keys())
             self.__processes_dict.update(resolve_raw_repository_processes)
-    
-    
+
     def _set_processes_rights_from_file_dict(self):
         '''
         Retreive the list of process modules
         store them in 2 dictionaries one for users and another for groups
-        '''                                     
+        '''
+        self.__user_default_rights_dict = {}
+        self.__group_default_rights_dict = {}
         for repo_path in self.__raw_repository_list:
             if repo_path in self.__process_default_right_files.keys():
                 yaml_data = self.__process_default_right_files[repo_path]
                 if yaml_data is not None:
-                    
-                    resolve_raw_repository_processes = self.__get_repositories_by_process(
-                        repo_path)
-                
+
+                    resolve_raw_repository_processes = self.__processes_by_raw_repository.get(
+                        repo_path, {})
+
                     for process in resolve_raw_repository_processes:
                         #fill the lists with the datas
                         if USER_MAIL in yaml_data.keys() and yaml_data[USER_MAIL] is not None:
                             self.__user_default_rights_dict[process] =  yaml_data[USER_MAIL]
                         if GROUP_NAME in yaml_data.keys() and yaml_data[GROUP_NAME] is not None:
-                            self.__group_default_rights_dict[process] =  yaml_data[GROUP_NAME]                  
+                            self.__group_default_rights_dict[process] =  yaml_data[GROUP_NAME]
+
+    def __discover_processes(self):
+        """
+        Fill repositories, processes and default rights from the cached registry,
+        discover only libraries and repositories that are missing or outdated
+        """
+        if self.__cache is None:
+            self.__cache = self.__load_cache()
+        self.__cache_updated = False
+
+        self.__raw_repository_list = list(self.__additional_repository_list)
+        self.__process_default_right_files = {}
+
+        if self.__search_python_path:
+            self.__add_python_path_processes()
+
+        self._set_processes_dict()
+
+        # Set all the default rights in the dicts for each process
+        self._set_processes_rights_from_file_dict()
+
+        if self.__cache_updated:
+            self.__dump_cache()
+
+    def __get_empty_cache(self):
+        return {'version': PROCESSES_CACHE_VERSION, PYTHON_PATH: sys.path, LIBRARIES: {}, REPOSITORIES: {}}
+
+    def __load_cache(self):
+        """
+        Load the process registry cache, it is dropped if the cache version or the python path changed
+        """
+        cache = None
+        if self.__use_cache:
+            try:
+                with open(self.__cache_file_path, 'r') as cache_file:
+                    cache = json.load(cache_file)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as error:
+                self.logger.warning(
+                    f'Unable to read process cache {self.__cache_file_path} : {str(error)}')
+
+        if cache is None or cache.get('version') != PROCESSES_CACHE_VERSION or cache.get(PYTHON_PATH) != sys.path:
+            cache = self.__get_empty_cache()
+        return cache
+
+    def __dump_cache(self):
+        """
+        Write the process registry cache, written in a temporary file then moved to be safe with concurrent processes
+        """
+        if self.__use_cache:
+            tmp_file_path = f'{self.__cache_file_path}.{id(self)}.tmp'
+            try:
+                makedirs(dirname(self.__cache_file_path) or '.', exist_ok=True)
+                with open(tmp_file_path, 'w') as cache_file:
+                    json.dump(self.__cache, cache_file)
+                replace(tmp_file_path, self.__cache_file_path)
+            except OSError as error:
+                self.logger.warning(
+                    f'Unable to write process cache {self.__cache_file_path} : {str(error)}')
 
     def __add_python_path_processes(self):
         """
@@ -153,7 +295,7 @@ class SoSProcessFactory:
 
         Find for each path the file containing default access rights file for this repository
         """
-        
+
         # check for PYTHONPATH environment variable
         python_path_libraries = environ.get('PYTHONPATH')
 
@@ -162,13 +304,23 @@ class SoSProcessFactory:
             # Set to list each library of the PYTHONPATH
             libraries = python_path_libraries.split(pathsep)
 
+            # walk in parallel libraries missing from the cache
+            libraries_cache = self.__cache[LIBRARIES]
+            libraries_to_walk = [library for library in set(libraries)
+                                 if library not in libraries_cache or not are_mtimes_valid(libraries_cache[library][MTIMES])]
+            if libraries_to_walk:
+                with ThreadPoolExecutor(max_workers=self.__n_threads) as executor:
+                    for library, library_cache in zip(libraries_to_walk,
+                                                      executor.map(self.__walk_python_path_library, libraries_to_walk)):
+                        libraries_cache[library] = library_cache
+                self.__cache_updated = True
+
             for library in libraries:
-                processes_modules = [relpath(p, library).replace(sep, '.') for p in Path(
-                    library).rglob(f'*/{PROCESSES_MODULE_NAME}/')]
+                processes_modules = libraries_cache[library][PROCESSES_MODULES]
 
                 if processes_modules is not None and len(processes_modules) > 0:
                     self.__raw_repository_list.extend(processes_modules)
-                    
+
                     # From python path, add the automatic default right file if exists
                     file_name = join(library, DEFAULT_RIGHTS_FILE_NAME)
                     if Path(file_name).exists():
@@ -182,14 +334,55 @@ class SoSProcessFactory:
                                 for process_module in processes_modules:
                                     self.__process_default_right_files[process_module] = yaml_data
 
+    def __walk_python_path_library(self, library):
+        """ look for 'sos_processes' folders into a PYTHONPATH library
+
+        :params: library, library path
+        :type: string
+
+        :return: library cache entry with processes modules and directories mtimes
+        """
+        processes_paths = list(Path(library).rglob(f'*/{PROCESSES_MODULE_NAME}/'))
+        processes_modules = [relpath(p, library).replace(sep, '.') for p in processes_paths]
+        try:
+            mtimes = get_directories_mtimes(library)
+        except OSError:
+            # library does not exist, always walked again
+            mtimes = {library: None}
+        return {MTIMES: mtimes, PROCESSES_MODULES: processes_modules}
+
     def __get_repositories_by_process(self, repository_module_name):
         """ retrieve the list of process name into the specified module name
+        from the cache if the repository folders did not change
 
         :params: repository_module_name, module name (import like name)
         :type: list of strings
 
         :return: process name list
 
+        """
+        repositories_cache = self.__cache[REPOSITORIES]
+        repository_cache = repositories_cache.get(repository_module_name)
+        if repository_cache is not None and are_mtimes_valid(repository_cache[MTIMES]):
+            return repository_cache[PROCESSES]
+
+        repository_cache = self.__find_repositories_by_process(
+            repository_module_name)
+        if repository_cache is not None:
+            repositories_cache[repository_module_name] = repository_cache
+            self.__cache_updated = True
+            return repository_cache[PROCESSES]
+        return {}
+
+    def __find_repositories_by_process(self, repository_module_name):
+        """ look for the list of process name into the specified module name
+
+        :params: repository_module_name, module name (import like name)
+        :type: list of strings
+
+        :return: repository cache entry with processes by process module and directories mtimes,
+        None if the module cannot be loaded
+
         """
         # Result process list
 
@@ -210,8 +403,10 @@ class SoSProcessFactory:
 
                 # Extract all module with SoSProcessFactory.BUILDERS_MODULE_NAME
                 # file
-                base_id_list = [dirname(relpath(p, repository_module_path)).replace(sep, '.')
-                                for p in Path(repository_module_path).rglob(f'*/{BUILDERS_MODULE_NAME}.py')]
+                process_paths = [dirname(p) for p in Path(repository_module_path).rglob(
+                    f'*/{BUILDERS_MODULE_NAME}.py')]
+                base_id_list = [relpath(p, repository_module_path).replace(sep, '.')
+                                for p in process_paths]
 
                 # Manage all process to sort them by processes and
                 # repository_module
@@ -230,6 +425,9 @@ class SoSProcessFactory:
                         process_name)
                     self.logger.debug(f'Find {process_module} / {process_name}')
 
+                return {MTIMES: get_directories_mtimes(repository_module_path),
+                        PROCESSES: repositories_by_process}
+
             else:
                 self.logger.warning(
                     f'Unable to load the following module {repository_module_name}')
@@ -241,4 +439,4 @@ class SoSProcessFactory:
             self.logger.critical(
                 f'Unable to load the following module {repository_module_name} : {str(error)}')
 
-        return repositories_by_process
+        return None
@@ -13,18 +13,16 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-
-from copy import deepcopy
-
 '''
 mode: python; py-indent-offset: 4; tab-width: 8; coding: utf-8
 '''
 
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
 import chaospy as cp
 import numpy as np
-import openturns as ot
 import pandas as pd
-import plotly.graph_objects as go
 from scipy.interpolate import RegularGridInterpolator
 from scipy.stats import norm
 
@@ -40,6 +38,28 @@ from sos_trades_core.tools.post_processing.post_processing_tools import (
 )
 
 
+def import_openturns():
+    """Import openturns on first call, it is only needed to run the discipline.
+
+    Returns:
+        openturns module
+    """
+    import openturns as ot
+
+    return ot
+
+
+def import_plotly_graph_objects():
+    """Import plotly.graph_objects on first call, it is only needed for post-processings.
+
+    Returns:
+        plotly.graph_objects module
+    """
+    import plotly.graph_objects as go
+
+    return go
+
+
 class UncertaintyQuantification(SoSDiscipline):
     '''
     Generic Uncertainty Quantification class
@@ -65,6 +85,11 @@ class UncertaintyQuantification(SoSDiscipline):
     UPPER_BOUND = "upper_bnd"
     LOWER_BOUND = "lower_bnd"
     NB_POINTS = 'nb_points'
+    MONTE_CARLO = 'MonteCarlo'
+    SOBOL = 'Sobol'
+    HALTON = 'Halton'
+    LHS = 'LHS'
+    SAMPLING_METHODS = [MONTE_CARLO, SOBOL, HALTON, LHS]
 
     DESC_IN = {
         'samples_inputs_df': {
@@ -113,6 +138,51 @@ class UncertaintyQuantification(SoSDiscipline):
             'numerical': True,
             'user_level': 2,
         },
+        'sampling_method': {
+            'type': 'string',
+            'default': MONTE_CARLO,
+            'possible_values': SAMPLING_METHODS,
+            'visibility': SoSDiscipline.SHARED_VISIBILITY,
+            'namespace': 'ns_uncertainty_quantification',
+            'structuring': False,
+            'numerical': True,
+            'user_level': 2,
+        },
+        'antithetic_variates': {
+            'type': 'bool',
+            'default': False,
+            'visibility': SoSDiscipline.SHARED_VISIBILITY,
+            'namespace': 'ns_uncertainty_quantification',
+            'structuring': False,
+            'numerical': True,
+            'user_level': 2,
+        },
+        'adaptive_tolerance': {
+            'type': 'float',
+            'unit': '%',
+            'default': 0.0,
+            'visibility': SoSDiscipline.SHARED_VISIBILITY,
+            'namespace': 'ns_uncertainty_quantification',
+            'structuring': False,
+            'numerical': True,
+            'user_level': 3,
+        },
+        'max_sample_size': {
+            'type': 'int',
+            'unit': None,
+            'default': 100000,
+            'visibility': SoSDiscipline.SHARED_VISIBILITY,
+            'namespace': 'ns_uncertainty_quantification',
+            'structuring': False,
+            'numerical': True,
+            'user_level': 3,
+        },
+        'n_processes': {
+            'type': 'int',
+            'default': 1,
+            'numerical': True,
+            'user_level': 3,
+        },
         EVAL_INPUTS: {
             'type': 'dataframe',
             'dataframe_descriptor': {
@@ -384,6 +454,7 @@ class UncertaintyQuantification(SoSDiscipline):
             self.add_outputs(dynamic_outputs)
 
     def run(self):
+        ot = import_openturns()
         self.check_inputs_consistency()
         inputs_dict = self.get_sosdisc_inputs()
         samples_df = inputs_dict['samples_inputs_df']
@@ -392,16 +463,16 @@ class UncertaintyQuantification(SoSDiscipline):
         samples_df = samples_df.drop(index=reference_scenario_index)
         data_df = data_df.drop(index=reference_scenario_index)
         confidence_interval = inputs_dict['confidence_interval'] / 100
-        sample_size = inputs_dict['sample_size']
+        sample_size = int(inputs_dict['sample_size'])
+        n_processes = inputs_dict['n_processes']
         input_parameters_names = list(samples_df.columns)[1:]
         output_names = list(data_df.columns)[1:]
-        input_distribution_parameters_df = deepcopy(
-            inputs_dict['input_distribution_parameters_df']
-        )
-        input_distribution_parameters_df['values'] = [
-            sorted(list(samples_df[input_name].unique()))
-            for input_name in input_parameters_names
-        ]
+
+        # index the distribution table once by parameter name instead of
+        # filtering it for each field of each parameter
+        distribution_parameters = inputs_dict[
+            'input_distribution_parameters_df'
+        ].set_index('parameter').to_dict('index')
 
         # fixes a particular state of the random generator algorithm thanks to
         # the seed sample_size
@@ -410,103 +481,21 @@ class UncertaintyQuantification(SoSDiscipline):
 
         # INPUT PARAMETERS DISTRIBUTION IN
         # [NORMAL, PERT, LOGNORMAL,TRIANGULAR]
-        input_parameters_samples_df = pd.DataFrame()
-        distrib_list = []
-        for input_name in input_parameters_names:
-            if (
-                input_distribution_parameters_df.loc[
-                    input_distribution_parameters_df['parameter'] == input_name
-                ]['distribution'].values[0]
-                == 'Normal'
-            ):
-                distrib = self.Normal_distrib(
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['lower_parameter'].values[0],
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['upper_parameter'].values[0],
-                    confidence_interval=confidence_interval,
-                )
-            elif (
-                input_distribution_parameters_df.loc[
-                    input_distribution_parameters_df['parameter'] == input_name
-                ]['distribution'].values[0]
-                == 'PERT'
-            ):
-                distrib = self.PERT_distrib(
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['lower_parameter'].values[0],
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['upper_parameter'].values[0],
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['most_probable_value'].values[0],
-                )
-            elif (
-                input_distribution_parameters_df.loc[
-                    input_distribution_parameters_df['parameter'] == input_name
-                ]['distribution'].values[0]
-                == 'LogNormal'
-            ):
-                distrib = self.LogNormal_distrib(
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['lower_parameter'].values[0],
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['upper_parameter'].values[0],
-                    confidence_interval=confidence_interval,
-                )
-            elif (
-                input_distribution_parameters_df.loc[
-                    input_distribution_parameters_df['parameter'] == input_name
-                ]['distribution'].values[0]
-                == 'Triangular'
-            ):
-                distrib = self.Triangular_distrib(
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['lower_parameter'].values[0],
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['upper_parameter'].values[0],
-                    input_distribution_parameters_df.loc[
-                        input_distribution_parameters_df['parameter'] == input_name
-                    ]['most_probable_value'].values[0],
-                )
-            else:
-                self.logger.exception(
-                    'Exception occurred: possible values in distribution are [Normal, PERT, Triangular, LogNormal].'
-                )
-            distrib_list.append(distrib)
-            input_parameters_samples_df[f'{input_name}'] = pd.DataFrame(
-                np.array(distrib.getSample(sample_size))
-            )
+        distrib_list = [
+            self.build_distribution(
+                distribution_parameters[input_name], confidence_interval)
+            for input_name in input_parameters_names
+        ]
 
-        # MONTECARLO COMPOSED DISTRIBUTION
+        # COMPOSED DISTRIBUTION
         R = ot.CorrelationMatrix(len(input_parameters_names))
         copula = ot.NormalCopula(R)
         distribution = ot.ComposedDistribution(distrib_list, copula)
-        composed_distrib_sample = distribution.getSample(sample_size)
-
-        # plot
-        # for i in range(len(input_parameters)):
-        #     graph = distribution.drawMarginal1DPDF(i, 90, 100, 256)
-        #     graph.setTitle(
-        #         f'{input_parameters[i]} {input_param_dict[input_parameters[i]]["distribution"]} distribution')
-        #     view = View(graph, plot_kw={'color': 'blue'})
 
         # INTERPOLATION
         input_parameters_single_values_tuple = tuple(
-            [
-                input_distribution_parameters_df.loc[
-                    input_distribution_parameters_df['parameter'] == input_name
-                ]['values'].values[0]
-                for input_name in input_parameters_names
-            ]
+            np.sort(samples_df[input_name].unique())
+            for input_name in input_parameters_names
         )
         input_dim_tuple = tuple(
             [len(sub_t) for sub_t in input_parameters_single_values_tuple]
@@ -516,16 +505,50 @@ class UncertaintyQuantification(SoSDiscipline):
         # interpolation
         all_data_df = samples_df.merge(data_df, on='scenario', how='left')
         all_data_df = all_data_df.sort_values(by=input_parameters_names)
-        output_interpolated_values_df = pd.DataFrame()
-        for output_name in output_names:
-            y = list(all_data_df[output_name])
-            # adapt output format to be used by RegularGridInterpolator
-            output_values = np.reshape(y, input_dim_tuple)
-            f = RegularGridInterpolator(
-                input_parameters_single_values_tuple, output_values, bounds_error=False
-            )
-            output_interpolated_values = f(composed_distrib_sample)
-            output_interpolated_values_df[f'{output_name}'] = output_interpolated_values
+        # stack all outputs on a trailing axis so that a single interpolator
+        # evaluates every output at once
+        output_values = np.reshape(
+            all_data_df[output_names].to_numpy(dtype=float),
+            input_dim_tuple + (len(output_names),),
+        )
+
+        # SAMPLING, by batches of sample_size until the confidence interval
+        # of the outputs mean is below the tolerance if the stopping rule is
+        # activated
+        sampler = self.get_sampler(
+            distribution, inputs_dict['sampling_method'], inputs_dict['antithetic_variates'])
+        adaptive_tolerance = inputs_dict['adaptive_tolerance'] / 100
+        max_sample_size = inputs_dict['max_sample_size']
+        input_samples_list = []
+        output_samples_list = []
+        n_samples = 0
+        while True:
+            input_samples = sampler(sample_size)
+            input_samples_list.append(input_samples)
+            output_samples_list.append(self.interpolate_outputs(
+                input_parameters_single_values_tuple,
+                output_values,
+                input_samples,
+                n_processes,
+            ))
+            n_samples += sample_size
+            if adaptive_tolerance <= 0.0 or n_samples + sample_size > max_sample_size:
+                break
+            ci_width = self.compute_relative_ci_width(
+                np.concatenate(output_samples_list), confidence_interval)
+            if ci_width <= adaptive_tolerance:
+                break
+
+        if adaptive_tolerance > 0.0:
+            self.logger.info(
+                f'Uncertainty quantification sampling stopped after {n_samples} samples')
+
+        input_parameters_samples_df = pd.DataFrame(
+            np.concatenate(input_samples_list), columns=input_parameters_names
+        )
+        output_interpolated_values_df = pd.DataFrame(
+            np.concatenate(output_samples_list), columns=output_names
+        )
 
         dict_values = {
             'input_parameters_samples_df': input_parameters_samples_df,
@@ -534,11 +557,122 @@ class UncertaintyQuantification(SoSDiscipline):
 
         self.store_sos_outputs_values(dict_values)
 
+    def get_sampler(self, distribution, sampling_method, antithetic_variates=False):
+        '''
+        Return a function drawing a given number of samples of the composed distribution
+        Successive calls continue the low-discrepancy sequences instead of restarting them
+        '''
+        ot = import_openturns()
+        dimension = distribution.getDimension()
+        if sampling_method == self.MONTE_CARLO and not antithetic_variates:
+            return lambda size: np.array(distribution.getSample(size))
+
+        unit_distribution = ot.ComposedDistribution(
+            [ot.Uniform(0.0, 1.0)] * dimension)
+        if sampling_method == self.MONTE_CARLO:
+            uniform_sampler = unit_distribution.getSample
+        elif sampling_method == self.SOBOL:
+            uniform_sampler = ot.SobolSequence(dimension).generate
+        elif sampling_method == self.HALTON:
+            uniform_sampler = ot.HaltonSequence(dimension).generate
+        elif sampling_method == self.LHS:
+            def uniform_sampler(size):
+                return ot.LHSExperiment(unit_distribution, size).generate()
+        else:
+            raise ValueError(
+                f'Unknown sampling method {sampling_method}, possible values are {self.SAMPLING_METHODS}')
+
+        marginals = [distribution.getMarginal(i) for i in range(dimension)]
+
+        def sampler(size):
+            if antithetic_variates:
+                # each uniform point u is paired with its mirror 1 - u
+                half_sample = np.array(uniform_sampler((size + 1) // 2))
+                unit_sample = np.concatenate(
+                    [half_sample, 1.0 - half_sample])[:size]
+            else:
+                unit_sample = np.array(uniform_sampler(size))
+            # keep away from 0 and 1 where unbounded quantiles are infinite
+            unit_sample = np.clip(unit_sample, 1e-12, 1.0 - 1e-12)
+            return np.column_stack([
+                np.array(marginal.computeQuantile(
+                    unit_sample[:, i].tolist())).flatten()
+                for i, marginal in enumerate(marginals)
+            ])
+
+        return sampler
+
+    def compute_relative_ci_width(self, output_samples, confidence_interval):
+        '''
+        Compute the largest width of the confidence interval on the outputs mean relatively to the mean
+        The Monte Carlo estimate is conservative for low-discrepancy samples
+        '''
+        ratio = norm.ppf(1 - (1 - confidence_interval) / 2)
+        n_samples = np.count_nonzero(~np.isnan(output_samples), axis=0)
+        mean = np.nanmean(output_samples, axis=0)
+        std = np.nanstd(output_samples, axis=0)
+        ci_width = 2 * ratio * std / np.sqrt(np.maximum(n_samples, 1))
+        relative_ci_width = ci_width / np.maximum(np.abs(mean), np.finfo(float).tiny)
+
+        return np.nanmax(relative_ci_width, initial=0.0)
+
+    def build_distribution(self, distribution_parameters, confidence_interval):
+        '''
+        Build the openturns distribution of an input parameter from its row of input_distribution_parameters_df
+        '''
+        distribution_name = distribution_parameters['distribution']
+        lower_bnd = distribution_parameters['lower_parameter']
+        upper_bnd = distribution_parameters['upper_parameter']
+        most_probable_val = distribution_parameters['most_probable_value']
+
+        if distribution_name == 'Normal':
+            distrib = self.Normal_distrib(
+                lower_bnd, upper_bnd, confidence_interval=confidence_interval
+            )
+        elif distribution_name == 'PERT':
+            distrib = self.PERT_distrib(
+                lower_bnd, upper_bnd, most_probable_val)
+        elif distribution_name == 'LogNormal':
+            distrib = self.LogNormal_distrib(
+                lower_bnd, upper_bnd, confidence_interval=confidence_interval
+            )
+        elif distribution_name == 'Triangular':
+            distrib = self.Triangular_distrib(
+                lower_bnd, upper_bnd, most_probable_val)
+        else:
+            self.logger.exception(
+                'Exception occurred: possible values in distribution are [Normal, PERT, Triangular, LogNormal].'
+            )
+            raise ValueError(
+                f'Unknown distribution {distribution_name}, possible values are [Normal, PERT, Triangular, LogNormal]'
+            )
+
+        return distrib
+
+    def interpolate_outputs(self, grid_values, output_values, samples, n_processes=1):
+        '''
+        Interpolate the stacked outputs grid on the Monte Carlo samples
+        The samples are split in n_processes chunks evaluated in a thread pool
+        '''
+        interpolator = RegularGridInterpolator(
+            grid_values, output_values, bounds_error=False
+        )
+        if n_processes <= 1 or len(samples) < 2 * n_processes:
+            return interpolator(samples)
+
+        samples_chunks = np.array_split(samples, n_processes)
+        with ThreadPoolExecutor(max_workers=n_processes) as executor:
+            interpolated_chunks = list(
+                executor.map(interpolator, samples_chunks))
+
+        return np.concatenate(interpolated_chunks)
+
     def Normal_distrib(self, lower_bnd, upper_bnd, confidence_interval=0.95):
         # Normal distribution
         # 90% confidence interval : ratio = 3.29
         # 95% confidence interval : ratio = 3.92
         # 99% confidence interval : ratio = 5.15
+        ot = import_openturns()
         norm_val = float(format(1 - confidence_interval, '.2f')) / 2
         ratio = norm.ppf(1 - norm_val) - norm.ppf(norm_val)
 
@@ -554,6 +688,7 @@ class UncertaintyQuantification(SoSDiscipline):
 
     def PERT_distrib(self, lower_bnd, upper_bnd, most_probable_val):
         # PERT distribution (from chaopsy library cause ot doesnt have it)
+        ot = import_openturns()
         chaospy_dist = cp.PERT(lower_bnd, most_probable_val, upper_bnd)
         distrib = ot.Distribution(ot.ChaospyDistribution(chaospy_dist))
 
@@ -564,6 +699,7 @@ class UncertaintyQuantification(SoSDiscipline):
         return distrib
 
     def Triangular_distrib(self, lower_bnd, upper_bnd, most_probable_val):
+        ot = import_openturns()
         distrib = ot.Triangular(int(lower_bnd), int(
             most_probable_val), int(upper_bnd))
 
@@ -578,6 +714,7 @@ class UncertaintyQuantification(SoSDiscipline):
         # 90% confidence interval : ratio = 3.29
         # 95% confidence interval : ratio = 3.92
         # 99% confidence interval : ratio = 5.15
+        ot = import_openturns()
         norm_val = float(format(1 - confidence_interval, '.2f')) / 2
         ratio = norm.ppf(1 - norm_val) - norm.ppf(norm_val)
 
@@ -701,6 +838,7 @@ class UncertaintyQuantification(SoSDiscipline):
     def input_histogram_graph(
         self, data, data_name, distrib_param, confidence_interval
     ):
+        go = import_plotly_graph_objects()
         name = self.data_details.loc[self.data_details["variable"] == data_name][
             "name"
         ].values[0]
@@ -840,6 +978,7 @@ class UncertaintyQuantification(SoSDiscipline):
 
     def output_histogram_graph(self, data, data_name, confidence_interval):
 
+        go = import_plotly_graph_objects()
         name = data_name
         unit = None
         eval_output_name = data_name
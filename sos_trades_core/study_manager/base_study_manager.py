@@ -65,6 +65,8 @@ class BaseStudyManager():
         self.__logger = logger
         self.__execution_engine = None
         self.__rw_strategy = DirectLoadDump()
+        # data versions of the last data dump into each study folder
+        self.__dumped_data_versions = {}
         self.__yield_method = yield_method
         self.__execution_engine = execution_engine
 
@@ -244,7 +246,16 @@ class BaseStudyManager():
         # Retrieve data to dump
         data = self.execution_engine.get_anonimated_data_dict()
 
-        self._put_data_into_file(study_folder_path, data)
+        # variables whose version changed since the last dump into this folder
+        data_versions = self.execution_engine.get_anonimated_data_versions()
+        dumped_versions = self.__dumped_data_versions.get(study_folder_path)
+        dirty_keys = None
+        if dumped_versions is not None:
+            dirty_keys = [key for key, version in data_versions.items()
+                          if key not in dumped_versions or dumped_versions[key] != version]
+
+        self._put_data_into_file(study_folder_path, data, dirty_keys=dirty_keys)
+        self.__dumped_data_versions[study_folder_path] = data_versions
         
     def dump_cache(self, study_folder_path):
         """ Method that dump cache_map from the data manager to a file
@@ -507,7 +518,7 @@ class BaseStudyManager():
 
         return result
 
-    def _put_data_into_file(self, study_folder_path, data):
+    def _put_data_into_file(self, study_folder_path, data, dirty_keys=None):
         """ Method that load save from a file using an serializer object strategy (set with the according setter)
         File will be entirely overwrittent
 
@@ -517,13 +528,16 @@ class BaseStudyManager():
         :params: data, data to save
         :type: dict
 
+        :params: dirty_keys, keys of data changed since the last dump, all if None
+        :type: list
+
         """
 
         if study_folder_path is not None:
             serializer = DataSerializer()
 
             serializer.put_dict_from_study(
-                study_folder_path, self.__rw_strategy, data)
+                study_folder_path, self.__rw_strategy, data, dirty_keys=dirty_keys)
             
     def _put_cache_into_file(self, study_folder_path, data):
         """ Method that load save from a file using an serializer object strategy (set with the according setter)
@@ -639,7 +653,7 @@ class BaseStudyManager():
             serializer = DataSerializer()
 
             loaded_dict = serializer.get_dict_from_study(
-                study_folder_path, DirectLoadDump())
+                study_folder_path, rw_strategy)
 
             input_dict = {key: value[SoSDiscipline.VALUE]
                           for key, value in loaded_dict.items()}
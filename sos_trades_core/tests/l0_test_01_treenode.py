@@ -18,8 +18,13 @@ mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Treenode test suite
 '''
 import unittest
+import os
+from os.path import join
+from tempfile import mkdtemp
+from shutil import rmtree
 
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
+from sos_trades_core.tools.tree.treenode import TreeNode, MARKDOWN_CACHE
 
 
 class TestTreenode(unittest.TestCase):
@@ -85,3 +90,90 @@ class TestTreenode(unittest.TestCase):
             self.assertIn(child['full_namespace'], [
                           f'{namespace}.{disc}' for disc in disc_list])
             self.assertEqual(child['children'], [])
+
+    def test_03_lazy_treeview_and_subtree_to_dict(self):
+
+        namespace = 'study'
+        ee = ExecutionEngine(namespace)
+        ns_dict = {'ns_ac': namespace}
+        ee.ns_manager.add_ns_def(ns_dict)
+        ee.select_root_process(self.repo, 'test_disc1_disc2_coupling')
+        ee.configure()
+        tw_object = ee.get_treeview()
+
+        # nothing is read until a node is expanded
+        disc1_node = tw_object.get_treenode(f'{namespace}.Disc1')
+        disc2_node = tw_object.get_treenode(f'{namespace}.Disc2')
+        self.assertIsNone(tw_object.get_treenode(f'{namespace}.Disc3'))
+        self.assertFalse(disc1_node.is_expanded)
+        self.assertFalse(disc2_node.is_expanded)
+
+        # a node expanded after a DM change reads the current DM data
+        b_key = f'{namespace}.Disc1.b'
+        ee.dm.set_data(b_key, 'value', 4.)
+
+        # serialize only Disc1 subtree
+        disc1_dict = tw_object.to_dict(f'{namespace}.Disc1')
+        self.assertEqual(disc1_dict['full_namespace'], f'{namespace}.Disc1')
+        self.assertIn(b_key, disc1_dict['disc_data'])
+        self.assertEqual(disc1_dict['disc_data'][b_key]['value'], 4.)
+        self.assertEqual(disc1_dict['data'][b_key]['value'], 4.)
+        self.assertTrue(disc1_node.is_expanded)
+        self.assertFalse(disc2_node.is_expanded)
+
+        # an expanded node is a snapshot patched by the DM change events
+        ee.dm.set_data(b_key, 'value', 5.)
+        self.assertEqual(disc1_node.disc_data[b_key]['value'], 5.)
+        self.assertEqual(disc1_node.data[b_key]['value'], 5.)
+        self.assertIsNot(disc1_node.data[b_key], ee.dm.get_data(b_key))
+        self.assertDictEqual(tw_object.get_changes()[f'{namespace}.Disc1'],
+                             {'data': {b_key: {'value': 5.}},
+                              'disc_data': {b_key: {'value': 5.}}})
+
+        # depth limited serialization keeps children information
+        root_dict = tw_object.to_dict(depth=0)
+        self.assertEqual(root_dict['children'], [])
+        self.assertTrue(root_dict['has_children'])
+        self.assertFalse(disc2_node.is_expanded)
+
+        # whole treeview is unchanged
+        tw_dict = tw_object.to_dict()
+        self.assertEqual(len(tw_dict['children']), 2)
+        self.assertTrue(disc2_node.is_expanded)
+
+        with self.assertRaises(KeyError):
+            tw_object.to_dict(f'{namespace}.Disc3')
+
+    def test_04_markdown_documentation_cache(self):
+
+        tmp_dir = mkdtemp()
+        try:
+            filepath = join(tmp_dir, 'my_model.py')
+            doc_dir = join(tmp_dir, 'documentation')
+            os.mkdir(doc_dir)
+            markdown_filepath = join(doc_dir, 'my_model.md')
+            with open(markdown_filepath, 'w', encoding='utf-8') as f:
+                f.write('# First documentation')
+
+            self.assertEqual(TreeNode.get_markdown_documentation(
+                filepath), '# First documentation')
+
+            # cached documentation is returned while files are not modified
+            cached_markdown = MARKDOWN_CACHE[filepath]
+            TreeNode.get_markdown_documentation(filepath)
+            self.assertIs(MARKDOWN_CACHE[filepath], cached_markdown)
+
+            # modified markdown file is read again
+            mtime = os.path.getmtime(markdown_filepath)
+            with open(markdown_filepath, 'w', encoding='utf-8') as f:
+                f.write('# Second documentation')
+            os.utime(markdown_filepath, (mtime + 10, mtime + 10))
+            self.assertEqual(TreeNode.get_markdown_documentation(
+                filepath), '# Second documentation')
+
+            # removing the markdown file invalidates the cache
+            os.remove(markdown_filepath)
+            self.assertEqual(
+                TreeNode.get_markdown_documentation(filepath), '')
+        finally:
+            rmtree(tmp_dir)
@@ -17,6 +17,13 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 '''
 import unittest
+import sys
+import json
+from importlib import invalidate_caches
+from os import makedirs
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
 
 from sos_trades_core.sos_processes.processes_factory import SoSProcessFactory
 
@@ -63,3 +70,62 @@ class TestSoSProcessFactory(unittest.TestCase):
 
         for target in target_list:
             self.assertIn(target, SoSPF_process_list)
+
+    def create_process(self, repository_dir, process_dir):
+        '''
+        Create a process folder with its packages in a temporary repository
+        '''
+        package_dir = repository_dir
+        for package in process_dir.split('.'):
+            package_dir = join(package_dir, package)
+            makedirs(package_dir, exist_ok=True)
+            open(join(package_dir, '__init__.py'), 'a').close()
+        open(join(package_dir, 'process.py'), 'w').close()
+
+    def test_04_processes_cache(self):
+        '''
+        Check that processes are read from the cache and that new processes and refresh are taken into account
+        '''
+        tmp_dir = mkdtemp()
+        cache_file_path = join(tmp_dir, 'processes_cache.json')
+        # temporary repository with a process and an empty sub package
+        repository_dir = join(tmp_dir, 'repository')
+        raw_repository = 'tmp_cached_repository.sos_processes'
+        repository_to_check = f'{raw_repository}.test'
+        self.create_process(
+            repository_dir, f'{repository_to_check}.test_cached_process')
+        makedirs(join(repository_dir, *raw_repository.split('.'), 'test', 'sub'))
+        sys.path.insert(0, repository_dir)
+        invalidate_caches()
+        try:
+            cold_process_factory = SoSProcessFactory(
+                [raw_repository], False, use_cache=True, cache_file_path=cache_file_path)
+            with open(cache_file_path) as cache_file:
+                cache = json.load(cache_file)
+            self.assertIn(raw_repository, cache['repositories'])
+
+            warm_process_factory = SoSProcessFactory(
+                [raw_repository], False, use_cache=True, cache_file_path=cache_file_path)
+            self.assertDictEqual(cold_process_factory.get_processes_dict(),
+                                 warm_process_factory.get_processes_dict())
+            self.assertListEqual(warm_process_factory.get_processes_id_list(repository_to_check),
+                                 ['test_cached_process'])
+
+            # a new process folder in a folder without process changes its mtime
+            self.create_process(
+                repository_dir, f'{repository_to_check}.sub.test_new_process')
+            process_factory = SoSProcessFactory(
+                [raw_repository], False, use_cache=True, cache_file_path=cache_file_path)
+            self.assertIn('test_new_process',
+                          process_factory.get_processes_id_list(f'{repository_to_check}.sub'))
+
+            rmtree(join(repository_dir, *repository_to_check.split('.'), 'sub'))
+            process_factory.refresh()
+            self.assertNotIn(f'{repository_to_check}.sub',
+                             process_factory.get_processes_dict())
+        finally:
+            sys.path.remove(repository_dir)
+            for module_name in [module_name for module_name in sys.modules
+                                if module_name.startswith('tmp_cached_repository')]:
+                del sys.modules[module_name]
+            rmtree(tmp_dir)
@@ -17,22 +17,26 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 '''
 import unittest
+from unittest.mock import patch
 from copy import deepcopy
-from os import makedirs
+from os import makedirs, listdir, stat
 from os.path import join, dirname, basename
 from pathlib import Path
 from shutil import rmtree, unpack_archive
+from zipfile import ZipFile
 from time import sleep
 from sys import platform
 from multiprocessing import cpu_count
 
-from numpy import array
+from numpy import array, memmap, arange, ones
+from numpy.testing import assert_array_equal
 from pandas import DataFrame, read_csv
 from pandas.testing import assert_frame_equal
 
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
-from sos_trades_core.tools.tree.serializer import DataSerializer, CSV_SEP, FILE_URL, generate_unique_data_csv
-from sos_trades_core.tools.rw.load_dump_dm_data import DirectLoadDump
+from sos_trades_core.tools.tree.serializer import DataSerializer, CSV_SEP, FILE_URL, generate_unique_data_csv, \
+    strip_study_from_namespace
+from sos_trades_core.tools.rw.load_dump_dm_data import DirectLoadDump, ChunkedLoadDump
 from tempfile import gettempdir
 from sos_trades_core.study_manager.base_study_manager import BaseStudyManager
 
@@ -377,3 +381,139 @@ class TestSerializeDF(unittest.TestCase):
         self.assertEqual(y2, a2 * x2 + b2)
         self.dir_to_del.append(
             dump_dir)
+
+    def test_06_load_from_pickle_scales_with_study_size(self):
+        dump_dir = join(self.root_dir, 'TestLoadFromPickle')
+        makedirs(dump_dir, exist_ok=True)
+        self.dir_to_del.append(dump_dir)
+        rw_strategy = DirectLoadDump()
+
+        def count_key_strips(n_vars):
+            # loaded study is renamed into current study, its name also
+            # appears inside a variable name and must be kept as is
+            loaded_dict = {f'Study.Disc{i}.Study.x': {'value': float(i)}
+                           for i in range(n_vars)}
+            data_dict = {f'NewStudy.Disc{i}.Study.x': {'value': None}
+                         for i in range(n_vars)}
+            serializer = DataSerializer()
+            serializer.dm_pkl_file = join(dump_dir, f'dm_{n_vars}.pkl')
+            rw_strategy.dump(loaded_dict, serializer.dm_pkl_file)
+
+            with patch('sos_trades_core.tools.tree.serializer.strip_study_from_namespace',
+                       wraps=strip_study_from_namespace) as mock_strip:
+                serializer.load_from_pickle(data_dict, rw_strategy)
+
+            self.assertListEqual(list(data_dict.keys()),
+                                 [f'NewStudy.Disc{i}.Study.x' for i in range(n_vars)])
+            self.assertEqual(
+                data_dict[f'NewStudy.Disc{n_vars - 1}.Study.x']['value'], n_vars - 1)
+            return mock_strip.call_count
+
+        # each key is stripped once, instead of the whole data_dict being
+        # stripped again for each loaded variable
+        self.assertEqual(count_key_strips(100), 2 * 100)
+        self.assertEqual(count_key_strips(1000), 2 * 1000)
+
+        # unknown variables are still reported
+        serializer = DataSerializer()
+        serializer.dm_pkl_file = join(dump_dir, 'dm_100.pkl')
+        with self.assertRaises(KeyError):
+            serializer.load_from_pickle({'NewStudy.x': {'value': None}},
+                                        rw_strategy)
+
+    def test_07_chunked_study_persistence(self):
+        st_name = 'TestDiscAllTypes'
+        proc_n = 'DiscAllTypes'
+        exec_eng = self.set_TestDiscAllTypes_ee(st_name, proc_n)
+        exec_eng.execute()
+        dump_dir = join(self.root_dir, 'TestChunkedPersistence')
+        self.dir_to_del.append(dump_dir)
+        rw_strategy = ChunkedLoadDump()
+
+        data_dict = exec_eng.get_anonimated_data_dict()
+        h_key = [k for k in data_dict if k.endswith(f'{proc_n}.h')][0]
+        df_key = [k for k in data_dict if k.endswith(f'{proc_n}.df_in')][0]
+        data_dict[h_key]['value'] = arange(100000.)
+        serializer = DataSerializer()
+        serializer.put_dict_from_study(dump_dir, rw_strategy, data_dict)
+
+        # a manifest and one file per structured value
+        chunks_dir = rw_strategy.get_chunks_dir(serializer.dm_pkl_file)
+        chunk_files = listdir(chunks_dir)
+        self.assertTrue(any(f.endswith('.npy') for f in chunk_files))
+        self.assertTrue(any(f.endswith('.parquet') or f.endswith('.pkl')
+                            for f in chunk_files))
+
+        # full reload
+        loaded_dict = serializer.get_dict_from_study(dump_dir, rw_strategy)
+        self.assertListEqual(list(data_dict.keys()), list(loaded_dict.keys()))
+        assert_array_equal(loaded_dict[h_key]['value'], arange(100000.))
+        assert_frame_equal(loaded_dict[df_key]['value'], self.df_in_data)
+        for key, param_dict in data_dict.items():
+            if not serializer.is_structured_data_type(param_dict['value']):
+                self.assertEqual(param_dict['value'],
+                                 loaded_dict[key]['value'], key)
+
+        # lazy load of a single variable, array is memory-mapped
+        serializer = DataSerializer(rw_object=rw_strategy)
+        h_data = serializer.get_parameter_data(h_key, study_to_load=dump_dir)
+        self.assertIsInstance(h_data['value'], memmap)
+        assert_array_equal(h_data['value'], arange(100000.))
+        self.assertEqual(h_data['type'], 'array')
+        del h_data
+
+        # incremental save, only the chunk of the modified value is written
+        # into a new file, the previous one is removed after the manifest
+        mtimes = {f: stat(join(chunks_dir, f)).st_mtime_ns
+                  for f in listdir(chunks_dir)}
+        sleep(0.1)
+        data_dict[df_key]['value'] = self.df_in_data * 2.
+        serializer.put_dict_from_study(dump_dir, rw_strategy, data_dict)
+        new_mtimes = {f: stat(join(chunks_dir, f)).st_mtime_ns
+                      for f in listdir(chunks_dir)}
+        self.assertEqual(len(set(mtimes) - set(new_mtimes)), 1)
+        self.assertEqual(len(set(new_mtimes) - set(mtimes)), 1)
+        for chunk_file in set(mtimes) & set(new_mtimes):
+            self.assertEqual(mtimes[chunk_file], new_mtimes[chunk_file])
+        df_data = serializer.get_parameter_data(df_key)
+        assert_frame_equal(df_data['value'], self.df_in_data * 2.)
+
+        # explicit dirty keys skip the checksum of the other values
+        data_dict[h_key]['value'] = arange(10.)
+        serializer.put_dict_from_study(dump_dir, rw_strategy, data_dict,
+                                       dirty_keys=[h_key])
+        loaded_dict = serializer.get_dict_from_study(dump_dir, rw_strategy)
+        assert_array_equal(loaded_dict[h_key]['value'], arange(10.))
+        assert_frame_equal(loaded_dict[df_key]['value'], self.df_in_data * 2.)
+
+    def test_08_zip_export_without_temporary_folder(self):
+        n_vars = 200
+        df_value = DataFrame(ones((1000, 10)),
+                             columns=[f'col{i}' for i in range(10)])
+        origin_dict = {}
+        for i in range(n_vars):
+            origin_dict[f'Study.df_{i}'] = {'unit': 'kg', 'value': df_value * i}
+            origin_dict[f'Study.dict_{i}'] = {'unit': None,
+                                              'value': {'a': df_value, 'b': df_value}}
+            origin_dict[f'Study.x_{i}'] = {'unit': 'm', 'value': float(i)}
+        export_dir = join(self.out_dir, 'test_zip_export')
+        self.dir_to_del.append(self.out_dir)
+
+        serializer = DataSerializer()
+        export_dir_zip = serializer.export_data_dict_and_zip(origin_dict,
+                                                             export_dir)
+
+        # no intermediate folder is written
+        self.assertFalse(Path(export_dir).is_dir())
+        with ZipFile(export_dir_zip) as zip_file:
+            names = zip_file.namelist()
+            dm_values = read_csv(zip_file.open(
+                f'{basename(export_dir)}/{DataSerializer.val_filename}'),
+                delimiter=CSV_SEP, header=0, index_col=0)
+            df_5 = read_csv(zip_file.open(
+                f'{basename(export_dir)}/Study.df_5.csv'), delimiter=CSV_SEP)
+        self.assertEqual(len(names), 2 * n_vars + 1)
+        self.assertEqual(dm_values.loc['Study.df_5']['value'],
+                         FILE_URL + 'Study.df_5.csv')
+        self.assertEqual(dm_values.loc['Study.x_5']['value'], '5.0')
+        assert_frame_equal(df_5, df_value * 5)
@@ -315,6 +315,58 @@ class TestTreeviewAndData(unittest.TestCase):
         self.assertTrue(len(graph_list) == 1)
 
 
+    def test_06_treeview_incremental_changes(self):
+
+        self.exec_eng.select_root_process(self.repo, self.sub_proc)
+        self.exec_eng.configure()
+
+        treeview = self.exec_eng.get_treeview()
+        disc1_node = treeview.get_treenode(f'{self.namespace}.Disc1')
+        # expand Disc1 node and root node
+        treeview.to_dict(f'{self.namespace}.Disc1')
+        self.assertIn(f'{self.namespace}.x', treeview.root.data)
+        self.assertDictEqual(self.exec_eng.get_treeview_changes(), {})
+
+        # DM value change patches the treeview and is sent as a diff
+        dm_events = []
+        self.exec_eng.dm.add_change_listener(
+            lambda event, key, changes: dm_events.append((event, key)))
+        self.exec_eng.dm.set_values_from_dict(
+            {f'{self.namespace}.Disc1.a': 3.0, f'{self.namespace}.x': 2.0})
+        self.assertIs(self.exec_eng.get_treeview(), treeview)
+        self.assertIn(
+            (self.exec_eng.dm.VARIABLE_CHANGED, f'{self.namespace}.Disc1.a'), dm_events)
+
+        changes = self.exec_eng.get_treeview_changes()
+        self.assertEqual(
+            changes[f'{self.namespace}.Disc1']['data'][f'{self.namespace}.Disc1.a'][SoSDiscipline.VALUE], 3.0)
+        self.assertEqual(
+            changes[f'{self.namespace}.Disc1']['disc_data'][f'{self.namespace}.Disc1.a'][SoSDiscipline.VALUE], 3.0)
+        self.assertEqual(
+            changes[self.namespace]['data'][f'{self.namespace}.x'][SoSDiscipline.VALUE], 2.0)
+        self.assertEqual(
+            disc1_node.data[f'{self.namespace}.Disc1.a'][SoSDiscipline.VALUE], 3.0)
+        # Disc2 node has not been expanded, nothing is sent for it
+        self.assertNotIn(f'{self.namespace}.Disc2', changes)
+        self.assertDictEqual(self.exec_eng.get_treeview_changes(), {})
+
+        # discipline status change
+        disc1 = self.exec_eng.dm.get_disciplines_with_name(
+            f'{self.namespace}.Disc1')[0]
+        disc1._update_status_dm(SoSDiscipline.STATUS_RUNNING)
+        changes = self.exec_eng.get_treeview_changes()
+        self.assertDictEqual(changes, {f'{self.namespace}.Disc1': {
+                             'status': SoSDiscipline.STATUS_RUNNING}})
+        self.assertEqual(disc1_node.status, SoSDiscipline.STATUS_RUNNING)
+        disc1._update_status_dm(SoSDiscipline.STATUS_CONFIGURE)
+        self.assertEqual(disc1_node.status, SoSDiscipline.STATUS_CONFIGURE)
+
+        # removed variable needs a new treeview
+        self.exec_eng.dm.remove_keys(
+            disc1.disc_id, f'{self.namespace}.Disc1.b')
+        self.assertIsNone(self.exec_eng.get_treeview_changes())
+        self.assertIsNot(self.exec_eng.get_treeview(), treeview)
+
 if '__main__' == __name__:
     cls = TestTreeviewAndData()
     cls.setUp()
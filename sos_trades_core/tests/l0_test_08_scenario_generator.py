@@ -68,5 +68,43 @@ class TestScenarioGenerator(unittest.TestCase):
         )), self.result, 'Generated scenarios are incorrect')
 
 
+    def test_02_generate_scenarios_by_chunk_and_dataframe(self):
+        '''
+        chunked and dataframe generations give the same scenarios as generate_scenarios
+        '''
+        scenarios_chunks = list(self.scenario_generator.generate_scenarios_by_chunk(
+            self.dict_parameters, chunk_size=3))
+        self.assertListEqual([len(chunk) for chunk in scenarios_chunks], [3, 3, 2])
+        generated_scenarios = {}
+        for chunk in scenarios_chunks:
+            generated_scenarios.update(chunk)
+        self.assertListEqual(list(generated_scenarios.values()), self.result)
+
+        scenarios_df = ScenarioGenerator().generate_scenarios_df(self.dict_parameters)
+        self.assertListEqual(scenarios_df.columns.tolist(), [
+                             'scenario_name', 'envscenarios', 'products'])
+        self.assertListEqual(scenarios_df['scenario_name'].tolist(), [
+                             f'scenario_{i}' for i in range(1, 9)])
+        self.assertListEqual(scenarios_df[['envscenarios', 'products']].to_dict(orient='records'),
+                             self.result)
+
+        self.assertEqual(len(ScenarioGenerator().generate_scenarios_df(
+            {'envscenarios': ['NPS', '2DS'], 'products': []})), 0)
+
+    def test_03_generate_combinations_from_strings(self):
+        '''
+        dict of list given as strings are parsed as python literals, not evaluated
+        '''
+        dict_products = {'Airbus': "[['CH19_Kero'], ['CH19_Kero', 'CH19_H2']]",
+                         'Boeing': "[['BCH19_Kero'], ['BCH19_H2']]"}
+        generated_scenarios = self.scenario_generator.generate_scenarios(
+            {'envscenarios': ['NPS', '2DS'], 'products': dict_products})
+        self.assertListEqual(list(generated_scenarios.values()), self.result)
+
+        with self.assertRaises(ValueError):
+            self.scenario_generator.generate_combinations(
+                {'Airbus': "__import__('os').getcwd()"})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -703,6 +703,159 @@ class TestGradients(unittest.TestCase):
 #         for graph in graph_list:
 #             graph.to_plotly().show()
 
+    def test_12_parallel_gradient_analysis(self):
+        '''
+            Compare a gradient analysis evaluated on several processes with the sequential one
+        '''
+        builder_list = self.exec_eng.factory.get_builder_from_process(repo=self.repo,
+                                                                      mod_id=self.sub_proc)
+
+        gradient_builder = self.exec_eng.factory.create_evaluator_builder(
+            'GA', 'gradient', builder_list)
+
+        self.exec_eng.factory.set_builders_to_coupling_builder(
+            gradient_builder)
+
+        self.exec_eng.configure()
+
+        # [a,x,b,cst,power]
+        x0 = np.array([3., 2., 10., -10., 2])
+
+        values_dict = {}
+        values_dict['EETests.GA.eval_inputs'] = ['a', 'x',
+                                                 'b', 'constant']
+        values_dict['EETests.GA.eval_outputs'] = ['y', 'z']
+        values_dict['EETests.GA.grad_method'] = '2nd order FD'
+        values_dict['EETests.GA.Disc1.a'] = x0[0]
+        values_dict['EETests.x'] = x0[1]
+        values_dict['EETests.GA.Disc1.b'] = x0[2]
+        values_dict['EETests.GA.Disc2.constant'] = x0[3]
+        values_dict['EETests.GA.Disc2.power'] = int(x0[4])
+
+        self.exec_eng.load_study_from_input_dict(values_dict)
+        self.exec_eng.execute()
+
+        gradients_output = self.exec_eng.dm.get_value(
+            'EETests.GA.gradient_outputs')
+
+        values_dict['EETests.GA.n_processes'] = 2
+        self.exec_eng.load_study_from_input_dict(values_dict)
+        self.exec_eng.execute()
+
+        gradients_output_parallel = self.exec_eng.dm.get_value(
+            'EETests.GA.gradient_outputs')
+
+        self.assertListEqual(list(gradients_output.keys()),
+                             list(gradients_output_parallel.keys()))
+        for key, value in gradients_output.items():
+            self.assertAlmostEqual(value, gradients_output_parallel[key])
+
+        # -- the standalone multiprocess FDGradient gives the same gradient
+        grad_eval = FDGradient(2, self.demo_func, fd_step=1.e-4)
+        outputs_grad = grad_eval.grad_f(x0)
+        grad_eval.set_multi_proc(True, n_procs=2)
+        outputs_grad_multi_proc = grad_eval.grad_f(x0)
+        assert_array_almost_equal(outputs_grad, outputs_grad_multi_proc)
+
+    def test_13_parallel_sensitivity_analysis_with_duplicated_samples(self):
+        '''
+            Check that samples repeated across variations are evaluated once
+            and that a parallel sensitivity analysis gives the sequential results
+        '''
+        builder_list = self.exec_eng.factory.get_builder_from_process(repo=self.repo,
+                                                                      mod_id=self.sub_proc)
+
+        sa_builder = self.exec_eng.factory.create_evaluator_builder(
+            'SA', 'sensitivity', builder_list)
+
+        self.exec_eng.factory.set_builders_to_coupling_builder(sa_builder)
+        self.exec_eng.configure()
+
+        # [a,x,b,cst,power], b = 0 so that its variations are the no
+        # variation point
+        x0 = np.array([3., 2., 0., -10., 2])
+
+        values_dict = {}
+        values_dict['EETests.SA.eval_inputs'] = ['a', 'x',
+                                                 'b', 'constant']
+        values_dict['EETests.SA.eval_outputs'] = ['y', 'z']
+        values_dict['EETests.SA.variation_list'] = ['+/-5%']
+        values_dict['EETests.SA.Disc1.a'] = x0[0]
+        values_dict['EETests.x'] = x0[1]
+        values_dict['EETests.SA.Disc1.b'] = x0[2]
+        values_dict['EETests.SA.Disc2.constant'] = x0[3]
+        values_dict['EETests.SA.Disc2.power'] = int(x0[4])
+
+        self.exec_eng.load_study_from_input_dict(values_dict)
+
+        sa_disc = self.exec_eng.dm.get_disciplines_with_name('EETests.SA')[0]
+        eval_process_disc = sa_disc.sos_disciplines[0]
+        n_calls_before = eval_process_disc.n_calls
+        self.exec_eng.execute()
+
+        # 1 no variation sample + 2 samples for a, x and constant
+        self.assertEqual(eval_process_disc.n_calls - n_calls_before, 7)
+        self.assertEqual(sa_disc.n_samples, 9)
+        # the dm is restored at the no variation point
+        self.assertEqual(self.exec_eng.dm.get_value('EETests.SA.Disc1.a'), x0[0])
+
+        sensitivity_output = self.exec_eng.dm.get_value(
+            'EETests.SA.sensitivity_outputs')
+
+        values_dict['EETests.SA.n_processes'] = 2
+        self.exec_eng.load_study_from_input_dict(values_dict)
+        self.exec_eng.execute()
+
+        sensitivity_output_parallel = self.exec_eng.dm.get_value(
+            'EETests.SA.sensitivity_outputs')
+
+        self.assertDictEqual(sensitivity_output, sensitivity_output_parallel)
+
+    def test_14_sensitivity_samples_with_array_input(self):
+        '''
+            Check sensitivity samples built from a float and an array eval inputs
+        '''
+        builder_list = self.exec_eng.factory.get_builder_from_process(repo=self.repo,
+                                                                      mod_id='test_discall_types')
+
+        sa_builder = self.exec_eng.factory.create_evaluator_builder(
+            'SA', 'sensitivity', builder_list)
+
+        self.exec_eng.factory.set_builders_to_coupling_builder(sa_builder)
+        self.exec_eng.configure()
+
+        h_name = self.exec_eng.dm.get_all_namespaces_from_var_name('h')[0]
+        z_name = self.exec_eng.dm.get_all_namespaces_from_var_name('z')[0]
+        h0 = np.array([1., 2., 4.])
+        self.exec_eng.load_study_from_input_dict({h_name: h0, z_name: 2.})
+
+        sa_disc = self.exec_eng.dm.get_disciplines_with_name('EETests.SA')[0]
+        # array inputs are not proposed in possible values, set them directly
+        sa_disc.set_eval_in_out_lists(['h', 'z'], ['o'])
+        x_samples, input_in_samples, variation_samples = sa_disc.generate_samples(
+            [5.0])
+
+        self.assertEqual(len(x_samples), 5)
+        self.assertListEqual(input_in_samples, [
+                             h_name, h_name, z_name, z_name, 'NOVAR'])
+        self.assertListEqual(variation_samples, [5.0, -5.0, 5.0, -5.0, 0.0])
+        # the varied input is scaled as a whole, the other keeps its value
+        assert_array_almost_equal(x_samples[0][0], h0 * 1.05)
+        assert_array_almost_equal(x_samples[1][0], h0 * 0.95)
+        self.assertEqual(x_samples[0][1], 2.)
+        assert_array_almost_equal(x_samples[2][0], h0)
+        self.assertAlmostEqual(x_samples[2][1], 2.1)
+        self.assertAlmostEqual(x_samples[3][1], 1.9)
+        assert_array_almost_equal(x_samples[-1][0], h0)
+        self.assertEqual(x_samples[-1][1], 2.)
+
+        # samples with equal arrays have the same key
+        samples_keys = [sa_disc.get_sample_key(x_sample)
+                        for x_sample in x_samples]
+        self.assertEqual(len(set(samples_keys)), 5)
+        self.assertEqual(sa_disc.get_sample_key([np.zeros(3) * 1.05, 2.]),
+                         sa_disc.get_sample_key([np.zeros(3), 2.]))
+
 
 if '__main__' == __name__:
     cls = TestGradients()
@@ -21,10 +21,11 @@ import hashlib
 from time import sleep
 from shutil import rmtree
 from os import makedirs
-from copy import copy
+from copy import copy, deepcopy
 from os.path import join, dirname
 from pathlib import Path
 from pickle import dump as pkl_dump
+from numpy import array
 
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
@@ -261,6 +262,58 @@ class TestDataManagerGenerator(unittest.TestCase):
             self.assertEqual(list(disc.values())[0], SoSDiscipline.STATUS_DONE)
 
 
+    def test_03_set_values_from_dict_changed_keys(self):
+        study_name = 'EETests'
+        exec_engine = init_execution_engine_coupling_disc1_disc2(study_name)
+        dm = exec_engine.dm
+
+        x_in = f'{study_name}.x'
+        a_in = f'{study_name}.Disc1.a'
+
+        # only modified values are returned
+        changed_keys = dm.set_values_from_dict(
+            {x_in: 3., a_in: 10.}, return_changed_keys=True)
+        self.assertSetEqual(changed_keys, {x_in})
+        self.assertEqual(dm.get_value(x_in), 3.)
+
+        with self.assertRaises(ValueError):
+            dm.set_values_from_dict({x_in: 4., f'{study_name}.unknown': 1.})
+        # no value is set if one key is unknown
+        self.assertEqual(dm.get_value(x_in), 3.)
+
+        # uuid keys
+        x_id = dm.get_data_id(x_in)
+        changed_keys = dm.set_values_from_dict(
+            {x_id: 4.}, full_ns_keys=False, return_changed_keys=True)
+        self.assertSetEqual(changed_keys, {x_id})
+        self.assertEqual(dm.get_value(x_in), 4.)
+        with self.assertRaises(ValueError):
+            dm.set_values_from_dict({'unknown_id': 4.}, full_ns_keys=False)
+
+        # trusted callers skip key validation
+        changed_keys = dm.set_values_from_dict(
+            {x_in: 4., a_in: 11.}, check_keys=False, return_changed_keys=True)
+        self.assertSetEqual(changed_keys, {a_in})
+        with self.assertRaises(KeyError):
+            dm.set_values_from_dict(
+                {f'{study_name}.unknown': 1.}, check_keys=False)
+
+        # no comparison and no returned keys by default
+        self.assertIsNone(dm.set_values_from_dict({x_in: 5.}))
+
+        # reloading a copy of the whole dm with uuid keys changes nothing
+        values_dict = {var_id: deepcopy(var_data[SoSDiscipline.VALUE])
+                       for var_id, var_data in dm.data_dict.items()}
+        self.assertSetEqual(dm.set_values_from_dict(
+            values_dict, full_ns_keys=False, return_changed_keys=True), set())
+
+        # a mutable value may have been modified in place
+        value = array([1., 2.])
+        self.assertTrue(dm.is_value_changed(value, value))
+        self.assertFalse(dm.is_value_changed(value, array([1., 2.])))
+        self.assertTrue(dm.is_value_changed(value, array([1., 3.])))
+        self.assertFalse(dm.is_value_changed(3., 3.))
+
 ''' HOW TO UPDATE dm.pkl file (reference dm.data_dict):
 go to ref dir (sos_trades_core\tests\data\ref_output\<STUDY_DIR>)
 import pickle
@@ -17,6 +17,7 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 '''
 import unittest
+from unittest.mock import patch
 
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
 
@@ -271,3 +272,45 @@ class TestNamespaceManagement(unittest.TestCase):
         self.ee.load_study_from_input_dict(values_dict)
 
         self.ee.execute()
+
+    def test_07_namespace_update_transaction(self):
+
+        ns_dict = {'ns_ac': f'{self.ns_test}'}
+        self.ee.ns_manager.add_ns_def(ns_dict)
+
+        disc1_builder = self.factory.get_builder_from_module(
+            'Disc1', self.mod1_path)
+        disc2_builder = self.factory.get_builder_from_module(
+            'Disc2', self.mod2_path)
+        self.factory.set_builders_to_coupling_builder(
+            [disc1_builder, disc2_builder])
+        self.ee.configure()
+
+        dm = self.ee.dm
+        x_id = dm.get_data_id(f'{self.ns_test}.x')
+        a_id = dm.get_data_id(f'{self.ns_test}.Disc1.a')
+        constant_id = dm.get_data_id(f'{self.ns_test}.Disc2.constant')
+        disc1 = dm.get_disciplines_with_name(f'{self.ns_test}.Disc1')[0]
+
+        with patch.object(dm, 'generate_data_id_map') as generate_mock:
+            with self.ee.ns_manager.namespace_update():
+                self.ee.ns_manager.update_all_shared_namespaces_by_name(
+                    'extraNS', 'ns_ac')
+                self.ee.ns_manager.update_namespace_with_extra_ns(
+                    self.ee.ns_manager.get_local_namespace(disc1), 'extra_name', after_name=self.ns_test)
+                # data_id_map is updated at the end of the outer transaction
+                self.assertIn(f'{self.ns_test}.x', dm.data_id_map)
+            generate_mock.assert_not_called()
+
+        self.assertEqual(dm.get_data_id(f'extraNS.{self.ns_test}.x'), x_id)
+        self.assertEqual(dm.get_data_id(
+            f'{self.ns_test}.extra_name.Disc1.a'), a_id)
+        self.assertEqual(dm.get_data_id(
+            f'{self.ns_test}.Disc2.constant'), constant_id)
+        self.assertNotIn(f'{self.ns_test}.x', dm.data_id_map)
+        self.assertNotIn(f'{self.ns_test}.Disc1.a', dm.data_id_map)
+
+        # same map as a full generation
+        data_id_map = dict(dm.data_id_map)
+        dm.generate_data_id_map()
+        self.assertDictEqual(data_id_map, dm.data_id_map)
@@ -20,6 +20,7 @@ import unittest
 
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
+from sos_trades_core.execution_engine.namespace import Namespace
 
 
 class TestNSManager(unittest.TestCase):
@@ -95,3 +96,31 @@ class TestNSManager(unittest.TestCase):
         self.assertEqual(nsm.current_disc_ns, 'SA')
         nsm.change_disc_ns('toto')
         self.assertEqual(nsm.current_disc_ns, 'SA.toto')
+
+    def test_05_namespace_var_full_name_cache(self):
+        ns = Namespace('ns_ac', 'T.AC')
+        self.assertEqual(ns.get_var_full_name('x'), 'T.AC.x')
+        # full name is interned
+        self.assertIs(ns.get_var_full_name('x'), ns.get_var_full_name('x'))
+
+        # namespace update invalidates cached full names
+        nsm = self.exec_eng.ns_manager
+        nsm.update_namespace_with_extra_ns(ns, 'sc1', after_name='T')
+        self.assertEqual(ns.get_var_full_name('x'), 'T.sc1.AC.x')
+
+        ns.update_value(None)
+        self.assertEqual(ns.get_var_full_name('x'), 'x')
+        self.assertDictEqual(ns.to_dict(), {
+                             'name': 'ns_ac', 'value': None, 'dependency_disc_list': []})
+
+        # discipline full names follow namespace updates
+        nsm.set_current_disc_ns('T')
+        disc = SoSDiscipline('Disc', self.exec_eng)
+        disc._data_in = {'a': {SoSDiscipline.NS_REFERENCE: nsm.get_local_namespace(disc),
+                               SoSDiscipline.VAR_NAME: 'a'}}
+        self.assertEqual(disc.get_var_full_name(
+            'a', disc._data_in), 'T.Disc.a')
+        nsm.update_namespace_with_extra_ns(
+            nsm.get_local_namespace(disc), 'sc1', after_name='T')
+        self.assertEqual(disc.get_var_full_name(
+            'a', disc._data_in), 'T.sc1.Disc.a')
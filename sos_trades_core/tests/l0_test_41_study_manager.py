@@ -18,7 +18,12 @@ from sos_trades_core.study_manager.base_study_manager import BaseStudyManager
 from tempfile import gettempdir
 from sos_trades_core.execution_engine.data_manager import DataManager
 from os.path import join, dirname
-from sos_trades_core.tools.rw.load_dump_dm_data import CryptedLoadDump
+from sos_trades_core.tools.rw.load_dump_dm_data import CryptedLoadDump, LoadDumpException, \
+    ChunkedLoadDump
+from pickle import dumps
+from os import makedirs
+from numpy import arange
+from numpy.testing import assert_array_equal
 from sos_trades_core.tests.data import __file__ as data_folder
 from pathlib import Path
 from time import sleep
@@ -169,3 +174,76 @@ class TestStudyManager(unittest.TestCase):
                 key.replace(self.__study_name, study_bis_name))
             self.assertEqual(study.execution_engine.dm.data_dict[var_id][DataManager.VALUE],
                              study_bis.execution_engine.dm.data_dict[var_id_bis][DataManager.VALUE])
+
+    def test_06_Streamed_Encryption_By_Chunks(self):
+        """ Check the chunked encrypted format: round trip, tampering and
+        loading of files encrypted with the former single block format
+        """
+        makedirs(self.__dump_dir, exist_ok=True)
+        enc_file = join(self.__dump_dir, 'dm.pkl')
+        rw_strategy = CryptedLoadDump(private_key_file=self.__rsa_private_key_file,
+                                      public_key_file=self.__rsa_public_key_file)
+        # several chunks, the last one being partial
+        rw_strategy.chunk_size = 10000
+        data_dict = {'array': arange(12345.), 'string': 'a\nb',
+                     'dict': {'x': 1, 'y': [1, 2, 3]}}
+
+        rw_strategy.dump(data_dict, enc_file)
+        loaded_dict = rw_strategy.load(enc_file)
+        assert_array_equal(loaded_dict['array'], data_dict['array'])
+        self.assertEqual(loaded_dict['string'], data_dict['string'])
+        self.assertDictEqual(loaded_dict['dict'], data_dict['dict'])
+
+        # a modified or truncated file is rejected
+        with open(enc_file, 'rb') as enc_f_s:
+            enc_bytes = enc_f_s.read()
+        tampered_bytes = bytearray(enc_bytes)
+        tampered_bytes[len(enc_bytes) // 2] ^= 1
+        for corrupted_bytes in [bytes(tampered_bytes), enc_bytes[:-100]]:
+            with open(enc_file, 'wb') as enc_f_s:
+                enc_f_s.write(corrupted_bytes)
+            with self.assertRaises(LoadDumpException):
+                rw_strategy.load(enc_file)
+
+        # former format encrypted in a single AES-CBC block
+        rw_strategy.encrypt_stream(dumps(data_dict), enc_file)
+        loaded_dict = rw_strategy.load(enc_file)
+        assert_array_equal(loaded_dict['array'], data_dict['array'])
+        self.assertDictEqual(loaded_dict['dict'], data_dict['dict'])
+
+    def test_07_Dump_Only_Changed_Data_With_Chunked_Strategy(self):
+        """ Check that successive dumps into a study folder give the keys
+        changed in the data manager since the previous dump
+        """
+        class RecordingChunkedLoadDump(ChunkedLoadDump):
+            def __init__(self):
+                super().__init__()
+                self.dirty_keys = []
+
+            def dump(self, dict_obj, f_name, dirty_keys=None):
+                self.dirty_keys.append(dirty_keys)
+                super().dump(dict_obj, f_name, dirty_keys=dirty_keys)
+
+        study = BaseStudyManager(
+            self.__repository, self.__process, self.__study_name)
+        study.load_data(from_input_dict=self.__study_data_values)
+        study.rw_strategy = RecordingChunkedLoadDump()
+
+        # first dump checks all values, then only the changed ones
+        study.dump_data(self.__dump_dir)
+        study.dump_data(self.__dump_dir)
+        self.assertListEqual(study.rw_strategy.dirty_keys, [None, []])
+
+        study.execution_engine.dm.set_values_from_dict(
+            {f'{self.__study_name}.Disc1.a': 7.})
+        study.dump_data(self.__dump_dir)
+        dirty_keys = study.rw_strategy.dirty_keys[-1]
+        self.assertEqual(len(dirty_keys), 1)
+        self.assertTrue(dirty_keys[0].endswith('.Disc1.a'))
+
+        study_bis = BaseStudyManager(
+            self.__repository, self.__process, self.__study_name)
+        study_bis.rw_strategy = ChunkedLoadDump()
+        study_bis.load_data(self.__dump_dir)
+        self.assertEqual(study_bis.execution_engine.dm.get_value(
+            f'{self.__study_name}.Disc1.a'), 7.)
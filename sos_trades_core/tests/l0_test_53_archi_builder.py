@@ -21,6 +21,7 @@ import pandas as pd
 from logging import Handler
 
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
+from sos_trades_core.execution_engine.sos_factory import get_folder_class_index
 from sos_trades_core.sos_processes.test.test_architecture.usecase_simple_architecture import Study
 from tempfile import gettempdir
 
@@ -1056,6 +1057,102 @@ class TestArchiBuilder(unittest.TestCase):
         exp_tv_str = '\n'.join(exp_tv_list)
         assert exp_tv_str == self.exec_eng.display_treeview_nodes()
 
+    def test_13_get_module_class_path_from_class_index(self):
+
+        folder_list = ['sos_trades_core.sos_wrapping']
+        class_index = get_folder_class_index(folder_list[0])
+        self.assertEqual('sos_trades_core.sos_wrapping.sum_valueblock_discipline',
+                         class_index['SumValueBlockDiscipline'])
+
+        # the index is built once per folder
+        self.assertIs(class_index, get_folder_class_index(folder_list[0]))
+        self.assertEqual('sos_trades_core.sos_wrapping.sum_valueblock_discipline.SumValueBlockDiscipline',
+                         self.factory.get_module_class_path('SumValueBlockDiscipline', folder_list))
+        self.assertIsNone(self.factory.get_module_class_path(
+            'UnknownDiscipline', folder_list))
+
+    def test_14_memoized_architecture_and_activation(self):
+
+        mydict = {'input_name': 'AC_list',
+                  'input_type': 'string_list',
+                  'input_ns': 'ns_public',
+                  'output_name': 'AC_name',
+                  'scatter_ns': 'ns_ac'}
+        self.exec_eng.smaps_manager.add_build_map('AC_list', mydict)
+        self.exec_eng.ns_manager.add_ns_def({'ns_public': self.study_name})
+
+        vb_builder_name = 'Business'
+
+        services_architecture_df = pd.DataFrame(
+            {'Parent': ['Services', 'Services'],
+             'Current': ['FHS', 'OSS'],
+             'Type': ['ValueBlockDiscipline', 'ValueBlockDiscipline'],
+             'Action': ['standard', 'standard'],
+             'Activation': [False, False]})
+
+        architecture_df = pd.DataFrame(
+            {'Parent': ['Business', 'Business', 'Airbus', 'Airbus', 'Boeing'],
+             'Current': ['Airbus', 'Boeing', 'AC_Sales', 'Services', 'AC_Sales'],
+             'Type': ['SumValueBlockDiscipline', 'SumValueBlockDiscipline', 'SumValueBlockDiscipline', 'SumValueBlockDiscipline', 'SumValueBlockDiscipline'],
+             'Action': [('standard'), ('standard'), ('scatter', 'AC_list', 'ValueBlockDiscipline'), ('architecture', services_architecture_df), ('scatter', 'AC_list', 'ValueBlockDiscipline')],
+             'Activation': [True, True, False, False, False]})
+
+        builder = self.factory.create_architecture_builder(
+            vb_builder_name, architecture_df)
+        self.exec_eng.factory.set_builders_to_coupling_builder(builder)
+        self.exec_eng.configure()
+
+        archi_builder = builder.disc
+
+        # architecture dataframes are compiled once into dicts
+        services_index = archi_builder.get_archi_df_index(
+            services_architecture_df)
+        self.assertIs(services_index, archi_builder.get_archi_df_index(
+            services_architecture_df))
+        self.assertDictEqual(services_index[archi_builder.CHILDREN_BY_PARENT], {
+                             'Services': ['FHS', 'OSS']})
+        self.assertDictEqual(archi_builder.get_archi_df_index(architecture_df)[archi_builder.PARENTS_BY_CURRENT],
+                             {'Airbus': ['Business'], 'Boeing': ['Business'], 'AC_Sales': ['Airbus', 'Boeing'], 'Services': ['Airbus']})
+        action, args = archi_builder.get_action_builder(
+            'Airbus.Services', architecture_df)
+        self.assertEqual(action, 'architecture')
+        self.assertIs(args[0], services_architecture_df)
+
+        # sub architecture builders are built once
+        sub_builder_dict, _ = archi_builder.get_subarchi_builders(
+            services_architecture_df, 'Business.Airbus.Services')
+        sub_builder_dict_2, _ = archi_builder.get_subarchi_builders(
+            services_architecture_df, 'Business.Airbus.Services')
+        self.assertIsNot(sub_builder_dict, sub_builder_dict_2)
+        for ns, sub_builder in sub_builder_dict.items():
+            self.assertIs(sub_builder, sub_builder_dict_2[ns])
+
+        activation_df = pd.DataFrame({'Business': ['Airbus', 'Airbus', 'Boeing', 'Boeing'],
+                                      'AC_list': ['AC1', 'AC2', 'AC3', 'AC4'],
+                                      'AC_Sales': [True, True, True, True],
+                                      'Services': [True, True, False, False],
+                                      'FHS': [True, True, False, False],
+                                      'OSS': [True, True, False, False]})
+        self.exec_eng.load_study_from_input_dict(
+            {'MyCase.Business.activation_df': activation_df})
+        self.assertListEqual(list(self.exec_eng.dm.get_value(
+            'MyCase.Business.Airbus.AC_Sales.AC_list')), ['AC1', 'AC2'])
+        self.assertTrue(archi_builder.is_builder_activated(
+            'Business.Airbus.Services', 'Services'))
+
+        # filtered activation is recomputed when activation_df changes
+        activation_df = activation_df.copy()
+        activation_df['Services'] = False
+        activation_df['FHS'] = False
+        activation_df['OSS'] = False
+        activation_df.loc[activation_df['AC_list'] == 'AC2', 'AC_Sales'] = False
+        self.exec_eng.load_study_from_input_dict(
+            {'MyCase.Business.activation_df': activation_df})
+        self.assertListEqual(list(self.exec_eng.dm.get_value(
+            'MyCase.Business.Airbus.AC_Sales.AC_list')), ['AC1'])
+        self.assertFalse(archi_builder.is_builder_activated(
+            'Business.Airbus.Services', 'Services'))
+
 
 if '__main__' == __name__:
     cls = TestArchiBuilder()
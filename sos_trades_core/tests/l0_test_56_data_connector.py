@@ -21,11 +21,17 @@ from os.path import join, dirname
 from os import remove
 from sos_trades_core.tools.tree.serializer import DataSerializer
 from sos_trades_core.tools.rw.load_dump_dm_data import DirectLoadDump
-from time import sleep
+from time import sleep, time
 from pathlib import Path
+from unittest.mock import patch
+from numpy import arange, nan
+from pandas import DataFrame
+from pandas.testing import assert_frame_equal
 
 from sos_trades_core.execution_engine.data_connector.mock_connector import MockConnector
-from sos_trades_core.execution_engine.data_connector.data_connector_factory import ConnectorFactory
+from sos_trades_core.execution_engine.data_connector.trino_data_connector import TrinoDataConnector
+from sos_trades_core.execution_engine.data_connector.data_connector_factory import ConnectorFactory, \
+    PersistentConnectorContainer
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
 from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
 from sos_trades_core.sos_processes.test.test_disc1_data_connector_dremio.usecase import Study
@@ -74,6 +80,44 @@ class TestWriteDataDiscipline(SoSDiscipline):
         # fill_output_with_connecotr in sos_discipline
 
 
+class FakeTrinoCursor:
+    """
+    Local cursor answering canned rows to Trino requests
+    """
+
+    def __init__(self, columns_rows, select_rows):
+        self.columns_rows = columns_rows
+        self.select_rows = select_rows
+        self.executed_sql = []
+        self.fetched_sizes = []
+        self.rows = []
+
+    def execute(self, sql):
+        self.executed_sql.append(sql)
+        if sql.startswith('SHOW COLUMNS'):
+            self.rows = list(self.columns_rows)
+        else:
+            self.rows = list(self.select_rows)
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        self.fetched_sizes.append(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+
+class FakeTrinoConnection:
+
+    def __init__(self, cursor):
+        self.fake_cursor = cursor
+
+    def cursor(self):
+        return self.fake_cursor
+
+
 class TestDataConnector(unittest.TestCase):
     """
     Data connector test class
@@ -272,3 +316,156 @@ class TestDataConnector(unittest.TestCase):
         exec_eng.load_study_from_input_dict(dict_values)
 
         exec_eng.execute()
+
+    def test_07_pooled_and_cached_connectors(self):
+        """
+        Test connector pool, results cache and concurrent requests with mock connector
+        """
+        container = PersistentConnectorContainer(result_ttl=60.0, n_threads=8)
+        # requests to different hosts cannot be batched
+        connector_info_list = [{ConnectorFactory.CONNECTOR_TYPE: MockConnector.NAME,
+                                'hostname': f'test_hostname_{i}',
+                                MockConnector.CONNECTOR_REQUEST: f'"request_{i}"',
+                                MockConnector.CONNECTOR_DELAY: 0.5}
+                               for i in range(8)]
+
+        # one connector instance per connection info
+        connector = container.get_pooled_connector(connector_info_list[0])
+        other_request_info = dict(connector_info_list[0],
+                                  connector_request='"other_request"')
+        self.assertIs(connector, container.get_pooled_connector(other_request_info))
+        self.assertIsNot(connector, container.get_pooled_connector(connector_info_list[1]))
+
+        with patch.object(MockConnector, 'load_data', autospec=True,
+                          side_effect=MockConnector.load_data) as mock_load_data:
+            # requests are sent concurrently
+            start = time()
+            data_list = container.use_data_connectors(connector_info_list)
+            self.assertLess(time() - start, 8 * 0.5)
+            self.assertListEqual(data_list, [42.0] * 8)
+            self.assertEqual(mock_load_data.call_count, 8)
+
+            # same requests are answered by the cache
+            data_list = container.use_data_connectors(connector_info_list)
+            self.assertListEqual(data_list, [42.0] * 8)
+            self.assertEqual(mock_load_data.call_count, 8)
+
+            # until the cache is cleared or expired
+            container.clear_results_cache()
+            container.use_data_connector(connector_info_list[0])
+            self.assertEqual(mock_load_data.call_count, 9)
+            container.result_ttl = 0.0
+            container.use_data_connector(connector_info_list[0])
+            self.assertEqual(mock_load_data.call_count, 10)
+
+    def test_08_execute_with_cached_connector(self):
+        """
+        Connector-backed inputs are read once while the cache is valid
+        """
+        ns_dict = {'ns_market_deliveries': self.name}
+        self.ee.ns_manager.add_ns_def(ns_dict)
+        mod_path = 'sos_trades_core.tests.l0_test_56_data_connector.TestMetadataDiscipline'
+        builder = self.ee.factory.get_builder_from_module(
+            self.model_name, mod_path)
+        self.ee.factory.set_builders_to_coupling_builder(builder)
+        self.ee.configure()
+        self.ee.connector_container.result_ttl = 60.0
+
+        with patch.object(MockConnector, 'load_data', autospec=True,
+                          side_effect=MockConnector.load_data) as mock_load_data, \
+                patch.object(MockConnector, 'load_data_batch', autospec=True,
+                             side_effect=MockConnector.load_data_batch) as mock_load_data_batch:
+            self.ee.execute()
+            self.ee.execute()
+        self.assertEqual(mock_load_data.call_count +
+                         mock_load_data_batch.call_count, 1)
+        self.assertEqual(self.ee.dm.get_value(
+            f'{self.name}.deliveries'), 42.0)
+
+    def test_09_batched_requests(self):
+        """
+        Read requests of a same connector and table are sent as a single request
+        """
+        container = PersistentConnectorContainer(n_threads=4)
+        connector_info_list = [{ConnectorFactory.CONNECTOR_TYPE: MockConnector.NAME,
+                                'hostname': 'test_hostname',
+                                MockConnector.CONNECTOR_REQUEST: f'"request_{i}"'}
+                               for i in range(8)]
+        connector_info_list.append({ConnectorFactory.CONNECTOR_TYPE: MockConnector.NAME,
+                                    'hostname': 'other_hostname',
+                                    MockConnector.CONNECTOR_REQUEST: '"request"'})
+
+        with patch.object(MockConnector, 'load_data', autospec=True,
+                          side_effect=MockConnector.load_data) as mock_load_data, \
+                patch.object(MockConnector, 'load_data_batch', autospec=True,
+                             side_effect=MockConnector.load_data_batch) as mock_load_data_batch:
+            data_list = container.use_data_connectors(connector_info_list)
+        self.assertListEqual(data_list, [42.0] * 9)
+        # one request per host
+        self.assertEqual(mock_load_data.call_count +
+                         mock_load_data_batch.call_count, 2)
+
+        # rows of a combined Trino request are dispatched back to each request
+        columns_rows = [['name', 'varchar', '', ''],
+                        ['value', 'row(x double, y double)', '', '']]
+        select_rows = [['a', [1.0, 2.0], True, False],
+                       ['b', [3.0, 4.0], False, True],
+                       ['c', [5.0, 6.0], True, True]]
+        fake_cursor = FakeTrinoCursor(columns_rows, select_rows)
+        trino_info = {ConnectorFactory.CONNECTOR_TYPE: TrinoDataConnector.NAME,
+                      'hostname': 'fake_trino_host', 'port': 0, 'username': 'user',
+                      'catalog': 'catalog', 'schema': 'schema'}
+        connector_info_list = [
+            TrinoDataConnector().set_connector_request(
+                dict(trino_info), 'TABLE_1', "name IN ('a', 'c')"),
+            TrinoDataConnector().set_connector_request(
+                dict(trino_info), 'TABLE_1', "name IN ('b', 'c')")]
+
+        with patch('trino.dbapi.connect', return_value=FakeTrinoConnection(fake_cursor)):
+            data_list = container.use_data_connectors(connector_info_list)
+
+        select_sql = [sql for sql in fake_cursor.executed_sql if sql.startswith('SELECT')]
+        self.assertEqual(len(select_sql), 1)
+        self.assertIn("name IN ('a', 'c')", select_sql[0])
+        self.assertIn("name IN ('b', 'c')", select_sql[0])
+        self.assertListEqual(data_list[0], [{'name': 'a', 'value': {'x': 1.0, 'y': 2.0}},
+                                            {'name': 'c', 'value': {'x': 5.0, 'y': 6.0}}])
+        self.assertListEqual(data_list[1], [{'name': 'b', 'value': {'x': 3.0, 'y': 4.0}},
+                                            {'name': 'c', 'value': {'x': 5.0, 'y': 6.0}}])
+
+    def test_10_trino_columnar_decoding(self):
+        """
+        Trino results decoded column by column into a dataframe, rows being fetched by batches
+        """
+        columns_rows = [['name', 'varchar', '', ''],
+                        ['year', 'bigint', '', ''],
+                        ['value', 'row(x double, y double)', '', '']]
+        n_rows = 25
+        select_rows = [[f'name_{i}', 2020 + i, [float(i), None if i == 3 else 2. * i]]
+                       for i in range(n_rows)]
+        fake_cursor = FakeTrinoCursor(columns_rows, select_rows)
+        trino_info = {ConnectorFactory.CONNECTOR_TYPE: TrinoDataConnector.NAME,
+                      'hostname': 'fake_columnar_host', 'port': 0, 'username': 'user',
+                      'catalog': 'catalog', 'schema': 'schema'}
+        connector = TrinoDataConnector()
+        connector.fetch_size = 10
+
+        with patch('trino.dbapi.connect', return_value=FakeTrinoConnection(fake_cursor)):
+            data_df = connector.load_data(connector.set_connector_request(
+                dict(trino_info), 'TABLE_2', None, TrinoDataConnector.OUTPUT_DATAFRAME))
+            records = connector.load_data(connector.set_connector_request(
+                dict(trino_info), 'TABLE_2', None))
+
+        y_values = 2. * arange(n_rows)
+        y_values[3] = nan
+        ref_df = DataFrame({'name': [f'name_{i}' for i in range(n_rows)],
+                            'year': 2020 + arange(n_rows),
+                            'value.x': arange(n_rows, dtype=float),
+                            'value.y': y_values})
+        assert_frame_equal(data_df, ref_df)
+        self.assertEqual(records[4], {'name': 'name_4', 'year': 2024,
+                                      'value': {'x': 4.0, 'y': 8.0}})
+        # rows are fetched by bounded batches and the schema is requested once
+        self.assertEqual(max(fake_cursor.fetched_sizes), 10)
+        self.assertEqual(len([sql for sql in fake_cursor.executed_sql
+                              if sql.startswith('SHOW COLUMNS')]), 1)
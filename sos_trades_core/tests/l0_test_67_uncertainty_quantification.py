@@ -450,6 +450,68 @@ class TestUncertaintyQuantification(unittest.TestCase):
         
         self.dir_to_del.append(self.dump_dir)
 
+    def test_05_multithreaded_interpolation(self):
+        """In this test we check that the chunked interpolation of the outputs on several threads
+        gives the same results than the sequential one
+        """
+        output_df_dict = {}
+        for n_processes in [1, 4]:
+            study = study_grid_search_uq(run_usecase=True)
+            study.load_data()
+            study.load_data(from_input_dict={
+                f'{study.study_name}.{self.uncertainty_quantification}.n_processes': n_processes,
+                f'{study.study_name}.{study.grid_search}.sample_size': 2000})
+            study.run()
+            output_df_dict[n_processes] = study.ee.dm.get_value(
+                f'{study.study_name}.{study.grid_search}.output_interpolated_values_df')
+
+        self.assertEqual(len(output_df_dict[4]), 2000)
+        self.assertListEqual(list(output_df_dict[1].columns),
+                             list(output_df_dict[4].columns))
+        np.testing.assert_allclose(
+            output_df_dict[1].values, output_df_dict[4].values)
+
+    def test_06_low_discrepancy_and_adaptive_sampling(self):
+        """In this test we check the low-discrepancy and antithetic sampling methods
+        and the adaptive stopping rule on the outputs confidence interval
+        """
+        for sampling_method in ['Sobol', 'Halton', 'LHS']:
+            for antithetic_variates in [False, True]:
+                study = study_grid_search_uq(run_usecase=True)
+                study.load_data()
+                study.load_data(from_input_dict={
+                    f'{study.study_name}.{study.grid_search}.sampling_method': sampling_method,
+                    f'{study.study_name}.{study.grid_search}.antithetic_variates': antithetic_variates})
+                study.run()
+                samples_df = study.ee.dm.get_value(
+                    f'{study.study_name}.{study.grid_search}.input_parameters_samples_df')
+                out_df = study.ee.dm.get_value(
+                    f'{study.study_name}.{study.grid_search}.output_interpolated_values_df')
+                self.assertEqual(len(samples_df), 1000)
+                self.assertEqual(len(out_df), 1000)
+                self.assertFalse(samples_df.isnull().values.any())
+
+        # with a very low tolerance sampling stops at max_sample_size
+        study = study_grid_search_uq(run_usecase=True)
+        study.load_data()
+        study.load_data(from_input_dict={
+            f'{study.study_name}.{study.grid_search}.sampling_method': 'Sobol',
+            f'{study.study_name}.{study.grid_search}.sample_size': 500,
+            f'{study.study_name}.{study.grid_search}.adaptive_tolerance': 1e-6,
+            f'{study.study_name}.{study.grid_search}.max_sample_size': 2000})
+        study.run()
+        out_df = study.ee.dm.get_value(
+            f'{study.study_name}.{study.grid_search}.output_interpolated_values_df')
+        self.assertEqual(len(out_df), 2000)
+
+        # with a large tolerance the first batch is enough
+        study.load_data(from_input_dict={
+            f'{study.study_name}.{study.grid_search}.adaptive_tolerance': 50.})
+        study.run()
+        out_df = study.ee.dm.get_value(
+            f'{study.study_name}.{study.grid_search}.output_interpolated_values_df')
+        self.assertEqual(len(out_df), 500)
+
 
 if '__main__' == __name__:
     cls = TestUncertaintyQuantification()
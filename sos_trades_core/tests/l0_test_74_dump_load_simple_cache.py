@@ -22,12 +22,36 @@ from shutil import rmtree
 from os.path import join, dirname, exists
 from pathlib import Path
 from time import sleep
+from pickle import dumps
+from numpy import arange, ones
+from numpy.testing import assert_array_equal
+from sos_trades_core.tools.tree.serializer import pack_cache_map, unpack_cache_map
 from sos_trades_core.study_manager.base_study_manager import BaseStudyManager
 from sos_trades_core.sos_processes.test.test_sellar_opt_w_design_var.usecase import Study as study_sellar_opt
 from sos_trades_core.sos_processes.test.test_sellar_coupling.usecase import Study as study_sellar_mda
 from sos_trades_core.sos_processes.test.test_disc1_disc2_coupling.usecase_coupling_2_disc_test import Study as study_disc1_disc2
 
 
+class ArrayHolder:
+    """
+    Object whose array is only built when it is pickled
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    @property
+    def values(self):
+        return arange(100.) * self.value
+
+    def __reduce__(self):
+        return (ArrayHolder.from_values, (self.values,))
+
+    @staticmethod
+    def from_values(values):
+        return ArrayHolder(values[1])
+
+
 class TestLoadSimpleCache(unittest.TestCase):
     """
     Test of SimpleCache dump and load from files
@@ -406,6 +430,48 @@ class TestLoadSimpleCache(unittest.TestCase):
                 
         self.dir_to_del.append(self.dump_dir)
 
+    def test_09_packed_cache_map_deduplicates_arrays(self):
+
+        # caches of coupled disciplines sharing the same inputs
+        shared_input = arange(10000.)
+        cache_map = {f'disc_{i}': {'x': shared_input.copy(), 'y': ones(100) * i,
+                                   'name': f'disc_{i}'}
+                     for i in range(10)}
+        # same object referenced twice
+        cache_map['disc_0']['x_ref'] = cache_map['disc_0']['x']
+
+        packed_cache_map = pack_cache_map(cache_map)
+        # one buffer for x, one buffer per y
+        self.assertEqual(len(packed_cache_map['buffers']), 11)
+        self.assertLess(len(dumps(packed_cache_map)),
+                        len(dumps(cache_map)) / 5)
+
+        loaded_cache_map = unpack_cache_map(packed_cache_map)
+        self.assertListEqual(list(loaded_cache_map.keys()), list(cache_map.keys()))
+        for disc_id, disc_cache in cache_map.items():
+            for key, value in disc_cache.items():
+                if key == 'name':
+                    self.assertEqual(loaded_cache_map[disc_id][key], value)
+                else:
+                    assert_array_equal(loaded_cache_map[disc_id][key], value)
+        # reloaded arrays are not shared between caches
+        loaded_cache_map['disc_1']['x'][0] = -1.
+        self.assertEqual(loaded_cache_map['disc_2']['x'][0], 0.)
+
+        # cache maps dumped before packing are loaded as is
+        self.assertIs(unpack_cache_map(cache_map), cache_map)
+
+    def test_10_packed_cache_map_with_temporary_arrays(self):
+
+        # arrays created while reducing an object are freed once pickled,
+        # their ids may be reused by the arrays of the next objects
+        cache_map = {f'disc_{i}': ArrayHolder(i) for i in range(50)}
+
+        loaded_cache_map = unpack_cache_map(pack_cache_map(cache_map))
+        for disc_id, holder in cache_map.items():
+            assert_array_equal(loaded_cache_map[disc_id].values,
+                               holder.values)
+
         
 if '__main__' == __name__:
     cls = TestLoadSimpleCache()
@@ -0,0 +1,65 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
+Import time test suite
+'''
+import unittest
+import sys
+import subprocess
+
+# optional heavy modules which must only be imported when used
+LAZY_MODULES = ['trino', 'dremio_client', 'openturns',
+                'cma', 'petsc4py', 'plotly']
+
+
+def get_imported_modules(module_name):
+    '''
+    Import module_name in a new python process
+    and return the names of all modules imported with it
+    '''
+    completed = subprocess.run([sys.executable, '-c', f'import sys, {module_name}; print("\\n".join(sys.modules))'],
+                               capture_output=True, text=True, check=True)
+    return completed.stdout.splitlines()
+
+
+class TestImportTime(unittest.TestCase):
+    """
+    Import time test class
+    """
+
+    def check_lazy_modules(self, imported_modules):
+        imported_lazy_modules = [module for module in imported_modules
+                                 if module.split('.')[0] in LAZY_MODULES]
+        self.assertListEqual(imported_lazy_modules, [],
+                             'Optional heavy modules must be imported at first use')
+
+    def test_01_execution_engine_import(self):
+
+        self.check_lazy_modules(get_imported_modules(
+            'sos_trades_core.execution_engine.execution_engine'))
+
+    def test_02_post_processing_and_connectors_import(self):
+
+        for module_name in ['sos_trades_core.execution_engine.data_connector.data_connector_factory',
+                            'sos_trades_core.tools.post_processing.charts.two_axes_instanciated_chart',
+                            'sos_trades_core.execution_engine.func_manager.func_manager_disc',
+                            'sos_trades_core.sos_wrapping.analysis_discs.uncertainty_quantification']:
+            self.check_lazy_modules(get_imported_modules(module_name))
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,118 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
+unit test for Outer Approximation solver
+'''
+import unittest
+from numpy import array, argmin, around, concatenate, unique
+from numpy.testing import assert_array_almost_equal
+
+from gemseo.algos.design_space import DesignSpace
+from gemseo.algos.opt_problem import OptimizationProblem
+from gemseo.core.mdofunctions.mdo_function import MDOFunction
+
+from sos_trades_core.execution_engine.gemseo_addon.opt.core.OuterApproximationSolver import OuterApproximationSolver
+
+
+class TestOuterApproximation(unittest.TestCase):
+    """
+    OuterApproximationSolver test class
+    """
+
+    def build_problem(self):
+        '''
+        Convex mixed integer problem :
+        min (x1 - 2.6)**2 + (x2 - 1)**2 s.t. x1 + x2 - 4.5 <= 0
+        with x1 integer in [0, 5] and x2 float in [0, 3], optimum is (3, 1)
+        '''
+        dspace = DesignSpace()
+        dspace.add_variable('x1', 1, DesignSpace.INTEGER, 0, 5, array([0]))
+        dspace.add_variable('x2', 1, DesignSpace.FLOAT, 0., 3., array([1.]))
+
+        problem = OptimizationProblem(dspace)
+        problem.objective = MDOFunction(lambda x: (x[0] - 2.6) ** 2 + (x[1] - 1.) ** 2, 'obj',
+                                        f_type=MDOFunction.TYPE_OBJ,
+                                        jac=lambda x: array(
+                                            [2. * (x[0] - 2.6), 2. * (x[1] - 1.)]),
+                                        outvars=['obj'])
+        problem.add_constraint(MDOFunction(lambda x: array([x[0] + x[1] - 4.5]), 'constr',
+                                           f_type=MDOFunction.TYPE_INEQ,
+                                           jac=lambda x: array([[1., 1.]]),
+                                           outvars=['constr']),
+                               cstr_type=MDOFunction.TYPE_INEQ)
+        return problem
+
+    def solve(self, use_nlp_cache):
+        solver = OuterApproximationSolver(self.build_problem())
+        solver.set_options(**{OuterApproximationSolver.MAX_ITER: 100,
+                              OuterApproximationSolver.F_TOL_ABS: 1e-10,
+                              OuterApproximationSolver.ALGO_OPTIONS_MILP: {},
+                              OuterApproximationSolver.ALGO_NLP: 'SLSQP',
+                              OuterApproximationSolver.ALGO_OPTIONS_NLP: {'ftol_rel': 1e-10,
+                                                                          'normalize_design_space': False},
+                              OuterApproximationSolver.USE_NLP_CACHE: use_nlp_cache})
+        solver.init_solver()
+        solver.solve()
+        return solver
+
+    def get_best_solution(self, solver):
+        return solver.x_solution_history[argmin(solver.upper_bounds_candidates)]
+
+    def get_cuts(self, solver):
+        return unique(around(concatenate([solver.cuts_matrix.toarray(),
+                                          solver.cuts_rhs.reshape(-1, 1)], axis=1), 6), axis=0)
+
+    def test_01_nlp_cache(self):
+
+        cached_solver = self.solve(use_nlp_cache=True)
+        solver = self.solve(use_nlp_cache=False)
+
+        # same optimum with and without the NLP cache
+        assert_array_almost_equal(
+            self.get_best_solution(cached_solver), array([3., 1.]), decimal=4)
+        assert_array_almost_equal(
+            self.get_best_solution(cached_solver), self.get_best_solution(solver), decimal=4)
+
+        # one history entry by NLP solved or served from the cache, no NLP
+        # solved twice with the cache
+        for oa_solver in [cached_solver, solver]:
+            self.assertEqual(len(oa_solver.x_solution_history),
+                             len(oa_solver.cont_solutions) + oa_solver.n_nlp_cache_hits)
+            self.assertEqual(len(oa_solver.upper_bounds),
+                             len(oa_solver.x_solution_history))
+        self.assertEqual(solver.n_nlp_cache_hits, 0)
+        self.assertEqual(len(cached_solver.cont_solutions),
+                         len(cached_solver.nlp_solutions_cache))
+        self.assertLessEqual(len(cached_solver.cont_solutions),
+                             len(solver.cont_solutions))
+        # a cached NLP solution gives the same upper bound candidate
+        for x_sol, ub_candidate in zip(cached_solver.x_solution_history,
+                                       cached_solver.upper_bounds_candidates):
+            self.assertAlmostEqual(
+                ub_candidate, (x_sol[0] - 2.6) ** 2 + (x_sol[1] - 1.) ** 2, places=6)
+
+        # the cache only avoids duplicated cuts
+        self.assertLessEqual(cached_solver.cuts_matrix.shape[0],
+                             solver.cuts_matrix.shape[0])
+        assert_array_almost_equal(
+            self.get_cuts(cached_solver), self.get_cuts(solver))
+        self.assertEqual(len(cached_solver.get_iteration_timings()),
+                         len(cached_solver.x_solution_history))
+
+
+if '__main__' == __name__:
+    unittest.main()
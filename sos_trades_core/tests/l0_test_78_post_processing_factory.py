@@ -0,0 +1,142 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
+'''
+import unittest
+
+from sos_trades_core.execution_engine.execution_engine import ExecutionEngine
+from sos_trades_core.tools.post_processing.post_processing_factory import PostProcessingFactory
+
+
+class TestPostProcessingFactory(unittest.TestCase):
+    """
+    PostProcessingFactory test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize a study with Disc1 and count its post processing generations
+        '''
+        self.name = 'Test'
+        self.ee = ExecutionEngine(self.name)
+        ns_dict = {'ns_ac': self.name}
+        self.ee.ns_manager.add_ns_def(ns_dict)
+
+        disc1_builder = self.ee.factory.get_builder_from_module(
+            'Disc1', 'sos_trades_core.sos_wrapping.test_discs.disc1.Disc1')
+        self.ee.factory.set_builders_to_coupling_builder(disc1_builder)
+
+        self.ee.configure()
+        values_dict = {self.name + '.x': 1.0,
+                       self.name + '.Disc1.a': 1.0,
+                       self.name + '.Disc1.b': 2.0}
+        self.ee.load_study_from_input_dict(values_dict)
+        self.ee.execute()
+
+        self.disc1 = self.ee.dm.get_disciplines_with_name('Test.Disc1')[0]
+        self.generation_count = []
+        get_post_processing_list = self.disc1.get_post_processing_list
+
+        def counted_get_post_processing_list(filters=None):
+            self.generation_count.append(1)
+            return get_post_processing_list(filters)
+        self.disc1.get_post_processing_list = counted_get_post_processing_list
+
+        PostProcessingFactory.clear_cache()
+
+    def test_01_post_processing_cache(self):
+        '''
+        check post processings are reused until discipline data change
+        '''
+        ppf = PostProcessingFactory(n_threads=2)
+        all_post_processings = ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 1)
+        self.assertEqual(
+            len(all_post_processings['Test.Disc1'][0].post_processings), 1)
+
+        # unchanged data: post processings come from the cache of any factory
+        all_post_processings = PostProcessingFactory().get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 1)
+        self.assertEqual(
+            len(all_post_processings['Test.Disc1'][0].post_processings), 1)
+
+        # other filter values are generated
+        filters = ppf.get_post_processing_filters_by_discipline(self.disc1)
+        filters[0].selected_values = []
+        self.assertListEqual(ppf.get_post_processing_by_discipline(
+            self.disc1, filters, as_json=False, for_test=True), [])
+        self.assertEqual(len(self.generation_count), 2)
+
+        # for_test is part of the cache keys
+        ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=False)
+        self.assertEqual(len(self.generation_count), 3)
+
+        # changed data: post processings are generated again
+        self.ee.load_study_from_input_dict({self.name + '.x': 2.0})
+        self.ee.execute()
+        ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 4)
+
+        # a value set in the dm without execution changes the data version
+        self.ee.dm.set_values_from_dict({self.name + '.Disc1.a': 3.0})
+        ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 5)
+
+        # no cache
+        PostProcessingFactory(use_cache=False).get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 6)
+
+    def test_02_post_processing_cache_after_reload(self):
+        '''
+        check post processings are generated again when study values are
+        reloaded without execution
+        '''
+        ppf = PostProcessingFactory()
+        ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 1)
+
+        # reload an input value
+        self.ee.load_study_from_input_dict({self.name + '.x': 5.0})
+        all_post_processings = ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 2)
+        chart = all_post_processings['Test.Disc1'][0].post_processings[0]
+        self.assertListEqual(chart.series[0].abscissa, [5.0])
+
+        # reload a result, as done when loading a study with its results
+        self.ee.load_study_from_dict({self.name + '.y': 42.0})
+        all_post_processings = ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 3)
+        chart = all_post_processings['Test.Disc1'][0].post_processings[0]
+        self.assertListEqual(chart.series[0].ordinate, [42.0])
+
+        # unchanged data after the reload: cache is used again
+        ppf.get_all_post_processings(
+            self.ee, False, as_json=False, for_test=True)
+        self.assertEqual(len(self.generation_count), 3)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,78 @@
+'''
+Copyright 2022 Airbus SAS
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+'''
+mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
+Throughput benchmark of the DM csv/zip export, not part of the l0 test suite
+'''
+import unittest
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import perf_counter
+from zipfile import ZipFile
+
+from numpy import ones
+from pandas import DataFrame
+
+from sos_trades_core.api import get_sos_logger
+from sos_trades_core.tools.tree.serializer import DataSerializer
+
+
+class TestSerializerExportThroughput(unittest.TestCase):
+    """
+    DataSerializer export throughput benchmark class
+    """
+
+    def setUp(self):
+        self.logger = get_sos_logger('SoS.EE.Benchmark')
+        self.out_dir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.out_dir)
+
+    def build_origin_dict(self, n_vars):
+        df_value = DataFrame(ones((1000, 10)),
+                             columns=[f'col{i}' for i in range(10)])
+        origin_dict = {}
+        for i in range(n_vars):
+            origin_dict[f'Study.df_{i}'] = {'unit': 'kg', 'value': df_value * i}
+            origin_dict[f'Study.dict_{i}'] = {'unit': None,
+                                              'value': {'a': df_value, 'b': df_value}}
+            origin_dict[f'Study.x_{i}'] = {'unit': 'm', 'value': float(i)}
+        return origin_dict
+
+    def test_01_zip_export_throughput(self):
+
+        serializer = DataSerializer()
+        for n_vars in [20, 200, 1000]:
+            origin_dict = self.build_origin_dict(n_vars)
+            export_dir = join(self.out_dir, f'export_{n_vars}')
+
+            start = perf_counter()
+            export_dir_zip = serializer.export_data_dict_and_zip(origin_dict,
+                                                                 export_dir)
+            elapsed = perf_counter() - start
+
+            with ZipFile(export_dir_zip) as zip_file:
+                infos = zip_file.infolist()
+            self.assertEqual(len(infos), 2 * n_vars + 1)
+            csv_size = sum(info.file_size for info in infos) / 1e6
+            self.logger.info(f'zip export of {len(origin_dict)} variables: {csv_size:.1f} MB of csv '
+                             f'in {elapsed:.2f} s ({csv_size / elapsed:.1f} MB/s)')
+
+
+if '__main__' == __name__:
+    unittest.main()
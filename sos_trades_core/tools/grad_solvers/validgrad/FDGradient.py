@@ -15,12 +15,22 @@ limitations under the License.
 '''
 # -*-mode: python; py-indent-offset: 4; tab-width: 8; coding: iso-8859-1 -*-
 
+import logging
 import numpy as np
 from copy import deepcopy
 from .FDSecondOrderCentered import FDSecondOrderCentered
 from .FDFirstOrderUpwind import FDFirstOrderUpwind, FDFirstOrderUpwindComplexStep
 import multiprocessing
 
+LOGGER = logging.getLogger(__name__)
+
+# function evaluated by the workers of the FDGradient pool, inherited at fork
+_fd_worker_function = None
+
+
+def _fd_worker(x_in):
+    return _fd_worker_function(x_in)
+
 
 class FDGradient(object):
     """
@@ -28,13 +38,16 @@ class FDGradient(object):
     Computes the gradient by finite differences for a given scheme order.
     """
 
-    def __init__(self, scheme_order, f_pointer, df_pointer=None, fd_step=1.e-8, bounds=None):
+    def __init__(self, scheme_order, f_pointer, df_pointer=None, fd_step=1.e-8, bounds=None,
+                 samples_evaluator=None):
         """
         Constructor.
         Args :
             scheme : the numerical scheme
             f_pointer : the pointer to the function on which
             finite differences are computed.
+            samples_evaluator : optional pointer to a function evaluating
+            the whole list of samples in one batch and returning the list of outputs.
         """
         self.__scheme_order = scheme_order
         self.fd_step = fd_step
@@ -53,13 +66,25 @@ class FDGradient(object):
         self.__fpointer = f_pointer
         self.__dfpointer = df_pointer
 
+        self.samples_evaluator = samples_evaluator
+
         self.multi_proc = False
+        self.n_procs = multiprocessing.cpu_count()
 
     def set_bounds(self, bounds):
         self.__scheme.set_bounds(bounds)
 
-    def set_multi_proc(self, multi):
+    def set_multi_proc(self, multi, n_procs=None):
         self.multi_proc = multi
+        if n_procs is not None:
+            self.n_procs = n_procs
+
+    def set_samples_evaluator(self, samples_evaluator):
+        """
+        Set the function evaluating the whole list of samples in one batch,
+        it is used instead of f_pointer and multi_proc options in grad_f
+        """
+        self.samples_evaluator = samples_evaluator
 
     def get_scheme(self):
         """
@@ -69,10 +94,6 @@ class FDGradient(object):
         """
         return self.__scheme
 
-    def __worker(self, index, x_in, return_dict):
-        out = self.__fpointer(x_in)
-        return_dict[index] = out
-
     def grad_f(self, x, args=None):
         """
         Gradient calculation. Calls the numerical scheme.
@@ -86,33 +107,22 @@ class FDGradient(object):
 
         samples = self.__scheme.get_samples()
         n_samples = len(samples)
-        if self.multi_proc:
-            n_procs = multiprocessing.cpu_count()
-            print('FDGradient: multi-process grad_f, parallel run on ',
-                  n_procs, ' procs.')
-            manager = multiprocessing.Manager()
-            return_dict = manager.dict()
-            n = 0
-            while n < n_samples:
-                if n + n_procs < n_samples:
-                    n_subs = n_procs
-                else:
-                    n_subs = n_samples - n
-                jobs = []
-                for i in range(n_subs):
-                    index = n + i
-                    x_in = samples[index]
-                    p = multiprocessing.Process(
-                        target=self.__worker, args=(index, x_in, return_dict))
-                    jobs.append(p)
-                    p.start()
-
-                for proc in jobs:
-                    proc.join()
-                n += n_subs
-            y = []
-            for i in range(n_samples):
-                y.append(return_dict[i])
+        if self.samples_evaluator is not None:
+            y = list(self.samples_evaluator(samples))
+        elif self.multi_proc:
+            n_procs = min(self.n_procs, n_samples)
+            LOGGER.info(
+                f'FDGradient: multi-process grad_f, parallel run on {n_procs} procs.')
+            # the pool is forked once for all the samples, workers inherit
+            # the function to evaluate and are fed by chunks of samples
+            global _fd_worker_function
+            _fd_worker_function = self.__fpointer
+            chunksize = max(1, n_samples // (4 * n_procs))
+            try:
+                with multiprocessing.get_context('fork').Pool(n_procs) as pool:
+                    y = pool.map(_fd_worker, samples, chunksize=chunksize)
+            finally:
+                _fd_worker_function = None
         else:
             y = []
             for x in samples:
@@ -18,7 +18,6 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Class that define a 2 dimensional instantiated chart 
 """
-import plotly.graph_objects as go
 from sos_trades_core.tools.post_processing.post_processing_tools import escape_str_with_comma
 from sos_trades_core.tools.post_processing.charts.two_axes_chart_template import TwoAxesChartTemplate, SeriesTemplate
 
@@ -56,6 +55,7 @@ class TwoAxesInstanciatedChart(TwoAxesChartTemplate):
 
         :return plotly.graph_objects.go instance
         """
+        import plotly.graph_objects as go
 
         fig = go.Figure()
 
@@ -18,7 +18,6 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Class that define a parallel coordinates chart display as post post processing
 """
-import plotly.graph_objects as go
 from sos_trades_core.tools.post_processing.post_processing_tools import escape_str_with_comma
 from sos_trades_core.tools.post_processing.post_processing_plotly_tooling import AbstractPostProcessingPlotlyTooling
 
@@ -100,6 +99,7 @@ class InstantiatedParallelCoordinatesChart(AbstractPostProcessingPlotlyTooling):
 
         @return plotly.graph_objects.go instance
         """
+        import plotly.graph_objects as go
         pc_dimensions = []
 
         # First add number traces
@@ -18,7 +18,6 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Class that define a pareto front optimal chart display as post post processing
 """
-import plotly.graph_objects as go
 
 from sos_trades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, \
     InstanciatedSeriesException
@@ -112,6 +111,7 @@ class InstantiatedParetoFrontOptimalChart(AbstractPostProcessingPlotlyTooling):
 
         @return plotly.graph_objects.go instance
         """
+        import plotly.graph_objects as go
 
         fig = go.Figure()
 
@@ -18,7 +18,6 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Class that define a pie chart display as post post processing
 """
-import plotly.graph_objects as go
 from sos_trades_core.api import get_sos_logger
 from sos_trades_core.tools.post_processing.post_processing_plotly_tooling import AbstractPostProcessingPlotlyTooling
 from sos_trades_core.tools.post_processing.post_processing_tools import escape_str_with_comma
@@ -81,6 +80,7 @@ class InstanciatedPieChart(AbstractPostProcessingPlotlyTooling):
 
         @return plotly.graph_objects.go instance
         """
+        import plotly.graph_objects as go
         pie_chart = go.Pie(labels=self.labels, values=self.values, sort=False)
 
         fig = go.Figure(data=[pie_chart])
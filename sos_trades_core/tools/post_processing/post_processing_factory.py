@@ -20,7 +20,11 @@ Factory for post processing (2 axes chart, pie chart, table)
 """
 import inspect
 import importlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from os.path import join, dirname, isfile
+from threading import Lock
 
 from sos_trades_core.api import get_sos_logger
 from sos_trades_core.execution_engine.sos_discipline_gather import SoSDisciplineGather
@@ -41,6 +45,82 @@ class PostProcessingFactory:
     NAMESPACED_POST_PROCESSING = 'namespaced_post_processing'
     NAMESPACED_POST_PROCESSING_NAME = 'Data'
 
+    # maximum number of entries in each post processing cache
+    CACHE_SIZE = 256
+
+    # caches shared by all factory instances, so that successive requests on
+    # an unchanged study do not rebuild the same post processings
+    # filters are keyed by (discipline id, for_test, data version) and post processings by
+    # (discipline id, filters key, as_json, for_test, data version)
+    __filters_cache = OrderedDict()
+    __post_processings_cache = OrderedDict()
+    __cache_lock = Lock()
+
+    def __init__(self, use_cache=True, n_threads=1):
+        """ Constructor
+
+            :params: use_cache, reuse post processings of disciplines whose data have not changed
+            :type: boolean
+
+            :params: n_threads, number of threads used to generate disciplines post processings
+                     (1 for sequential generation, None for the ThreadPoolExecutor default)
+            :type: int
+        """
+        self.use_cache = use_cache
+        self.n_threads = n_threads
+
+    @classmethod
+    def clear_cache(cls):
+        """ Remove all cached filters and post processings
+        """
+        with cls.__cache_lock:
+            cls.__filters_cache.clear()
+            cls.__post_processings_cache.clear()
+
+    @staticmethod
+    def get_discipline_data_version(discipline):
+        """ Return the versions of the input and output variables of a discipline, from which its post processings are built
+            The data manager renews the version of a variable on each change
+
+            :params: discipline, discipline to get the data version of
+            :type: SoSDiscipline
+
+            :returns: tuple of (variable full name, version)
+        """
+        data_version = []
+        for io_type in [discipline.IO_TYPE_IN, discipline.IO_TYPE_OUT]:
+            data_io = discipline.get_data_io_dict(io_type)
+            for var_name in data_io:
+                var_f_name = discipline.get_var_full_name(var_name, data_io)
+                data_version.append(
+                    (var_f_name, discipline.dm.get_data_version(var_f_name)))
+        return tuple(data_version)
+
+    @staticmethod
+    def get_filters_key(filters):
+        """ Return a hashable representation of post processing filters
+        """
+        if filters is None:
+            return None
+        return repr([chart_filter.to_dict() for chart_filter in filters])
+
+    @staticmethod
+    def get_namespaces_index(ns_list, attribute):
+        """ Index namespaces by name or value to avoid scanning ns_list for each lookup
+
+            :params: ns_list, namespaces to index
+            :type: Namespace[]
+
+            :params: attribute, 'name' or 'value'
+            :type: string
+
+            :returns: Dictionary {attribute value: Namespace[]}
+        """
+        namespaces_index = {}
+        for ns in ns_list:
+            namespaces_index.setdefault(getattr(ns, attribute), []).append(ns)
+        return namespaces_index
+
     def get_all_post_processings(self, execution_engine, filters_only, as_json=True, for_test=False):
         """ Extract all post processing filters that are defined into the execution engine
             (using discipline and post processing manager)
@@ -68,47 +148,67 @@ class PostProcessingFactory:
 
         all_post_processings_bundle = {}
 
+        disciplines = [value[DataManager.DISC_REF]
+                       for value in execution_engine.dm.disciplines_dict.values()]
+
+        def get_discipline_post_processings(discipline):
+            # data version is computed once for both filters and post processings
+            data_version = self.__get_data_version(discipline)
+
+            # Extract filters
+            filters = self.__get_post_processing_filters(
+                discipline, data_version, for_test=for_test)
+
+            # If filters only is False then generate associated post processing
+            post_processings = None
+            if not filters_only:
+                post_processings = self.__get_post_processing(
+                    discipline, data_version, filters, as_json, for_test=for_test)
+
+            return filters, post_processings
+
+        # Disciplines are independent, generate their post processings in
+        # parallel and gather them in disciplines order
+        if self.n_threads == 1 or len(disciplines) <= 1:
+            disciplines_post_processings = list(
+                map(get_discipline_post_processings, disciplines))
+        else:
+            with ThreadPoolExecutor(max_workers=self.n_threads) as executor:
+                disciplines_post_processings = list(
+                    executor.map(get_discipline_post_processings, disciplines))
+
         # Manage disciplines
-        for value in execution_engine.dm.disciplines_dict.values():
+        disciplines_bundles = {}
+        for discipline, (filters, post_processings) in zip(disciplines, disciplines_post_processings):
 
-            discipline = value[DataManager.DISC_REF]
             discipline_full_name = discipline.get_disc_full_name()
 
             if discipline_full_name not in all_post_processings_bundle:
                 all_post_processings_bundle[discipline_full_name] = []
 
-            found_bundles = list(
-                filter(lambda b: b.name == discipline.__module__, all_post_processings_bundle[discipline_full_name]))
-
-            current_bundle = None
-            if len(found_bundles) == 0:
+            bundle_key = (discipline_full_name, discipline.__module__)
+            current_bundle = disciplines_bundles.get(bundle_key)
+            if current_bundle is None:
                 current_bundle = PostProcessingBundle(
                     discipline.__module__, [], [])
                 all_post_processings_bundle[discipline_full_name].append(
                     current_bundle)
-            else:
-                current_bundle = found_bundles[0]
+                disciplines_bundles[bundle_key] = current_bundle
 
-            # Extract filters
-            filters = self.get_post_processing_filters_by_discipline(
-                discipline)
             if filters and len(filters) > 0:
                 current_bundle.filters.extend(filters)
 
-            # If filters only is False then generate associated post processing
-            if not filters_only:
-                post_processings = self.get_post_processing_by_discipline(
-                    discipline, filters, as_json, for_test=for_test)
+            if post_processings and len(post_processings) > 0:
+                current_bundle.post_processings.extend(post_processings)
 
-                if post_processings and len(post_processings) > 0:
-                    current_bundle.post_processings.extend(post_processings)
+        namespaces_by_name = self.get_namespaces_index(
+            execution_engine.ns_manager.ns_list, 'name')
 
         # Manage filters from post processing manager (namespace filter)
         for namespace_name, post_processings in execution_engine.post_processing_manager.namespace_post_processing.items():
             # Key is the namespace name, wo we haev to find all of its
             # implement
-            associated_namespaces = list(filter(
-                lambda ns: ns.name == namespace_name, execution_engine.ns_manager.ns_list))
+            associated_namespaces = namespaces_by_name.get(namespace_name, [])
 
             # now we can generate filter for each of them
             for associated_namespace in associated_namespaces:
@@ -197,8 +297,8 @@ class PostProcessingFactory:
 
         # Then look into the post processing manager (namespace based)
         # Extract namespace object having 'namespace' argument as value
-        associated_namespaces = list(filter(
-            lambda ns: ns.value == namespace, execution_engine.ns_manager.ns_list))
+        associated_namespaces = self.get_namespaces_index(
+            execution_engine.ns_manager.ns_list, 'value').get(namespace, [])
 
         # For each of them check if they are reference in the post processing
         # manager
@@ -253,8 +353,8 @@ class PostProcessingFactory:
 
         # Then look into the post processing manager (namespace based)
         # Extract namespace object having 'namespace' argument as value
-        associated_namespaces = list(filter(
-            lambda ns: ns.value == namespace, execution_engine.ns_manager.ns_list))
+        associated_namespaces = self.get_namespaces_index(
+            execution_engine.ns_manager.ns_list, 'value').get(namespace, [])
 
         # For each of them check if they are reference in the post processing
         # manager
@@ -283,6 +383,22 @@ class PostProcessingFactory:
         post processing filters
         :type: SoSDiscipline
         """
+        return self.__get_post_processing_filters(
+            discipline, self.__get_data_version(discipline), for_test=for_test)
+
+    def __get_post_processing_filters(self, discipline, data_version, for_test=False):
+        """ Get post processing filters of a discipline from the cache or build them
+        """
+        cache_key = None
+        if data_version is not None:
+            cache_key = (discipline.disc_id, for_test, data_version)
+
+        return self.__get_or_build(PostProcessingFactory.__filters_cache, cache_key,
+                                   lambda: self.__build_post_processing_filters(discipline, for_test=for_test))
+
+    def __build_post_processing_filters(self, discipline, for_test=False):
+        """ Build post processing filters for a given discipline
+        """
 
         result = []
 
@@ -358,6 +474,23 @@ class PostProcessingFactory:
 
         :returns: Post-processing list (TwoAxesInstanciatedChart/InstanciatedPieChart/InstanciatedTable) or json oject list
         """
+        return self.__get_post_processing(
+            discipline, self.__get_data_version(discipline), filters, as_json, for_test=for_test)
+
+    def __get_post_processing(self, discipline, data_version, filters, as_json=True, for_test=False):
+        """ Get post processing of a discipline from the cache or build them
+        """
+        cache_key = None
+        if data_version is not None:
+            cache_key = (discipline.disc_id, self.get_filters_key(
+                filters), as_json, for_test, data_version)
+
+        return self.__get_or_build(PostProcessingFactory.__post_processings_cache, cache_key,
+                                   lambda: self.__build_post_processing(discipline, filters, as_json, for_test=for_test))
+
+    def __build_post_processing(self, discipline, filters, as_json=True, for_test=False):
+        """ Build post processing for a given discipline
+        """
 
         # Initialize logger for the discipline
         logger = get_sos_logger(
@@ -451,6 +584,48 @@ class PostProcessingFactory:
 
         return post_processing_results
 
+    def __get_data_version(self, discipline):
+        """ Return the discipline data version used in cache keys, None if the cache is not used
+        """
+        if not self.use_cache or discipline.disc_id is None:
+            return None
+        return self.get_discipline_data_version(discipline)
+
+    def __get_or_build(self, cache, cache_key, build):
+        """ Return a copy of the cached result for cache_key, call build and cache its result otherwise
+
+        @param cache: cache to look into
+        @type OrderedDict
+
+        @param cache_key: hashable key, None to skip the cache
+        @type tuple
+
+        @param build: callable without argument returning the result
+        @type function
+        """
+        if not self.use_cache or cache_key is None:
+            return build()
+
+        with PostProcessingFactory.__cache_lock:
+            found = cache_key in cache
+            if found:
+                cache.move_to_end(cache_key)
+                result = cache[cache_key]
+        if found:
+            # cached results are never modified, callers get their own copy
+            return deepcopy(result)
+
+        result = build()
+
+        cached_result = deepcopy(result)
+        with PostProcessingFactory.__cache_lock:
+            cache[cache_key] = cached_result
+            cache.move_to_end(cache_key)
+            while len(cache) > self.CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return result
+
     def __convert_post_processing_into_json(self, post_processings, logger=None):
         """ Manage to get plotly object into post processing object and convert it into
         json with the removing of the template section
@@ -18,7 +18,6 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Class that define a spider chart display as post post processing
 """
-import plotly.graph_objects as go
 from sos_trades_core.tools.post_processing.post_processing_plotly_tooling import AbstractPostProcessingPlotlyTooling
 
 
@@ -93,6 +92,7 @@ class InstantiatedSpiderChart(AbstractPostProcessingPlotlyTooling):
 
         @return plotly.graph_objects.go instance
         """
+        import plotly.graph_objects as go
         fig = go.Figure()
 
         for trace in self.__traces:
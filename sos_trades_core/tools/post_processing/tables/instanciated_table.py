@@ -19,7 +19,6 @@ mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Class that define a table display as post post processing
 """
 
-import plotly.graph_objects as go
 from sos_trades_core.tools.post_processing.post_processing_tools import escape_str_with_comma
 from copy import deepcopy
 
@@ -99,6 +98,7 @@ class InstanciatedTable(AbstractPostProcessingPlotlyTooling):
 
         @return plotly.graph_objects.go instance
         """
+        import plotly.graph_objects as go
 
         default_font_color = 'black'
         default_background_color = 'white'
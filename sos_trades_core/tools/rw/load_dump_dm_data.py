@@ -18,13 +18,18 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 load/dump - read/write feature to manage load and dump of exported study data
 '''
-from pickle import UnpicklingError, dumps as pkl_dumps, loads as pkl_loads
+from pickle import UnpicklingError, dumps as pkl_dumps, loads as pkl_loads, \
+    dump as pkl_dump, load as pkl_load, HIGHEST_PROTOCOL
+from hashlib import sha1
+from os import makedirs, remove, replace, listdir
+from os.path import join, isdir, exists
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
 from Crypto.Cipher import AES
 from Crypto.PublicKey import RSA
 from Crypto.Cipher import PKCS1_OAEP
 from Crypto.Protocol.KDF import PBKDF2
+import numpy as np
 import pandas as pd
 
 
@@ -67,33 +72,50 @@ class DirectLoadDump(AbstractLoadDump):
 class CryptedLoadDump(AbstractLoadDump):
     '''
     Encryption feature to securise load and dump of exported study data
+    Data are pickled and encrypted on the fly with AES-GCM in fixed-size
+    chunks, so that memory stays bounded whatever the study size.
+    The AES key is wrapped with the RSA public key into a separate key file.
+    Files encrypted as a single AES-CBC block can still be loaded.
     '''
     key_enc_basename = 'key.bin.enc'
+    # plain bytes encrypted per chunk
+    chunk_size = 1 << 20
 
     def __init__(self, private_key_file, public_key_file):
         self.private_key_file = private_key_file
         self.public_key_file = public_key_file
 
     def load(self, f_name):
-        bytes_obj = self.decrypt_file(f_name)
-        # decode the bytes object to data dict
-        loaded_dict = pkl_loads(bytes_obj)
+        key = self.decrypt_key(f_name)
+        with open(f_name, 'rb') as enc_f_s:
+            if enc_f_s.read(len(AEADChunkReader.HEADER)) != AEADChunkReader.HEADER:
+                # file encrypted as a single AES-CBC block
+                enc_f_s.seek(0)
+                return pkl_loads(self.decrypt_cbc_stream(enc_f_s, key))
+            # decode the decrypted stream to data dict
+            reader = AEADChunkReader(enc_f_s, key)
+            try:
+                loaded_dict = pkl_load(reader)
+            except UnpicklingError:
+                raise LoadDumpException('encryption', 'loading/decrypting')
+            reader.check_end()
         return loaded_dict
 
     def dump(self, dict_obj, f_name):
         # Hear cannot use panda pickelization method because it does not work
         # with object
-        bytes_obj = pkl_dumps(dict_obj)
-        self.encrypt_stream(bytes_obj, f_name)
+        key = get_random_bytes(32)
+        self.encrypt_key(key, f_name)
+        with open(f_name, 'wb') as file_out_s:
+            writer = AEADChunkWriter(file_out_s, key, self.chunk_size)
+            pkl_dump(dict_obj, writer, protocol=HIGHEST_PROTOCOL)
+            writer.close()
 
     def get_key_enc_file(self, enc_filepath):
         return str(enc_filepath) + '.' + self.key_enc_basename
 
-    def encrypt_stream(self, bytes_to_en, encrypted_file):
-        # Generate random key
-        # 32 bytes * 8 = 256 bits (1 byte = 8 bits)
-        iv = get_random_bytes(16)
-        key = PBKDF2(iv, b'', dkLen=32)
+    def encrypt_key(self, key, encrypted_file):
+        ''' wrap the AES key with the RSA public key into the key file '''
         # To modify path to public key
         with open(self.public_key_file, 'r') as p_k_s:
             public_key_string = p_k_s.read()
@@ -105,16 +127,9 @@ class CryptedLoadDump(AbstractLoadDump):
         key_enc_f = self.get_key_enc_file(encrypted_file)
         with open(key_enc_f, 'wb') as output_key_s:
             output_key_s.write(encrypted_secret_key)
-        # Encrypt stream with cipher created from random key
-        cipher = AES.new(key, AES.MODE_CBC, iv)
-        ciphered_data = cipher.encrypt(pad(bytes_to_en, AES.block_size))
-
-        # Write encrypted stream inside a file
-        with open(encrypted_file, 'wb') as file_out_s:
-            file_out_s.write(iv)
-            file_out_s.write(ciphered_data)
 
-    def decrypt_file(self, in_file):
+    def decrypt_key(self, in_file):
+        ''' unwrap the AES key of in_file with the RSA private key '''
         # To modify with path where random key is stored
         key_enc_f = self.get_key_enc_file(in_file)
         try:
@@ -128,15 +143,385 @@ class CryptedLoadDump(AbstractLoadDump):
         private_key = RSA.importKey(private_key_string)
         cipher = PKCS1_OAEP.new(private_key)
         # Decrypt random key with RSA private key
-        key = cipher.decrypt(enc_key)
+        return cipher.decrypt(enc_key)
 
-        # Read the data from the file
+    def encrypt_stream(self, bytes_to_en, encrypted_file):
+        ''' encrypt bytes as a single AES-CBC block (former format) '''
+        # Generate random key
+        # 32 bytes * 8 = 256 bits (1 byte = 8 bits)
+        iv = get_random_bytes(16)
+        key = PBKDF2(iv, b'', dkLen=32)
+        self.encrypt_key(key, encrypted_file)
+        # Encrypt stream with cipher created from random key
+        cipher = AES.new(key, AES.MODE_CBC, iv)
+        ciphered_data = cipher.encrypt(pad(bytes_to_en, AES.block_size))
+
+        # Write encrypted stream inside a file
+        with open(encrypted_file, 'wb') as file_out_s:
+            file_out_s.write(iv)
+            file_out_s.write(ciphered_data)
+
+    def decrypt_file(self, in_file):
+        ''' decrypt a file encrypted as a single AES-CBC block '''
+        key = self.decrypt_key(in_file)
         with open(in_file, 'rb') as enc_f_s:
-            iv = enc_f_s.read(16)  # Read the iv out - this is 16 bytes long
-            ciphered_data = enc_f_s.read()  # Read the rest of the data
+            return self.decrypt_cbc_stream(enc_f_s, key)
+
+    def decrypt_cbc_stream(self, enc_f_s, key):
+        # Read the data from the file
+        iv = enc_f_s.read(16)  # Read the iv out - this is 16 bytes long
+        ciphered_data = enc_f_s.read()  # Read the rest of the data
 
         cipher = AES.new(key, AES.MODE_CBC, iv)  # Setup cipher
         # Decrypt and then up-pad the result
         original_data = unpad(cipher.decrypt(ciphered_data), AES.block_size)
 
         return original_data
+
+
+class AEADChunkWriter:
+    '''
+    File-like object encrypting written bytes with AES-GCM chunk by chunk
+    File layout:
+        HEADER | nonce prefix (8 bytes)
+        then for each chunk:
+        plain size (4 bytes) | final flag (1 byte) | ciphered chunk | tag (16 bytes)
+    Each chunk nonce is the nonce prefix followed by the chunk index, and the
+    final flag is authenticated so that reordered or truncated files are
+    rejected.
+    '''
+    HEADER = b'SOSGCM01'
+    NONCE_PREFIX_SIZE = 8
+    TAG_SIZE = 16
+
+    def __init__(self, file_obj, key, chunk_size):
+        self.file_obj = file_obj
+        self.key = key
+        self.chunk_size = chunk_size
+        self.nonce_prefix = get_random_bytes(self.NONCE_PREFIX_SIZE)
+        self.chunk_index = 0
+        self.buffer = bytearray()
+        self.file_obj.write(self.HEADER + self.nonce_prefix)
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        size = len(data)
+        start = 0
+        if self.buffer:
+            # complete the pending chunk first
+            start = min(self.chunk_size - len(self.buffer), size)
+            self.buffer += data[:start]
+            if len(self.buffer) < self.chunk_size:
+                return size
+            self.write_chunk(self.buffer)
+            self.buffer = bytearray()
+        # encrypt full chunks directly from data without copying it
+        while size - start >= self.chunk_size:
+            self.write_chunk(data[start:start + self.chunk_size])
+            start += self.chunk_size
+        self.buffer += data[start:]
+        return size
+
+    def write_chunk(self, plain_chunk, final=False):
+        final_flag = b'\x01' if final else b'\x00'
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=self.nonce_prefix +
+                         self.chunk_index.to_bytes(4, 'big'))
+        cipher.update(self.HEADER + final_flag)
+        ciphered_chunk, tag = cipher.encrypt_and_digest(plain_chunk)
+        self.file_obj.write(len(plain_chunk).to_bytes(4, 'big') + final_flag)
+        self.file_obj.write(ciphered_chunk)
+        self.file_obj.write(tag)
+        self.chunk_index += 1
+
+    def close(self):
+        ''' write the pending bytes as the final chunk '''
+        self.write_chunk(self.buffer, final=True)
+        self.buffer = bytearray()
+
+
+class AEADChunkReader:
+    '''
+    File-like object decrypting chunk by chunk a file written by AEADChunkWriter
+    '''
+    HEADER = AEADChunkWriter.HEADER
+
+    def __init__(self, file_obj, key):
+        '''
+        file_obj is expected to be positioned right after the header
+        '''
+        self.file_obj = file_obj
+        self.key = key
+        self.nonce_prefix = file_obj.read(AEADChunkWriter.NONCE_PREFIX_SIZE)
+        self.chunk_index = 0
+        self.final_read = False
+        self.buffer = b''
+        self.position = 0
+
+    def read_chunk(self):
+        chunk_header = self.file_obj.read(5)
+        if len(chunk_header) < 5:
+            # truncated file
+            raise LoadDumpException('encryption', 'loading/decrypting')
+        plain_size = int.from_bytes(chunk_header[:4], 'big')
+        final_flag = chunk_header[4:]
+        ciphered_chunk = self.file_obj.read(plain_size)
+        tag = self.file_obj.read(AEADChunkWriter.TAG_SIZE)
+        cipher = AES.new(self.key, AES.MODE_GCM, nonce=self.nonce_prefix +
+                         self.chunk_index.to_bytes(4, 'big'))
+        cipher.update(self.HEADER + final_flag)
+        try:
+            plain_chunk = cipher.decrypt_and_verify(ciphered_chunk, tag)
+        except ValueError:
+            raise LoadDumpException('encryption', 'loading/decrypting')
+        self.chunk_index += 1
+        self.final_read = final_flag == b'\x01'
+        return plain_chunk
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            pieces = [self.buffer[self.position:]]
+            while not self.final_read:
+                pieces.append(self.read_chunk())
+            self.buffer, self.position = b'', 0
+            return b''.join(pieces)
+
+        pieces = []
+        while size > 0:
+            available = len(self.buffer) - self.position
+            if available == 0:
+                if self.final_read:
+                    break
+                self.buffer, self.position = self.read_chunk(), 0
+                continue
+            n_bytes = min(available, size)
+            pieces.append(self.buffer[self.position:self.position + n_bytes])
+            self.position += n_bytes
+            size -= n_bytes
+        return b''.join(pieces)
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def readline(self):
+        pieces = []
+        while True:
+            end = self.buffer.find(b'\n', self.position)
+            if end >= 0:
+                pieces.append(self.buffer[self.position:end + 1])
+                self.position = end + 1
+                break
+            pieces.append(self.buffer[self.position:])
+            if self.final_read:
+                self.buffer, self.position = b'', 0
+                break
+            self.buffer, self.position = self.read_chunk(), 0
+        return b''.join(pieces)
+
+    def check_end(self):
+        ''' make sure the whole file, up to its final chunk, has been read '''
+        if self.read() != b'' or self.file_obj.read(1) != b'':
+            raise LoadDumpException('encryption', 'loading/decrypting')
+
+
+class ChunkedLoadDump(AbstractLoadDump):
+    '''
+    Chunked persistence of exported study data.
+    The file given to load/dump is a manifest holding the data dict without
+    the variable values; each value is stored in its own file into a chunks
+    folder next to the manifest:
+        - numerical arrays as .npy files that can be memory-mapped
+        - dataframes as Parquet files (pickled if Parquet cannot store them)
+        - other large values as pickle files
+    Small values are kept inline into the manifest.
+    Dumping into an existing manifest only writes the chunks of the
+    variables whose value changed. Chunk files are named after the variable
+    and the checksum of its value, so the previous manifest stays valid until
+    the new one replaces it.
+    '''
+    FORMAT_KEY = '__sos_chunked_format__'
+    FORMAT_VERSION = 1
+    DATA = 'data'
+    CHUNKS = 'chunks'
+    VALUE = 'value'
+
+    STORAGE = 'storage'
+    FILE = 'file'
+    CHECKSUM = 'checksum'
+    INLINE = 'inline'
+    NPY = 'npy'
+    PARQUET = 'parquet'
+    PICKLE = 'pkl'
+
+    chunks_dir_suffix = '.chunks'
+    # pickled values under this size (in bytes) are stored into the manifest
+    inline_max_size = 1024
+
+    def __init__(self, mmap_mode='r'):
+        '''
+        :params: mmap_mode, numpy memory-map mode used to lazily load arrays
+        through load_parameter (None to read them in memory)
+        :type: str
+        '''
+        self.mmap_mode = mmap_mode
+
+    def get_chunks_dir(self, f_name):
+        return str(f_name) + self.chunks_dir_suffix
+
+    def is_chunked_manifest(self, loaded_obj):
+        return isinstance(loaded_obj, dict) and \
+            loaded_obj.get(self.FORMAT_KEY) == self.FORMAT_VERSION
+
+    def load_manifest(self, f_name):
+        '''
+        load the manifest, a file written by DirectLoadDump is returned as is
+        '''
+        return DirectLoadDump().load(f_name)
+
+    def load(self, f_name):
+        manifest = self.load_manifest(f_name)
+        if not self.is_chunked_manifest(manifest):
+            # study dumped as a monolithic pickle
+            return manifest
+
+        chunks_dir = self.get_chunks_dir(f_name)
+        loaded_dict = {}
+        for key, param_dict in manifest[self.DATA].items():
+            loaded_dict[key] = dict(param_dict)
+            loaded_dict[key][self.VALUE] = self.load_chunk(
+                chunks_dir, manifest[self.CHUNKS][key], mmap_mode=None)
+        return loaded_dict
+
+    def load_parameter(self, f_name, var_key):
+        '''
+        load the data dict of a single variable, reading only its chunk
+        '''
+        manifest = self.load_manifest(f_name)
+        if not self.is_chunked_manifest(manifest):
+            return manifest[var_key]
+
+        param_dict = dict(manifest[self.DATA][var_key])
+        param_dict[self.VALUE] = self.load_chunk(
+            self.get_chunks_dir(f_name), manifest[self.CHUNKS][var_key],
+            mmap_mode=self.mmap_mode)
+        return param_dict
+
+    def load_chunk(self, chunks_dir, chunk_info, mmap_mode=None):
+        storage = chunk_info[self.STORAGE]
+        if storage == self.INLINE:
+            return pkl_loads(chunk_info[self.VALUE])
+        chunk_file = join(chunks_dir, chunk_info[self.FILE])
+        if storage == self.NPY:
+            return np.load(chunk_file, mmap_mode=mmap_mode, allow_pickle=False)
+        elif storage == self.PARQUET:
+            return pd.read_parquet(chunk_file)
+        elif storage == self.PICKLE:
+            with open(chunk_file, 'rb') as c_s:
+                return pkl_loads(c_s.read())
+        raise LoadDumpException('chunked', f'loading storage {storage}')
+
+    def dump(self, dict_obj, f_name, dirty_keys=None):
+        '''
+        :params: dirty_keys, keys of the variables whose value changed since
+        the last dump into f_name, all values are checked if None
+        :type: iterable
+        '''
+        chunks_dir = self.get_chunks_dir(f_name)
+        previous_chunks = {}
+        if isdir(chunks_dir):
+            try:
+                previous_manifest = self.load_manifest(f_name)
+            except (FileNotFoundError, LoadDumpException):
+                previous_manifest = None
+            if self.is_chunked_manifest(previous_manifest):
+                previous_chunks = previous_manifest[self.CHUNKS]
+        else:
+            makedirs(chunks_dir)
+        if dirty_keys is not None:
+            dirty_keys = set(dirty_keys)
+
+        manifest = {self.FORMAT_KEY: self.FORMAT_VERSION,
+                    self.DATA: {}, self.CHUNKS: {}}
+        for key, param_dict in dict_obj.items():
+            manifest[self.DATA][key] = {k: v for k, v in param_dict.items()
+                                        if k != self.VALUE}
+            previous_chunk = previous_chunks.get(key)
+            if dirty_keys is not None and key not in dirty_keys \
+                    and previous_chunk is not None:
+                manifest[self.CHUNKS][key] = previous_chunk
+            else:
+                manifest[self.CHUNKS][key] = self.dump_chunk(
+                    chunks_dir, key, param_dict.get(self.VALUE), previous_chunk)
+
+        tmp_f_name = str(f_name) + '.tmp'
+        DirectLoadDump().dump(manifest, tmp_f_name)
+        replace(tmp_f_name, f_name)
+
+        # remove chunks of the previous values and of the variables that are
+        # not in the study anymore, once the new manifest is in place
+        used_files = {chunk_info[self.FILE]
+                      for chunk_info in manifest[self.CHUNKS].values()
+                      if self.FILE in chunk_info}
+        for chunk_file in listdir(chunks_dir):
+            if chunk_file not in used_files:
+                remove(join(chunks_dir, chunk_file))
+
+    def dump_chunk(self, chunks_dir, key, value, previous_chunk=None):
+        '''
+        write the value of a variable into its chunk if its checksum changed
+        and return the chunk information stored into the manifest
+        '''
+        if isinstance(value, np.ndarray) and value.dtype.kind in 'biufc':
+            storage = self.NPY
+            if not value.flags.c_contiguous:
+                value = value.copy(order='C')
+            checksum = sha1(f'{value.dtype.str}{value.shape}'.encode())
+            checksum.update(value.data)
+            bytes_obj = None
+        else:
+            bytes_obj = pkl_dumps(value, protocol=HIGHEST_PROTOCOL)
+            checksum = sha1(bytes_obj)
+            if isinstance(value, pd.DataFrame):
+                storage = self.PARQUET
+            elif len(bytes_obj) <= self.inline_max_size:
+                storage = self.INLINE
+            else:
+                storage = self.PICKLE
+        checksum = checksum.hexdigest()
+        chunk_name = f'{sha1(key.encode()).hexdigest()}_{checksum}'
+
+        if previous_chunk is not None \
+                and previous_chunk[self.CHECKSUM] == checksum \
+                and previous_chunk[self.STORAGE] in (storage, self.PICKLE):
+            # value did not change, keep the chunk already written
+            return previous_chunk
+
+        if storage == self.INLINE:
+            return {self.STORAGE: storage, self.CHECKSUM: checksum,
+                    self.VALUE: bytes_obj}
+
+        chunk_file = f'{chunk_name}.{storage}'
+        tmp_chunk_path = join(chunks_dir, chunk_file + '.tmp')
+        if storage == self.NPY:
+            with open(tmp_chunk_path, 'wb') as c_s:
+                np.save(c_s, value, allow_pickle=False)
+        elif storage == self.PARQUET:
+            try:
+                value.to_parquet(tmp_chunk_path)
+                if not value.equals(pd.read_parquet(tmp_chunk_path)):
+                    raise ValueError('dataframe not restored by Parquet')
+            except Exception:
+                # non string column names, mixed object columns, ...
+                storage = self.PICKLE
+                if exists(tmp_chunk_path):
+                    remove(tmp_chunk_path)
+                chunk_file = f'{chunk_name}.{storage}'
+                tmp_chunk_path = join(chunks_dir, chunk_file + '.tmp')
+        if storage == self.PICKLE:
+            with open(tmp_chunk_path, 'wb') as c_s:
+                c_s.write(bytes_obj)
+        replace(tmp_chunk_path, join(chunks_dir, chunk_file))
+
+        return {self.STORAGE: storage, self.CHECKSUM: checksum,
+                self.FILE: chunk_file}
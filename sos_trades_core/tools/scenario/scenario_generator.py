@@ -19,8 +19,10 @@ mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 """
 
 from sos_trades_core.tools.scenario.scenario_manager import ScenarioManager
-from copy import deepcopy
-from itertools import product
+from ast import literal_eval
+from itertools import product, islice
+import numpy as np
+import pandas as pd
 from pandas.core.common import flatten
 
 
@@ -28,6 +30,8 @@ class ScenarioGenerator:
     """
     Class to instantiate all classes of the chosen scenario (Products, Actors...) depending on the entry
     """
+    SCENARIO_NAME = 'scenario_name'
+    SCENARIO_PREFIX = 'scenario_'
 
     def __init__(self, name=None, name_manager=None):
         """
@@ -46,61 +50,106 @@ class ScenarioGenerator:
             inputs_dict: dict of scenario parameters
             inputs_parameter: keys in inputs_dict
         """
-        nb_scenario = 0
-        values_parameter = []
-        self.scenarios_parameter = []
         self.scenarios_dict = {}
+        for scenarios_chunk in self.generate_scenarios_by_chunk(inputs_dict):
+            self.scenarios_dict.update(scenarios_chunk)
 
-        for input_name in inputs_dict.keys():
-            self.scenarios_parameter.append(input_name)
-            values_parameter.append(
-                self.generate_combinations(inputs_dict[input_name]))
+        return self.scenarios_dict
 
-        for product_value in product(*values_parameter):
-            inputs_scenario = {}
-            nb_scenario += 1
-            scenario_name = 'scenario_' + str(nb_scenario)
+    def generate_scenarios_by_chunk(self, inputs_dict, chunk_size=10000):
+        """ lazily generate scenarios by chunks of chunk_size scenarios
+        args:
+            inputs_dict: dict of scenario parameters
+            chunk_size: maximum number of scenarios of each yielded dict {scenario_name: inputs_scenario}
+        Scenarios values are shared with the parameter values lists, they are not copied
+        """
+        values_parameter = self.get_values_parameter(inputs_dict)
+        if len(self.scenarios_parameter) == 0:
+            return
 
-            for i in range(len(self.scenarios_parameter)):
-                inputs_scenario[self.scenarios_parameter[i]] = list(product_value)[
-                    i]
-            if inputs_scenario != {}:
-                self.scenarios_dict.update(
-                    self.configure_scenario(inputs_scenario, scenario_name))
+        scenario_indices = self.generate_scenario_indices(values_parameter)
+        nb_scenario = 0
+        while True:
+            indices_chunk = list(islice(scenario_indices, chunk_size))
+            if len(indices_chunk) == 0:
+                break
+            scenarios_chunk = {}
+            for indices in indices_chunk:
+                nb_scenario += 1
+                scenario_name = f'{self.SCENARIO_PREFIX}{nb_scenario}'
+                scenarios_chunk.update(self.configure_scenario(
+                    {parameter: values[index] for parameter, values, index in zip(
+                        self.scenarios_parameter, values_parameter, indices)},
+                    scenario_name))
+            yield scenarios_chunk
+
+    def generate_scenarios_df(self, inputs_dict):
+        """ generate all scenarios in one dataframe with one column scenario_name and one column per parameter
+        args:
+            inputs_dict: dict of scenario parameters
+        """
+        values_parameter = self.get_values_parameter(inputs_dict)
+        nb_values = [len(values) for values in values_parameter]
+        nb_scenarios = int(np.prod(nb_values)) if len(
+            self.scenarios_parameter) > 0 else 0
+
+        # indices of each parameter value in the cartesian product, last
+        # parameter varying first as in itertools.product
+        scenario_indices = np.indices(nb_values).reshape(
+            len(nb_values), nb_scenarios) if nb_scenarios > 0 else np.zeros((len(nb_values), 0), dtype=int)
+        scenarios_df = pd.DataFrame(
+            {self.SCENARIO_NAME: [f'{self.SCENARIO_PREFIX}{i}' for i in range(1, nb_scenarios + 1)]})
+        for parameter, values, indices in zip(self.scenarios_parameter, values_parameter, scenario_indices):
+            # object array to index values which are lists without converting
+            # them to a 2D array
+            values_array = np.empty(len(values), dtype=object)
+            values_array[:] = values
+            scenarios_df[parameter] = values_array[indices].tolist()
+
+        return scenarios_df
+
+    def get_values_parameter(self, inputs_dict):
+        """ set scenarios_parameter and return the list of values of each parameter
+        """
+        self.scenarios_parameter = list(inputs_dict.keys())
+        return [self.generate_combinations(input_value) for input_value in inputs_dict.values()]
 
-        return self.scenarios_dict
+    @staticmethod
+    def generate_scenario_indices(values_parameter):
+        """ lazily yield the combinations as tuples of indices in each parameter values list
+        """
+        return product(*[range(len(values)) for values in values_parameter])
+
+    @staticmethod
+    def parse_literal(value):
+        """ parse a python literal stored as string (list, tuple, number, string...) without evaluating code
+        """
+        try:
+            return literal_eval(value)
+        except (ValueError, SyntaxError) as error:
+            raise ValueError(
+                f'Scenario value {value} is not a python literal: {error}')
 
     def generate_combinations(self, input_value):
-        if input_value == None:
+        if input_value is None:
             return []
         if isinstance(input_value, (float, int, str)):
             return [input_value]
         if isinstance(input_value, list):
             return input_value
         if isinstance(input_value, dict):
-            val_in_dict = list(input_value.values())
-
             # patch to load dict of list using strings
-            val_in_dict_copy = deepcopy(val_in_dict)
-            val_in_dict = []
-            for val in val_in_dict_copy:
-                if isinstance(val, str):
-                    val_in_dict.append(eval(val))
-                else:
-                    val_in_dict.append(val)
-
-            combinations = []
-            for product_val in product(*val_in_dict):
-                combinations.append(list(flatten(list(product_val))))
-            return combinations
+            val_in_dict = [self.parse_literal(val) if isinstance(val, str) else val
+                           for val in input_value.values()]
+
+            return [list(flatten(list(product_val))) for product_val in product(*val_in_dict)]
 
     def configure_scenario(self, inputs_scenario, scenario_name):
-        inputs = deepcopy(inputs_scenario)
         scenario = self.scenario_manager.add_scenario(
             scenario_name)
         if self.scenarios_parameter == []:
             self.scenarios_parameter = scenario.get_scenario_parameters()
-        return {scenario_name: inputs}
+        return {scenario_name: inputs_scenario}
 
     def get_scenarios_parameter(self):
         return self.scenarios_parameter
@@ -17,17 +17,23 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 Data manager pickle (de)serializer
 '''
-from os.path import join, dirname, basename
+from os.path import join, dirname, basename, abspath
 from pathlib import Path
 from os import makedirs
 from time import sleep
 from io import BytesIO, StringIO
-from shutil import rmtree, make_archive
+from zipfile import ZipFile, ZIP_DEFLATED
+from concurrent.futures import ThreadPoolExecutor
+
+from pickle import Pickler, Unpickler, HIGHEST_PROTOCOL
+from hashlib import sha1
+from zlib import compress, decompress
 
 from pandas import DataFrame, read_pickle, concat
-from numpy import ndarray
+from numpy import ndarray, frombuffer
 
-from sos_trades_core.tools.rw.load_dump_dm_data import DirectLoadDump
+from sos_trades_core.tools.rw.load_dump_dm_data import DirectLoadDump, \
+    ChunkedLoadDump
 from sos_trades_core.execution_engine.ns_manager import NS_SEP
 
 CSV_SEP = ','
@@ -60,6 +66,89 @@ def generate_unique_data_csv(data_dict, csv_file_path):
     df_data.to_csv(csv_file_path, sep=CSV_SEP, header=True, index=False)
 
 
+# key identifying a cache map packed by pack_cache_map
+PACKED_CACHE_KEY = '__sos_packed_cache_map__'
+PACKED_CACHE_VERSION = 1
+
+
+class CacheMapPickler(Pickler):
+    '''
+    Pickler storing numerical arrays out of the pickle stream,
+    each unique array buffer being compressed and stored once by content hash
+    '''
+
+    def __init__(self, file, buffers, min_nbytes):
+        super().__init__(file, protocol=HIGHEST_PROTOCOL)
+        self.buffers = buffers
+        self.min_nbytes = min_nbytes
+        # (array, hash) of the arrays already met, by object id
+        # the array is kept referenced so that its id can not be reused
+        # by another array during the dump
+        self.array_ids = {}
+
+    def persistent_id(self, obj):
+        if type(obj) is not ndarray or obj.dtype.kind not in 'biufc' \
+                or obj.nbytes < self.min_nbytes:
+            return None
+        known_array = self.array_ids.get(id(obj))
+        if known_array is not None:
+            return known_array[1]
+        data = obj.tobytes()
+        array_id = sha1(f'{obj.dtype.str}{obj.shape}'.encode() + data).hexdigest()
+        if array_id not in self.buffers:
+            self.buffers[array_id] = (obj.dtype.str, obj.shape, compress(data))
+        self.array_ids[id(obj)] = (obj, array_id)
+        return array_id
+
+
+class CacheMapUnpickler(Unpickler):
+    '''
+    Unpickler restoring the arrays stored out of the pickle stream by CacheMapPickler
+    '''
+
+    def __init__(self, file, buffers):
+        super().__init__(file)
+        self.buffers = buffers
+        # each unique buffer is decompressed once
+        self.decompressed = {}
+
+    def persistent_load(self, pid):
+        dtype, shape, compressed_data = self.buffers[pid]
+        if pid not in self.decompressed:
+            self.decompressed[pid] = decompress(compressed_data)
+        # each reference gets its own array as it would with a plain pickle
+        return frombuffer(self.decompressed[pid], dtype=dtype).reshape(shape).copy()
+
+
+def pack_cache_map(cache_map, min_nbytes=128):
+    '''
+    Pack disciplines caches for persistence: the numerical arrays shared by the caches
+    of coupled disciplines are stored once and compressed, the rest is pickled and compressed
+    '''
+    buffers = {}
+    stream = BytesIO()
+    CacheMapPickler(stream, buffers, min_nbytes).dump(cache_map)
+    return {PACKED_CACHE_KEY: PACKED_CACHE_VERSION,
+            'cache_map': compress(stream.getvalue()),
+            'buffers': buffers}
+
+
+def unpack_cache_map(packed_cache_map):
+    '''
+    Rebuild disciplines caches packed by pack_cache_map,
+    a cache map that was not packed is returned as is
+    '''
+    if not is_packed_cache_map(packed_cache_map):
+        return packed_cache_map
+    stream = BytesIO(decompress(packed_cache_map['cache_map']))
+    return CacheMapUnpickler(stream, packed_cache_map['buffers']).load()
+
+
+def is_packed_cache_map(cache_map):
+    return isinstance(cache_map, dict) and \
+        cache_map.get(PACKED_CACHE_KEY) == PACKED_CACHE_VERSION
+
+
 class DataSerializer:
     """
     Data serializer class
@@ -177,7 +266,7 @@ class DataSerializer:
                                          file_type=self.cache_filename)
         
         if cache_dict_f is not None:
-            return rw_strategy.load(cache_dict_f)
+            return unpack_cache_map(rw_strategy.load(cache_dict_f))
 
     def load_disc_status_dict(self, study_to_load, rw_strategy):
         ''' load disciplines status from binary file (containing disc/status info into dictionary) '''
@@ -187,38 +276,65 @@ class DataSerializer:
 
         return rw_strategy.load(status_dict_f)
 
-    def export_data_dict_to_csv(self, origin_dict, export_dir=None):
-        ''' export values and units of the whole DM data_dict to csv file '''
-        data_df = DataFrame(columns=['unit', 'value'])
+    def build_values_table(self, origin_dict):
+        '''
+        build in one shot the table of values and units of the whole DM data_dict,
+        structured values being referenced by the url of their csv file
+        return this table and the keys of the structured values
+        '''
+        keys, units, values, structured_keys = [], [], [], []
         for key, val in origin_dict.items():
             val_to_display = val['value']
             if self.is_structured_data_type(val_to_display):
-                csv_f = join(export_dir, key + '.csv')
-                generate_unique_data_csv(val_to_display, csv_f)
-                val_to_display = FILE_URL + basename(csv_f)
-            data_df.loc[key] = {'unit': val['unit'],
-                                'value': val_to_display}
+                structured_keys.append(key)
+                val_to_display = FILE_URL + key + '.csv'
+            keys.append(key)
+            units.append(val['unit'])
+            values.append(val_to_display)
+        data_df = DataFrame({'unit': units, 'value': values}, index=keys,
+                            columns=['unit', 'value'], dtype=object)
         # force null cells to None instead of NaN (avoiding SQL issue)
         data_df = data_df.where(data_df.notnull(), None)
+        return data_df, structured_keys
+
+    def export_data_dict_to_csv(self, origin_dict, export_dir=None, n_threads=None):
+        ''' export values and units of the whole DM data_dict to csv file '''
+        data_df, structured_keys = self.build_values_table(origin_dict)
+
+        def export_structured_value(key):
+            generate_unique_data_csv(origin_dict[key]['value'],
+                                     join(export_dir, key + '.csv'))
+
+        # structured values are converted and written concurrently
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(export_structured_value, structured_keys))
         return data_df
 
-    def export_data_dict_and_zip(self, origin_dict, export_dir=None):
-        ''' export values and units of the whole DM data_dict to csv file and zip '''
-        if not Path(export_dir).is_dir():
-            makedirs(export_dir)
-            sleep(0.1)
-        data_df = self.export_data_dict_to_csv(origin_dict,
-                                               export_dir=export_dir)
-        self.dm_val_file = join(export_dir, self.val_filename)
-        data_df.to_csv(self.dm_val_file, sep=CSV_SEP,
-                       columns=data_df.columns)
-        # zip folder and return zip filepath
-        export_dir_zip = make_archive(export_dir,
-                                      'zip',
-                                      dirname(export_dir),
-                                      basename(export_dir))
-        sleep(0.1)
-        rmtree(export_dir)
+    def export_data_dict_and_zip(self, origin_dict, export_dir=None, n_threads=None):
+        '''
+        export values and units of the whole DM data_dict to csv files
+        written straight into a zip archive, the csv files being stored
+        into a folder named as export_dir into the archive
+        return the zip filepath
+        '''
+        export_dir_zip = abspath(export_dir) + '.zip'
+        if not Path(dirname(export_dir_zip)).is_dir():
+            makedirs(dirname(export_dir_zip))
+        data_df, structured_keys = self.build_values_table(origin_dict)
+        arc_dir = basename(abspath(export_dir))
+
+        def convert_structured_value(key):
+            return self.convert_to_dataframe_and_bytes_io(
+                origin_dict[key]['value'], key).getvalue()
+
+        with ZipFile(export_dir_zip, 'w', ZIP_DEFLATED) as zip_file:
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                for key, csv_bytes in zip(structured_keys,
+                                          executor.map(convert_structured_value,
+                                                       structured_keys)):
+                    zip_file.writestr(f'{arc_dir}/{key}.csv', csv_bytes)
+            zip_file.writestr(f'{arc_dir}/{self.val_filename}',
+                              data_df.to_csv(sep=CSV_SEP, columns=data_df.columns))
         return export_dir_zip
 
     def load_from_pickle(self,
@@ -237,30 +353,24 @@ class DataSerializer:
 
         loaded_dict = rw_strategy.load(self.dm_pkl_file)
 
-        def is_variable_wo_studyname_exists(var, a_d):
-            ''' check if variable exists in data dict
-            by ignoring the study name, i.e. the first element splitted by .'''
-            key_wo_st = strip_study_from_namespace(var)
-            no_study_keys = [strip_study_from_namespace(k) for k in a_d.keys()]
-            return key_wo_st in no_study_keys
-
-        current_st_n = None
-        loaded_st_n = None
-        if not just_return_data_dict:
-            current_st_n = get_study_from_namespace(list(data_dict.keys())[0])
-            loaded_st_n = get_study_from_namespace(list(loaded_dict.keys())[0])
-        for param_id, param_dict in loaded_dict.items():
-            if just_return_data_dict or is_variable_wo_studyname_exists(
-                    param_id, data_dict):
-                if current_st_n != loaded_st_n:
-                    param_id = param_id.replace(loaded_st_n, current_st_n)
-                if just_return_data_dict:
-                    data_dict[param_id] = {}
+        if just_return_data_dict:
+            for param_id, param_dict in loaded_dict.items():
+                data_dict[param_id] = {}
                 data_dict[param_id].update(param_dict)
-            else:
-                sp_var = strip_study_from_namespace(param_id)
+            return
+
+        # index data_dict keys by their name without study name, i.e. without
+        # the first element splitted by ., so that each loaded variable is
+        # matched (and renamed to the current study) in constant time
+        keys_wo_study = {strip_study_from_namespace(k): k
+                         for k in data_dict.keys()}
+        for param_id, param_dict in loaded_dict.items():
+            sp_var = strip_study_from_namespace(param_id)
+            current_param_id = keys_wo_study.get(sp_var)
+            if current_param_id is None:
                 raise KeyError(
                     f'Variable {sp_var} does not exist into {data_dict.keys()}')
+            data_dict[current_param_id].update(param_dict)
 
     def get_dm_file(self, study_to_load, file_type=None):
         ''' return  paths of files containing data for a given study  '''
@@ -296,11 +406,16 @@ class DataSerializer:
         self.dm_val_file = self.get_dm_file(study_to_load=study_to_load,
                                             file_type=self.val_filename)
 
-    def put_dict_from_study(self, study_to_load, rw_strategy, data_dict):
+    def put_dict_from_study(self, study_to_load, rw_strategy, data_dict,
+                            dirty_keys=None):
         '''
         :params: anonymize_function, a function that map a given key of the data
         dictionary using rule for the saving process
         :type: function
+
+        :params: dirty_keys, keys whose value changed since the last dump,
+        only used by a chunked strategy to rewrite these values only
+        :type: iterable
         '''
 
         if not Path(study_to_load).is_dir():
@@ -311,7 +426,11 @@ class DataSerializer:
         self.dm_pkl_file = join(study_to_load, self.pkl_filename)
 
         # serialise raw tree_node.data dict with pickle
-        rw_strategy.dump(data_dict, self.dm_pkl_file)
+        if isinstance(rw_strategy, ChunkedLoadDump):
+            rw_strategy.dump(data_dict, self.dm_pkl_file,
+                             dirty_keys=dirty_keys)
+        else:
+            rw_strategy.dump(data_dict, self.dm_pkl_file)
         
     def put_cache_from_study(self, study_to_load, rw_strategy, cache_map):
         '''
@@ -327,8 +446,8 @@ class DataSerializer:
         # export full cache_map to unique pickle file
         self.cache_file = join(study_to_load, self.cache_filename)
 
-        # serialise raw cache_map with pickle
-        rw_strategy.dump(cache_map, self.cache_file)
+        # serialise cache_map with arrays deduplicated and compressed
+        rw_strategy.dump(pack_cache_map(cache_map), self.cache_file)
 
     def get_dict_from_study(self, study_to_load, rw_strategy):
         ''' function that load every pickle files into a location
@@ -364,21 +483,9 @@ class DataSerializer:
             else:
                 first_el = param_data[0]
                 if isinstance(first_el, dict):
-                    # get the keys of sub dict to make columns of dataframe
-                    df_sub_col = []
-                    for param_dict in param_data:
-                        df_sub_col.extend(list(param_dict.keys()))
-                    df_sub_col = list(set(df_sub_col))
-                    df_col = ['variable'] + list(df_sub_col)
-                    df_data = DataFrame(columns=df_col)
-                    # iterate on keys of this dict and concatenate value
-                    for k, a_d in enumerate(param_data):
-                        # append built dataframe to global one
-                        df_sub_col = a_d.keys()
-                        a_df = DataFrame([a_d.values()], columns=df_sub_col)
-                        df_data = concat([df_data, a_df.assign(variable=k)],
-                                         sort=False)
-                    df_data = df_data[df_col]
+                    # one row per sub dict, columns being the keys of all sub dicts
+                    df_data = DataFrame(list(param_data))
+                    df_data.insert(0, 'variable', range(len(param_data)))
                 else:
                     df_data = DataFrame(param_data, columns=['value'])
         elif isinstance(param_data, dict):
@@ -393,13 +500,10 @@ class DataSerializer:
                     # use the columns of sub df as columns of dataframe
                     df_col = first_el.columns
                     df_col = df_col.insert(0, 'variable')
-                    df_data = DataFrame(columns=df_col)
-                    # iterate on keys of this dict and concatenate value
-                    for k, a_df in param_data.items():
-                        # append built dataframe to global one
-                        df_data = concat([df_data, a_df.assign(variable=k)],
-                                         sort=False)
-                    df_data = df_data[df_col]
+                    # concatenate all sub dataframes at once
+                    df_data = concat([a_df.assign(variable=k)
+                                      for k, a_df in param_data.items()],
+                                     sort=False)[df_col]
                 else:
                     # dict of values, so just add header 'value'
                     df_data = DataFrame(param_data.items(),
@@ -409,9 +513,14 @@ class DataSerializer:
             df_data = DataFrame([param_data], columns=['value'])
         return df_data
 
-    def get_parameter_data(self, var_key):
+    def get_parameter_data(self, var_key, study_to_load=None):
+        if study_to_load is not None or self.dm_pkl_file is None:
+            self.set_dm_pkl_files(study_to_load)
+        if isinstance(self.encryption_strategy, ChunkedLoadDump):
+            # only read the chunk of this variable
+            return self.encryption_strategy.load_parameter(self.dm_pkl_file,
+                                                           var_key)
         # get data_dict from pickle file
-        self.set_dm_pkl_files()
         return self.get_data_dict_from_pickle()[var_key]
 
     def convert_to_dataframe_and_bytes_io(self, param_value, param_key):
@@ -17,14 +17,19 @@ limitations under the License.
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 """
 from json import dumps
+from functools import lru_cache
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
-from os.path import dirname, isdir, isfile, join
+from os.path import dirname, isdir, isfile, join, getmtime
 import inspect
 import os
 import base64
 import re
 from os import listdir
 
+# Markdown documentation already converted, stored by source filepath
+# {filepath: (files_mtimes, markdown_data)}
+MARKDOWN_CACHE = {}
+
 
 class TreeNode:
     """
@@ -46,7 +51,7 @@ class TreeNode:
         self.children = []
 
         # Data coming from DataManager.data_dict for the associated namespace
-        self.data = {}  # current node data
+        self._data = {}  # current node data
 
         # Store the discipline type
         self.node_type = 'data'
@@ -66,14 +71,24 @@ class TreeNode:
         # Dict with addition of maturity for each discipline on this TreeNode
         self.multi_discipline_maturity = {}
 
+        # Status of each discipline on this TreeNode {disc_id: status}
+        self.disciplines_status = {}
+
         # Disciplines maturity (determined using the discipline maturity)
         self.maturity = ''
 
         # Data at discipline level (not namespace level => cf. self.data
-        self.disc_data = {}  # to be able to show all variable at each discipline level
+        self._disc_data = {}  # to be able to show all variable at each discipline level
 
         # Treenode documentation (markdown format)
-        self.markdown_documentation = []
+        self._markdown_documentation = []
+
+        # Disciplines, variables and documentations attached to the treenode
+        # but not yet read, they are read from the DataManager when the
+        # treenode is expanded (first access)
+        self.__pending_disc_data = []
+        self.__pending_data = []
+        self.__pending_markdown = []
 
         # List of models present at current treenode
         self.models_full_path_list = []
@@ -82,11 +97,81 @@ class TreeNode:
         self.model_name_full_path = None
         self.last_treenode = None
 
-    def to_json(self):
-        dict_obj = self.to_dict()
+    @property
+    def data(self):
+        self.__expand()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self.__pending_data = []
+        self._data = data
+
+    @property
+    def disc_data(self):
+        self.__expand()
+        return self._disc_data
+
+    @disc_data.setter
+    def disc_data(self, disc_data):
+        self.__pending_disc_data = []
+        self._disc_data = disc_data
+
+    @property
+    def markdown_documentation(self):
+        self.__expand()
+        return self._markdown_documentation
+
+    @markdown_documentation.setter
+    def markdown_documentation(self, markdown_documentation):
+        self.__pending_markdown = []
+        self._markdown_documentation = markdown_documentation
+
+    @property
+    def is_expanded(self):
+        """ True if no discipline data, variable or documentation is waiting to be read
+        """
+        return len(self.__pending_disc_data) == 0 and len(self.__pending_data) == 0 \
+            and len(self.__pending_markdown) == 0
+
+    def __expand(self):
+        """ Snapshot pending discipline data and variables from the DataManager and read
+        pending documentations. Disciplines and variables removed from the DataManager
+        since the treeview was built are skipped.
+        Discipline data are read first because variables data use them
+        """
+        if len(self.__pending_disc_data) > 0:
+            pending_disc_data, self.__pending_disc_data = self.__pending_disc_data, []
+            for discipline, read_only in pending_disc_data:
+                if discipline.disc_id in discipline.dm.disciplines_dict:
+                    self.__set_disc_data_from_discipline(
+                        discipline, read_only)
+
+        if len(self.__pending_data) > 0:
+            pending_data, self.__pending_data = self.__pending_data, []
+            for key, data_manager, read_only in pending_data:
+                if data_manager.check_data_in_dm(key):
+                    self.set_data(key, data_manager.get_data(key), read_only)
+
+        if len(self.__pending_markdown) > 0:
+            pending_markdown, self.__pending_markdown = self.__pending_markdown, []
+            for filepath, markdown_data, key in pending_markdown:
+                if filepath is not None:
+                    markdown_data = TreeNode.get_markdown_documentation(
+                        filepath)
+                self.__add_markdown_documentation(markdown_data, key)
+
+    def to_json(self, depth=None):
+        dict_obj = self.to_dict(depth=depth)
         return dumps(dict_obj)
 
-    def to_dict(self):
+    def to_dict(self, depth=None):
+        """ Serialize the treenode and its children
+
+        :params: depth, number of children levels to serialize, all levels if None
+        (children below this depth are serialized as an empty list)
+        :type: int
+        """
         dict_obj = {}
         # Serialize name attribute
         dict_obj.update({'name': self.name})
@@ -124,11 +209,50 @@ class TreeNode:
 
         # Serialize children attribute
         dict_child = []
-        for tn in self.children:
-            dict_child.append(tn.to_dict())
+        if depth is None or depth > 0:
+            child_depth = None if depth is None else depth - 1
+            for tn in self.children:
+                dict_child.append(tn.to_dict(depth=child_depth))
         dict_obj.update({'children': dict_child})
+        dict_obj.update({'has_children': len(self.children) > 0})
         return dict_obj
 
+    def attach_data(self, key, data_manager, read_only=False):
+        """ Attach a DataManager variable to the treenode, its data are copied
+        from the DataManager when the treenode is expanded
+
+        :params: key, variable full name
+        :type: string
+
+        :params: data_manager, data manager holding the variable
+        :type: DataManager
+
+        :params: read_only, set variable as not editable
+        :type: boolean
+        """
+        self.__pending_data.append((key, data_manager, read_only))
+
+    def set_data(self, key, val, read_only=False):
+        """ Copy a DataManager variable into the treenode data
+
+        :params: key, variable full name
+        :type: string
+
+        :params: val, variable data dict
+        :type: dict
+
+        :params: read_only, set variable as not editable
+        :type: boolean
+        """
+        self._data[key] = {k: v for k, v in val.items()}
+
+        if key in self._disc_data:
+            self._data[key][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST] = \
+                self._disc_data[key][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST]
+
+        if read_only:
+            self._data[key][SoSDiscipline.EDITABLE] = False
+
     def update_treenode_attributes(self, discipline, no_data=False, read_only=False):
         """ Inject discipline data into the current treenode
 
@@ -144,35 +268,12 @@ class TreeNode:
 
         if self.node_type != 'SoSCoupling':
             self.model_name = discipline.__module__.split('.')[-2]
-        # Some modification has to be done on variable:
-        # identifier : variable namespace + variable name
-        # I/O type : 'in' for data_in and 'out' for data_out
-        data_in = discipline.get_data_in()
-        if not no_data:
-            for key, data_key in data_in.items():
-                namespaced_key = discipline.get_var_full_name(
-                    key, data_in)
-                new_disc_data = {
-                    needed_key: data_key[needed_key] for needed_key in self.needed_variables}
-                new_disc_data[SoSDiscipline.IO_TYPE] = SoSDiscipline.IO_TYPE_IN
-                if read_only:
-                    new_disc_data[SoSDiscipline.EDITABLE] = False
-                self.update_disc_data(
-                    new_disc_data, namespaced_key, discipline)
 
-        data_out = discipline.get_data_out()
+        # Variables are read from the discipline when the treenode is expanded
         if not no_data:
-            for key, data_key in data_out.items():
-                namespaced_key = discipline.get_var_full_name(
-                    key, data_out)
-                new_disc_data = {
-                    needed_key: data_key[needed_key] for needed_key in self.needed_variables}
-                new_disc_data[SoSDiscipline.IO_TYPE] = SoSDiscipline.IO_TYPE_OUT
-                if read_only:
-                    new_disc_data[SoSDiscipline.EDITABLE] = False
-                self.update_disc_data(
-                    new_disc_data, namespaced_key, discipline)
+            self.__pending_disc_data.append((discipline, read_only))
 
+        self.disciplines_status[discipline.disc_id] = discipline.status
         self.__manage_status(discipline.status)
 
         # Convert maturity dictionary to string for display purpose
@@ -199,10 +300,74 @@ class TreeNode:
             s_mat = ''
         self.maturity = s_mat
 
-        # Manage markdown documentation
-        filepath = inspect.getfile(discipline.__class__)
-        markdown_data = TreeNode.get_markdown_documentation(filepath)
-        self.add_markdown_documentation(markdown_data, discipline.__module__)
+        # Manage markdown documentation, read when treenode documentation is
+        # accessed
+        filepath = TreeNode.get_class_filepath(discipline.__class__)
+        self.__pending_markdown.append(
+            (filepath, None, discipline.__module__))
+
+    def __set_disc_data_from_discipline(self, discipline, read_only=False):
+        """ Copy discipline input and output variables into treenode disc_data
+
+        :params: discipline to set into the treenode
+        :type: SoSDiscipline
+        """
+        # Some modification has to be done on variable:
+        # identifier : variable namespace + variable name
+        # I/O type : 'in' for data_in and 'out' for data_out
+        for io_type, data_io in [(SoSDiscipline.IO_TYPE_IN, discipline.get_data_in()),
+                                 (SoSDiscipline.IO_TYPE_OUT, discipline.get_data_out())]:
+            for key, data_key in data_io.items():
+                namespaced_key = discipline.get_var_full_name(
+                    key, data_io)
+                new_disc_data = {
+                    needed_key: data_key[needed_key] for needed_key in self.needed_variables}
+                new_disc_data[SoSDiscipline.IO_TYPE] = io_type
+                if read_only:
+                    new_disc_data[SoSDiscipline.EDITABLE] = False
+                self.update_disc_data(
+                    new_disc_data, namespaced_key, discipline)
+
+    def update_discipline_status(self, disc_id, status):
+        """ Update the status of a discipline of the treenode and compute the treenode status again
+
+        :params: disc_id, discipline identifier
+        :type: string
+
+        :params: status, new discipline status
+        :type: string
+
+        :return: boolean, True if treenode status has changed
+        """
+        self.disciplines_status[disc_id] = status
+        previous_status = self.status
+        self.status = TreeNode.STATUS_INPUT_DATA
+        for disc_status in self.disciplines_status.values():
+            self.__manage_status(disc_status)
+        return self.status != previous_status
+
+    def update_variable(self, key, changes):
+        """ Update attributes of a variable of treenode data or disc_data
+        Variables of a treenode not yet expanded are read from the DataManager on expansion
+
+        :params: key, variable full name
+        :type: string
+
+        :params: changes, changed attributes {attr: value}
+        :type: dict
+
+        :return: tuple of dict, attributes changed in data and in disc_data
+        """
+        data_changes = {}
+        disc_data_changes = {}
+        if key in self._data:
+            data_changes = changes
+            self._data[key].update(changes)
+        if key in self._disc_data:
+            disc_data_changes = {attr: value for attr, value in changes.items()
+                                 if attr in self.needed_variables}
+            self._disc_data[key].update(disc_data_changes)
+        return data_changes, disc_data_changes
 
     def update_disc_data(self, new_disc_data, namespace, discipline):
         """ Set variable from discipline into treenode disc_data
@@ -215,15 +380,15 @@ class TreeNode:
         :params: discipline to set into the treenode
         :type: SoSDiscipline
         """
-        if namespace not in self.disc_data:
-            self.disc_data[namespace] = new_disc_data
-            self.disc_data[namespace][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST] = [
+        if namespace not in self._disc_data:
+            self._disc_data[namespace] = new_disc_data
+            self._disc_data[namespace][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST] = [
                 discipline.__module__]
         else:
             for key, value in new_disc_data.items():
-                self.disc_data[namespace][key] = value
-            if discipline.__module__ not in self.disc_data[namespace][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST]:
-                self.disc_data[namespace][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST].append(
+                self._disc_data[namespace][key] = value
+            if discipline.__module__ not in self._disc_data[namespace][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST]:
+                self._disc_data[namespace][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST].append(
                     discipline.__module__)
 
     def add_markdown_documentation(self, markdown_data, key):
@@ -235,20 +400,78 @@ class TreeNode:
         :params: key, associated key (used to manage multiple documentation into the same treenode
         :type: key 
         """
+        self.__pending_markdown.append((None, markdown_data, key))
+
+    def add_markdown_documentation_from_file(self, filepath, key):
+        """ Add the markdown documentation associated to a python file to the treenode,
+        documentation is read when treenode documentation is accessed
+
+        :params: filepath, python file path the documentation is associated to
+        :type: str
+
+        :params: key, associated key (used to manage multiple documentation into the same treenode
+        :type: key
+        """
+        self.__pending_markdown.append((filepath, None, key))
+
+    def __add_markdown_documentation(self, markdown_data, key):
 
         if markdown_data is not None and markdown_data != "":
-            self.markdown_documentation.append({
+            self._markdown_documentation.append({
                 TreeNode.MARKDOWN_NAME_KEY: key,
                 TreeNode.MARKDOWN_DOCUMENTATION_KEY: markdown_data
             })
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_class_filepath(discipline_class):
+        """ Return the file where a discipline class is defined
+        (inspect.getfile result does not change for a given class)
+        """
+        return inspect.getfile(discipline_class)
+
     @staticmethod
     def get_markdown_documentation(filepath):
+        """ Return the markdown documentation associated to a python file
+        Documentation is cached and read again only if the documentation folder,
+        the markdown file or one of its images has been modified
+        """
+        cached_markdown = MARKDOWN_CACHE.get(filepath)
+        if cached_markdown is not None:
+            files_mtimes, markdown_data = cached_markdown
+            if TreeNode.__get_files_mtimes(files_mtimes.keys()) == files_mtimes:
+                return markdown_data
+
+        files_to_watch = []
+        markdown_data = TreeNode.__read_markdown_documentation(
+            filepath, files_to_watch)
+        MARKDOWN_CACHE[filepath] = (
+            TreeNode.__get_files_mtimes(files_to_watch), markdown_data)
+
+        return markdown_data
+
+    @staticmethod
+    def __get_files_mtimes(filepaths):
+        """ Return modification time of each file, None if the file does not exist
+        """
+        files_mtimes = {}
+        for filepath in filepaths:
+            try:
+                files_mtimes[filepath] = getmtime(filepath)
+            except OSError:
+                files_mtimes[filepath] = None
+        return files_mtimes
+
+    @staticmethod
+    def __read_markdown_documentation(filepath, files_to_watch):
         # Manage markdown documentation
 
         doc_folder_path = join(dirname(filepath), 'documentation')
         filename = os.path.basename(filepath).split('.')[0]
         markdown_data = ""
+        # adding or removing a markdown file updates the folder modification
+        # time
+        files_to_watch.append(doc_folder_path)
         if isdir(doc_folder_path):
             # look for markdown file with extension .markdown or .md
             markdown_list = [join(doc_folder_path, md_file) for md_file in listdir(doc_folder_path) if ((
@@ -260,6 +483,7 @@ class TreeNode:
 
                 if isfile(markdown_filepath):
                     markdown_data = ''
+                    files_to_watch.append(markdown_filepath)
 
                     with open(markdown_filepath, 'r+t', encoding='utf-8') as f:
                         markdown_data = f.read()
@@ -281,9 +505,11 @@ class TreeNode:
 
                         # Convert markdown image link to link to base64 image
                         image_filepath = join(doc_folder_path, image_name)
+                        files_to_watch.append(image_filepath)
 
                         if isfile(image_filepath):
-                            image_data = open(image_filepath, 'r+b').read()
+                            with open(image_filepath, 'rb') as f:
+                                image_data = f.read()
                             encoded = base64.b64encode(
                                 image_data).decode('utf-8')
 
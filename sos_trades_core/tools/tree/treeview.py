@@ -17,6 +17,7 @@ from sos_trades_core.execution_engine import ns_manager
 """
 mode: python; py-indent-offset: 4; tab-width: 4; coding: utf-8
 """
+from json import dumps
 from sos_trades_core.tools.tree.treenode import TreeNode
 from sos_trades_core.execution_engine.ns_manager import NamespaceManager, NS_SEP
 from sos_trades_core.execution_engine.sos_discipline import SoSDiscipline
@@ -41,6 +42,18 @@ class TreeView:
         self.read_only = read_only
         self.root = None
 
+        # treenodes by namespace and by discipline identifier
+        self.treenodes = {}
+        self.disc_id_treenodes = {}
+
+        # changes applied since last call to get_changes
+        # {full_namespace: {'status': status, 'data': {key: {attr: value}}, 'disc_data': {...}}}
+        self.changes = {}
+
+        # True if variables have been added or removed in the DataManager,
+        # the treeview has to be built again
+        self.structure_changed = False
+
     def create_tree_node(self, data_manager, root_process, ns_manager, process_module=''):
         """ Function that builds a composite structure (tree view  of tree nodes)
         regarding the DataManager stored through disciplines references and data dictionary
@@ -61,7 +74,7 @@ class TreeView:
         disc_dict = data_manager.disciplines_dict
         data_dict = data_manager.convert_data_dict_with_full_name()
 
-        treenodes = {}
+        treenodes = self.treenodes
 
         # Initialise treeview root discipline on treeview
 
@@ -74,9 +87,10 @@ class TreeView:
             documentation_folder = import_module(process_module).__file__
 
             if documentation_folder != '':
-
-                self.root.add_markdown_documentation(TreeNode.get_markdown_documentation(
-                    documentation_folder), TreeView.PROCESS_DOCUMENTATION)
+                # markdown is read (and cached) when root documentation is
+                # accessed
+                self.root.add_markdown_documentation_from_file(
+                    documentation_folder, TreeView.PROCESS_DOCUMENTATION)
         except:
             pass
 
@@ -99,7 +113,7 @@ class TreeView:
 
             if namespace in treenodes:
                 treenode = treenodes[namespace]
-                self.set_treenode_data(treenode, key, val)
+                self.set_treenode_data(treenode, key, data_manager)
 
             else:
                 try:    # Todo review this code because access on exec engine attribute is not correct
@@ -108,7 +122,8 @@ class TreeView:
                     if val['io_type'] == 'in':
                         treenode = self.add_treenode(
                             None, namespace.split(NS_SEP))
-                        self.set_treenode_data(treenode, key, val)
+                        treenodes[namespace] = treenode
+                        self.set_treenode_data(treenode, key, data_manager)
                 except:
                     pass
 
@@ -124,17 +139,12 @@ class TreeView:
             except:
                 pass
 
-    def set_treenode_data(self, treenode, key, val):
-
+    def set_treenode_data(self, treenode, key, data_manager):
+        """ Attach a variable to the treenode, its data are copied from the
+        data manager when the treenode is expanded
+        """
         if not self.no_data:
-            treenode.data[key] = {k: v for k, v in val.items()}
-
-            if key in treenode.disc_data:
-                treenode.data[key][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST] = \
-                    treenode.disc_data[key][SoSDiscipline.DISCIPLINES_FULL_PATH_LIST]
-
-            if self.read_only:
-                treenode.data[key][SoSDiscipline.EDITABLE] = False
+            treenode.attach_data(key, data_manager, self.read_only)
 
     def add_treenode(self, discipline, namespace=None):
         """ Add a new treenode to the treeview.
@@ -205,8 +215,76 @@ class TreeView:
             if discipline is not None:
                 current_treenode.update_treenode_attributes(
                     discipline, self.no_data, self.read_only)
+                self.disc_id_treenodes[discipline.disc_id] = current_treenode
             return current_treenode
 
+    def update_from_data_manager(self, data_manager, event, key, changes):
+        """ Patch the treeview with a DataManager change event and store the change
+        to be sent with get_changes
+
+        :params: data_manager, data manager sending the event
+        :type: DataManager
+
+        :params: event, DataManager change event
+        :type: string
+
+        :params: key, variable full name or discipline identifier for status changes
+        :type: string
+
+        :params: changes, changed attributes {attr: value}
+        :type: dict
+        """
+        if event == data_manager.STATUS_CHANGED:
+            treenode = self.disc_id_treenodes.get(key)
+            if treenode is not None and treenode.update_discipline_status(key, changes[data_manager.STATUS]):
+                self.__get_treenode_changes(treenode.full_namespace)[
+                    'status'] = treenode.status
+
+        elif event == data_manager.VARIABLE_CHANGED:
+            if self.no_data:
+                return
+            # treenode holding the variable at namespace level
+            namespace = NamespaceManager.compose_ns(key.split(NS_SEP)[:-1])
+            treenode = self.treenodes.get(namespace)
+            if treenode is not None:
+                data_changes, _ = treenode.update_variable(key, changes)
+                if len(data_changes) > 0:
+                    self.__get_treenode_changes(namespace).setdefault(
+                        'data', {}).setdefault(key, {}).update(data_changes)
+
+            # treenodes of the disciplines using the variable
+            if data_manager.check_data_in_dm(key):
+                for disc_id in data_manager.get_data(key, SoSDiscipline.DISCIPLINES_DEPENDENCIES):
+                    treenode = self.disc_id_treenodes.get(disc_id)
+                    if treenode is not None:
+                        _, disc_data_changes = treenode.update_variable(
+                            key, changes)
+                        if len(disc_data_changes) > 0:
+                            self.__get_treenode_changes(treenode.full_namespace).setdefault(
+                                'disc_data', {}).setdefault(key, {}).update(disc_data_changes)
+
+        elif event in [data_manager.VARIABLE_ADDED, data_manager.VARIABLE_REMOVED]:
+            self.structure_changed = True
+
+    def __get_treenode_changes(self, full_namespace):
+
+        return self.changes.setdefault(full_namespace, {})
+
+    def get_changes(self, clear=True):
+        """ Return changes applied to the treeview since last call
+        {full_namespace: {'status': status, 'data': {key: {attr: value}}, 'disc_data': {key: {attr: value}}}}
+
+        :params: clear, reset stored changes
+        :type: boolean
+        """
+        changes = self.changes
+        if clear:
+            self.changes = {}
+        return changes
+
+    def changes_to_json(self, clear=True):
+        return dumps(self.get_changes(clear))
+
     def create_treenode_rec(self, current_treenode, treenodes, disc_dict):
         """ Recursive method that create treenode structure regarding
         the SoSDisci
@@ -227,11 +305,50 @@ class TreeView:
                     self.create_treenode_rec(
                         new_treenode, treenodes, disc_dict)
 
-    def to_json(self):
-        return self.root.to_json()
+    def get_treenode(self, full_namespace):
+        """ Return the treenode associated to a namespace, None if it does not exist
+
+        :params: full_namespace, namespace of the treenode (root name included)
+        :type: string
+
+        :return: TreeNode
+        """
+        if self.root is None:
+            return None
+
+        namespace = full_namespace.split(NS_SEP)
+        if namespace[0] != self.root.name:
+            return None
+
+        treenode = self.root
+        for name in namespace[1:]:
+            treenode = next(
+                (tn for tn in treenode.children if tn.name == name), None)
+            if treenode is None:
+                break
+        return treenode
+
+    def to_json(self, full_namespace=None, depth=None):
+        return dumps(self.to_dict(full_namespace, depth))
 
-    def to_dict(self):
-        return self.root.to_dict()
+    def to_dict(self, full_namespace=None, depth=None):
+        """ Serialize the treeview or only the subtree of a given namespace
+        Only serialized treenodes have their documentation read
+
+        :params: full_namespace, namespace of the subtree root, whole treeview if None
+        :type: string
+
+        :params: depth, number of children levels to serialize, all levels if None
+        :type: int
+        """
+        if full_namespace is None:
+            return self.root.to_dict(depth=depth)
+
+        treenode = self.get_treenode(full_namespace)
+        if treenode is None:
+            raise KeyError(
+                f'No treenode found for namespace {full_namespace} in treeview {self.name}')
+        return treenode.to_dict(depth=depth)
 
     def __str__(self):
         return str(self.root)